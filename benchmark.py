@@ -0,0 +1,398 @@
+# TPI - Programacion 1
+# Mediciones de rendimiento del Sistema de Gestion de Paises
+#
+# Uso:
+#   python benchmark.py memoria --filas 1000000
+#   python benchmark.py busqueda --filas 1000000
+#   python benchmark.py paralelo --filas 1000000 --trabajadores 8
+#   python benchmark.py generar datos.csv --filas 1000000 --sesgo 1.5
+#   python benchmark.py suite --filas 1000 100000 --salida actual.json --comparar anterior.json
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import main
+
+# ============================================================================
+# DATOS SINTETICOS
+# ============================================================================
+
+def pesos_continentes(sesgo):
+    """
+    Retorna los pesos acumulados de cada continente para el sesgo indicado
+    Con sesgo 0 todos los continentes son igual de probables; con sesgo
+    mayor los primeros de CONTINENTES_VALIDOS concentran mas paises (Zipf)
+    """
+    acumulados = []
+    total = 0
+    for i in range(len(main.CONTINENTES_VALIDOS)):
+        total = total + 1 / (i + 1) ** sesgo
+        acumulados.append(total)
+    return acumulados
+
+def generar_paises(cantidad, semilla=0, sesgo=0.0):
+    """Genera paises sinteticos (uno por vez) para las mediciones"""
+    aleatorio = random.Random(semilla)
+    acumulados = pesos_continentes(sesgo)
+    for i in range(cantidad):
+        yield {
+            "nombre": f"Pais{i:08d}",
+            "poblacion": aleatorio.randint(1000, 1500000000),
+            "superficie": aleatorio.randint(1, 17000000),
+            "continente": aleatorio.choices(main.CONTINENTES_VALIDOS, cum_weights=acumulados)[0]
+        }
+
+def generar_csv_sintetico(ruta, cantidad, sesgo=0.0, semilla=0):
+    """Escribe un CSV de paises sinteticos con el formato de data/paises.csv"""
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        main.guardar_csv(ruta, generar_paises(cantidad, semilla, sesgo))
+
+# ============================================================================
+# MEMORIA
+# ============================================================================
+
+def medir_memoria(construir, cantidad):
+    """
+    Mide cuantos bytes quedan retenidos al construir una representacion
+    construir: funcion que recibe un iterador de paises
+    """
+    tracemalloc.start()
+    datos = construir(generar_paises(cantidad))
+    memoria_actual, memoria_pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del datos
+    return memoria_actual, memoria_pico
+
+def benchmark_memoria(cantidad):
+    """Compara la memoria de la lista de diccionarios y la tabla columnar"""
+    resultados = {
+        "lista de diccionarios": medir_memoria(list, cantidad),
+        "tabla columnar": medir_memoria(main.tabla_desde_paises, cantidad)
+    }
+
+    print("\n" + "="*70)
+    print(f"MEMORIA PARA {cantidad:,} PAISES")
+    print("="*70)
+    print(f"{'Representacion':<25} {'Retenida':>14} {'Pico':>14} {'Bytes/fila':>12}")
+    print("-"*70)
+    for nombre in resultados:
+        actual, pico = resultados[nombre]
+        print(f"{nombre:<25} {actual:>14,} {pico:>14,} {actual / cantidad:>12,.1f}")
+    print("="*70)
+
+    return resultados
+
+# ============================================================================
+# INDICE DE BUSQUEDA
+# ============================================================================
+
+def benchmark_busqueda(cantidad, consultas=("a", "pais", "00012", "pais0001234")):
+    """
+    Reporta el tiempo de construccion y la memoria del indice de busqueda,
+    y compara cada consulta contra el recorrido lineal
+    """
+    paises = list(generar_paises(cantidad))
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    indice = main.construir_indice_busqueda(paises)
+    tiempo_construccion = time.perf_counter() - inicio
+    memoria_indice = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    indices = {"busqueda": indice}
+
+    print("\n" + "="*70)
+    print(f"INDICE DE BUSQUEDA PARA {cantidad:,} PAISES")
+    print("="*70)
+    print(f"Construccion: {tiempo_construccion:.3f} s")
+    print(f"Memoria: {memoria_indice:,} bytes ({memoria_indice / cantidad:,.1f} bytes/fila)")
+    print(f"N-gramas distintos: {len(indice['ngramas']):,}")
+    print("-"*70)
+    print(f"{'Consulta':<15} {'Resultados':>12} {'Lineal (ms)':>14} {'Indice (ms)':>14}")
+    print("-"*70)
+
+    for consulta in consultas:
+        inicio = time.perf_counter()
+        lineal = main.buscar_pais_por_nombre(paises, consulta)
+        tiempo_lineal = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        con_indice = main.buscar_pais_por_nombre(paises, consulta, indices)
+        tiempo_indice = time.perf_counter() - inicio
+
+        if lineal != con_indice:
+            print(f"ERROR: la consulta '{consulta}' dio resultados distintos.")
+        print(f"{consulta:<15} {len(con_indice):>12,} {tiempo_lineal * 1000:>14.2f} {tiempo_indice * 1000:>14.2f}")
+
+    print("="*70)
+
+    return {
+        "construccion": tiempo_construccion,
+        "memoria": memoria_indice
+    }
+
+# ============================================================================
+# CARGA EN PARALELO
+# ============================================================================
+
+def benchmark_paralelo(cantidad, max_trabajadores):
+    """
+    Mide filas por segundo de cargar_csv y de cargar_csv_paralelo con 1 a
+    max_trabajadores procesos sobre un CSV sintetico (cargar_csv_paralelo
+    usa menos procesos si hay pocos nucleos o el archivo es chico)
+    """
+    directorio = tempfile.mkdtemp()
+    ruta = os.path.join(directorio, "paises.csv")
+    generar_csv_sintetico(ruta, cantidad)
+
+    resultados = {}
+
+    inicio = time.perf_counter()
+    main.cargar_csv(ruta)
+    resultados["secuencial"] = time.perf_counter() - inicio
+
+    for trabajadores in range(1, max_trabajadores + 1):
+        inicio = time.perf_counter()
+        main.cargar_csv_paralelo(ruta, trabajadores)
+        resultados[f"{trabajadores} proceso(s)"] = time.perf_counter() - inicio
+
+    os.remove(ruta)
+    os.rmdir(directorio)
+
+    print("\n" + "="*70)
+    print(f"CARGA DE {cantidad:,} PAISES")
+    print("="*70)
+    print(f"{'Modo':<20} {'Tiempo (s)':>12} {'Filas/s':>16} {'Aceleracion':>14}")
+    print("-"*70)
+    for modo in resultados:
+        tiempo = resultados[modo]
+        aceleracion = resultados["secuencial"] / tiempo
+        print(f"{modo:<20} {tiempo:>12.3f} {cantidad / tiempo:>16,.0f} {aceleracion:>13.2f}x")
+    print("="*70)
+
+    return resultados
+
+# ============================================================================
+# SUITE DE OPERACIONES
+# ============================================================================
+
+def medir_operacion(funcion, repeticiones, calentamiento):
+    """
+    Mide una operacion: primero la ejecuta calentamiento veces sin medir,
+    luego repeticiones veces midiendo el tiempo y una vez mas con
+    tracemalloc para obtener el pico de memoria
+    """
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for i in range(calentamiento):
+            funcion()
+
+        tiempos = []
+        for i in range(repeticiones):
+            inicio = time.perf_counter()
+            funcion()
+            tiempos.append(time.perf_counter() - inicio)
+
+        tracemalloc.start()
+        funcion()
+        pico_memoria = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "minimo": min(tiempos),
+        "mediana": statistics.median(tiempos),
+        "media": statistics.mean(tiempos),
+        "pico_memoria": pico_memoria
+    }
+
+def operaciones_suite(ruta, directorio, paises, indices, max_cuadratico):
+    """
+    Retorna la lista de (nombre, funcion) a medir sobre los datos cargados
+    Los ordenamientos cuadraticos se omiten con mas de max_cuadratico filas
+    """
+    poblaciones = sorted(pais["poblacion"] for pais in paises)
+    superficies = sorted(pais["superficie"] for pais in paises)
+    # Rangos que abarcan aproximadamente el 10% central de los datos
+    min_pob = poblaciones[len(poblaciones) * 45 // 100]
+    max_pob = poblaciones[len(poblaciones) * 55 // 100]
+    min_sup = superficies[len(superficies) * 45 // 100]
+    max_sup = superficies[len(superficies) * 55 // 100]
+    ruta_salida = os.path.join(directorio, "guardado.csv")
+
+    operaciones = [
+        ("cargar_csv", lambda: main.cargar_csv(ruta)),
+        ("guardar_csv", lambda: main.guardar_csv(ruta_salida, paises)),
+        ("buscar_pais_por_nombre", lambda: main.buscar_pais_por_nombre(paises, "pais0001")),
+        ("buscar_pais_por_nombre (indice)", lambda: main.buscar_pais_por_nombre(paises, "pais0001", indices)),
+        ("filtrar_por_continente", lambda: main.filtrar_por_continente(paises, "Asia")),
+        ("filtrar_por_poblacion", lambda: main.filtrar_por_poblacion(paises, min_pob, max_pob)),
+        ("filtrar_por_poblacion (indice)", lambda: main.filtrar_por_poblacion(paises, min_pob, max_pob, indices)),
+        ("filtrar_por_superficie", lambda: main.filtrar_por_superficie(paises, min_sup, max_sup)),
+        ("filtrar_por_superficie (indice)", lambda: main.filtrar_por_superficie(paises, min_sup, max_sup, indices)),
+        ("ordenar_paises (timsort)", lambda: main.ordenar_paises(paises, [("poblacion", False)])),
+        ("primeros_k (k=100)", lambda: main.primeros_k(paises, "poblacion", 100)),
+        ("calcular_estadisticas", lambda: main.calcular_estadisticas(paises)),
+        ("calcular_estadisticas (indices)", lambda: main.calcular_estadisticas(paises, indices))
+    ]
+
+    if len(paises) <= max_cuadratico:
+        operaciones.append(("ordenar_burbuja", lambda: main.ordenar_burbuja(paises, "poblacion", False)))
+        operaciones.append(("ordenar_insercion", lambda: main.ordenar_insercion(paises, "poblacion", False)))
+
+    return operaciones
+
+def ejecutar_suite(tamanos, sesgo, repeticiones, calentamiento, max_cuadratico):
+    """Ejecuta la suite para cada tamano y retorna la lista de resultados"""
+    resultados = []
+    directorio = tempfile.mkdtemp()
+
+    for cantidad in tamanos:
+        ruta = os.path.join(directorio, "paises.csv")
+        generar_csv_sintetico(ruta, cantidad, sesgo)
+        paises = main.cargar_csv(ruta)
+        indices = main.construir_indices(paises)
+        # El indice de busqueda se construye en la primera busqueda
+        main.obtener_indice_busqueda(paises, indices)
+
+        print(f"\nMidiendo {cantidad:,} filas...")
+        for nombre, funcion in operaciones_suite(ruta, directorio, paises, indices, max_cuadratico):
+            medicion = medir_operacion(funcion, repeticiones, calentamiento)
+            medicion["operacion"] = nombre
+            medicion["filas"] = cantidad
+            resultados.append(medicion)
+            print(f"  {nombre:<35} {medicion['mediana'] * 1000:>12.3f} ms")
+
+    for archivo in os.listdir(directorio):
+        os.remove(os.path.join(directorio, archivo))
+    os.rmdir(directorio)
+
+    return resultados
+
+def comparar_resultados(actuales, anteriores, tolerancia=0.10):
+    """
+    Compara la mediana de cada operacion con una ejecucion anterior y
+    marca como regresion lo que sea mas lento que la tolerancia
+    Retorna la cantidad de regresiones
+    """
+    previos = {}
+    for medicion in anteriores:
+        previos[(medicion["operacion"], medicion["filas"])] = medicion
+
+    regresiones = 0
+    print("\n" + "="*85)
+    print("COMPARACION CON LA EJECUCION ANTERIOR")
+    print("="*85)
+    print(f"{'Operacion':<35} {'Filas':>10} {'Antes (ms)':>12} {'Ahora (ms)':>12} {'Cambio':>10}")
+    print("-"*85)
+    for medicion in actuales:
+        previa = previos.get((medicion["operacion"], medicion["filas"]))
+        if previa is None:
+            continue
+        cambio = medicion["mediana"] / previa["mediana"] - 1
+        marca = ""
+        if cambio > tolerancia:
+            marca = "  REGRESION"
+            regresiones = regresiones + 1
+        print(f"{medicion['operacion']:<35} {medicion['filas']:>10,} {previa['mediana'] * 1000:>12.3f} "
+              f"{medicion['mediana'] * 1000:>12.3f} {cambio:>+9.1%}{marca}")
+    print("="*85)
+
+    return regresiones
+
+def benchmark_suite(args):
+    """Ejecuta la suite completa, guarda el JSON y compara si se pidio"""
+    resultados = ejecutar_suite(args.filas, args.sesgo, args.repeticiones, args.calentamiento, args.max_cuadratico)
+
+    informe = {
+        "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "numpy": main.np is not None,
+        "sesgo": args.sesgo,
+        "repeticiones": args.repeticiones,
+        "calentamiento": args.calentamiento,
+        "resultados": resultados
+    }
+
+    if args.salida:
+        archivo = open(args.salida, "w", encoding="utf-8")
+        json.dump(informe, archivo, indent=2)
+        archivo.close()
+        print(f"\nOK: Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        archivo = open(args.comparar, "r", encoding="utf-8")
+        anterior = json.load(archivo)
+        archivo.close()
+        if comparar_resultados(resultados, anterior["resultados"], args.tolerancia) > 0:
+            return 1
+
+    return 0
+
+# ============================================================================
+# PUNTO DE ENTRADA
+# ============================================================================
+
+def crear_parser():
+    """Crea el parser de argumentos de la linea de comandos"""
+    parser = argparse.ArgumentParser(description="Mediciones de rendimiento")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    parser_memoria = subparsers.add_parser("memoria", help="Compara el uso de memoria de las representaciones")
+    parser_memoria.add_argument("--filas", type=int, default=100000)
+
+    parser_busqueda = subparsers.add_parser("busqueda", help="Mide el indice de busqueda por nombre")
+    parser_busqueda.add_argument("--filas", type=int, default=100000)
+
+    parser_paralelo = subparsers.add_parser("paralelo", help="Mide la carga del CSV con varios procesos")
+    parser_paralelo.add_argument("--filas", type=int, default=1000000)
+    parser_paralelo.add_argument("--trabajadores", type=int, default=os.cpu_count() or 1)
+
+    parser_generar = subparsers.add_parser("generar", help="Genera un CSV de paises sinteticos")
+    parser_generar.add_argument("ruta")
+    parser_generar.add_argument("--filas", type=int, default=100000)
+    parser_generar.add_argument("--sesgo", type=float, default=0.0, help="0 = continentes uniformes")
+    parser_generar.add_argument("--semilla", type=int, default=0)
+
+    parser_suite = subparsers.add_parser("suite", help="Mide todas las operaciones principales")
+    parser_suite.add_argument("--filas", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser_suite.add_argument("--sesgo", type=float, default=0.0)
+    parser_suite.add_argument("--repeticiones", type=int, default=5)
+    parser_suite.add_argument("--calentamiento", type=int, default=1)
+    parser_suite.add_argument("--max-cuadratico", type=int, default=5000,
+                              help="Maximo de filas para medir burbuja e insercion")
+    parser_suite.add_argument("--salida", help="Archivo JSON donde guardar los resultados")
+    parser_suite.add_argument("--comparar", help="JSON de una ejecucion anterior")
+    parser_suite.add_argument("--tolerancia", type=float, default=0.10)
+
+    return parser
+
+def principal(argumentos=None):
+    """Ejecuta el benchmark pedido por linea de comandos"""
+    args = crear_parser().parse_args(argumentos)
+
+    if args.comando == "memoria":
+        benchmark_memoria(args.filas)
+    elif args.comando == "busqueda":
+        benchmark_busqueda(args.filas)
+    elif args.comando == "paralelo":
+        benchmark_paralelo(args.filas, args.trabajadores)
+    elif args.comando == "generar":
+        generar_csv_sintetico(args.ruta, args.filas, args.sesgo, args.semilla)
+        print(f"OK: Se generaron {args.filas:,} paises en {args.ruta}")
+    elif args.comando == "suite":
+        return benchmark_suite(args)
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(principal())
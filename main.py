@@ -3,7 +3,36 @@
 # Autores: Alejandro Daniel Maure y Lautaro Ezequiel Mansilla
 # Fecha: Noviembre 2025
 
+import argparse
+import contextlib
+import cProfile
+import csv
+import functools
+import hashlib
+import heapq
+import itertools
+import json
+import math
+import mmap
 import os
+import pstats
+import random
+import re
+import shlex
+import struct
+import sys
+import time
+import tracemalloc
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from concurrent.futures import ProcessPoolExecutor
+
+# NumPy es opcional: si no esta instalado se usan los ciclos de Python
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 # ============================================================================
 # CONSTANTES
@@ -12,6 +41,86 @@ import os
 CONTINENTES_VALIDOS = ["America", "Europa", "Asia", "Africa", "Oceania", "Antartida"]
 RUTA_CSV = "data/paises.csv"
 
+# Columnas del CSV de datos (y de la salida CSV de la linea de comandos)
+COLUMNAS_CSV = ["nombre", "poblacion", "superficie", "continente"]
+
+# Campos derivados: densidad (habitantes por km2) y participacion (porcentaje
+# de la poblacion de su continente que representa el pais)
+CAMPOS_DERIVADOS = ["densidad", "participacion"]
+
+# Campos con indice ordenado para responder filtros por rango
+CAMPOS_INDEXADOS = ["poblacion", "superficie", "densidad"]
+
+# Campos por los que se puede ordenar
+CAMPOS_ORDENABLES = ["nombre", "poblacion", "superficie", "continente"] + CAMPOS_DERIVADOS
+
+# Largo maximo de los fragmentos (n-gramas) del indice de busqueda
+LARGO_NGRAMA = 3
+
+# Persistencia: cantidad de lineas por escritura y tamano maximo del diario
+# de cambios (en bytes) antes de compactarlo en el CSV
+LINEAS_POR_BLOQUE = 10000
+TAMANO_MAXIMO_DIARIO = 1024 * 1024
+
+# Lineas invalidas del CSV que se informan una por una al leerlo (del resto
+# solo se informa la cantidad)
+MAXIMO_LINEAS_INFORMADAS = 10
+
+# Tamano aproximado de los bloques de lineas que se leen y validan juntos
+BYTES_POR_BLOQUE = 1024 * 1024
+
+# Carga en paralelo: bytes de CSV minimos por proceso. Con menos, arrancar
+# los procesos y devolver sus resultados cuesta mas de lo que se gana y el
+# archivo se lee en el proceso actual
+BYTES_MINIMOS_POR_PROCESO = 16 * 1024 * 1024
+
+# Snapshot binario: firma, version y formato del encabezado
+# (firma, version, cantidad, tamano CSV, mtime CSV, bytes de nombres,
+#  bytes de la tabla de continentes, crc32 de la tabla de continentes y de
+#  los crc32 de los bloques, hash del CSV) y filas por bloque verificado
+FIRMA_SNAPSHOT = b"PAIS"
+VERSION_SNAPSHOT = 2
+FORMATO_ENCABEZADO_SNAPSHOT = "<4sIqqqqqI4x16s"
+FILAS_POR_BLOQUE_SNAPSHOT = 65536
+
+# Importacion de CSV externos: solo agregar paises nuevos o combinar
+# (agregar los nuevos y actualizar los que ya existen)
+MODOS_IMPORTACION = ["insertar", "combinar"]
+
+# Claves de las estadisticas que son un pais (se exportan con exportar_pais)
+CLAVES_PAIS_ESTADISTICAS = ["mayor_poblacion", "menor_poblacion", "mayor_densidad", "menor_densidad"]
+
+# Agrupacion: campos por los que se puede agrupar, campos que se pueden
+# resumir y percentiles que se informan ademas de la mediana
+CAMPOS_AGRUPABLES = COLUMNAS_CSV
+CAMPOS_AGREGABLES = ["poblacion", "superficie", "densidad"]
+PERCENTILES_INFORME = [25, 75, 90]
+
+# Estadisticas aproximadas: tamano del bosquejo de cuantiles (KLL), bits de
+# precision del contador de distintos (HyperLogLog, 2**14 registros de un
+# byte) y nivel de confianza de las cotas de error informadas
+KLL_K = 200
+HLL_PRECISION = 14
+CONFIANZA_APROXIMADA = 0.99
+Z_CONFIANZA = 2.576
+
+# Cache de resultados de busquedas y filtros: cantidad maxima de consultas
+# guardadas y de filas entre todas ellas
+CACHE_MAXIMO_ENTRADAS = 128
+CACHE_MAXIMO_FILAS = 200000
+
+# Listados del menu: modo ("paginado", "completo", "contar" o "muestra"),
+# filas por pagina y filas por escritura. El modo y las filas por pagina se cambian
+# con --listado / --filas-por-pagina (o PAISES_LISTADO /
+# PAISES_FILAS_POR_PAGINA)
+MODOS_LISTADO = ["paginado", "completo", "contar", "muestra"]
+FILAS_POR_PAGINA = 20
+FILAS_POR_ESCRITURA = 1000
+CONFIGURACION_LISTADO = {"modo": "paginado", "filas_por_pagina": FILAS_POR_PAGINA}
+
+# Usar el motor de NumPy en la tabla columnar cuando este disponible
+USAR_NUMPY = np is not None
+
 # ============================================================================
 # FUNCIONES DE UTILIDAD
 # ============================================================================
@@ -24,21 +133,52 @@ def pausar():
     """Pausa la ejecucion hasta que el usuario presione Enter"""
     input("\nPresiona Enter para continuar...")
 
+def parsear_entero_positivo(texto, permitir_cero=False):
+    """
+    Convierte un texto en un numero entero positivo, validandolo en la
+    misma pasada (los espacios alrededor se ignoran)
+    permitir_cero: aceptar tambien el 0
+    Retorna (valor, motivo): valor es None si el texto no es valido y
+    motivo explica por que
+    """
+    if texto is None or texto.strip() == "":
+        return None, "no se ingreso ningun valor"
+    
+    texto = texto.strip()
+    if not (texto.isascii() and texto.isdigit()):
+        if texto.startswith("-") and texto[1:].isascii() and texto[1:].isdigit():
+            return None, "es negativo"
+        return None, f"'{texto}' no es un numero entero"
+    
+    valor = int(texto)
+    if valor == 0 and not permitir_cero:
+        return None, "es cero"
+    return valor, ""
+
 def es_numero_entero(texto):
     """
     Valida si un texto representa un numero entero positivo
     """
+    valor, motivo = parsear_entero_positivo(texto)
+    return valor is not None
+
+def es_numero_decimal(texto):
+    """
+    Valida si un texto representa un numero decimal no negativo
+    (por ejemplo '12' o '12.5')
+    """
     if texto == "" or texto is None:
         return False
     
-    # Verificar si todos los caracteres son digitos
-    for caracter in texto:
-        if caracter not in "0123456789":
-            return False
-    
-    # Verificar que no sea solo ceros
-    if int(texto) <= 0:
+    partes = texto.split(".")
+    if len(partes) > 2:
         return False
+    for parte in partes:
+        if parte == "":
+            return False
+        for caracter in parte:
+            if caracter not in "0123456789":
+                return False
     
     return True
 
@@ -49,104 +189,707 @@ def texto_valido(texto):
     texto_limpio = texto.strip()
     return len(texto_limpio) > 0
 
+# ============================================================================
+# INSTRUMENTACION
+# ============================================================================
+#
+# Las operaciones de datos se marcan con @medido. Mientras la
+# instrumentacion esta apagada el decorador no cambia nada (costo cero).
+# activar_instrumentacion reemplaza cada funcion marcada por una version
+# que acumula llamadas, tiempo total y filas procesadas en METRICAS.
+# Se activa con la variable de entorno PAISES_INSTRUMENTAR=1 o con la
+# opcion --instrumentar, y el resumen se muestra al salir del programa.
+
+FUNCIONES_MEDIDAS = []
+METRICAS = {}
+
+def medido(funcion):
+    """Marca una funcion como operacion de datos a instrumentar"""
+    FUNCIONES_MEDIDAS.append(funcion.__name__)
+    return funcion
+
+def contar_filas(argumentos, resultado):
+    """
+    Estima las filas procesadas por una llamada: el largo de la lista
+    recibida como primer argumento o, si no hay, el de la lista retornada
+    (las vistas y las PaisesTabla cuentan como listas)
+    """
+    if len(argumentos) > 0 and isinstance(argumentos[0], (list, tuple, VistaPaises, PaisesTabla)):
+        return len(argumentos[0])
+    if isinstance(resultado, (list, VistaPaises, PaisesTabla)):
+        return len(resultado)
+    if isinstance(resultado, tuple) and len(resultado) > 0 and isinstance(resultado[0], list):
+        return len(resultado[0])
+    return 0
+
+def registrar_metrica(nombre, tiempo, filas):
+    """Acumula una llamada en las metricas de la funcion"""
+    metrica = METRICAS.get(nombre)
+    if metrica is None:
+        metrica = {"llamadas": 0, "tiempo": 0.0, "filas": 0}
+        METRICAS[nombre] = metrica
+    metrica["llamadas"] = metrica["llamadas"] + 1
+    metrica["tiempo"] = metrica["tiempo"] + tiempo
+    metrica["filas"] = metrica["filas"] + filas
+
+def medir_generador(nombre, generador):
+    """Envuelve un generador para medir el tiempo de cada paso y las filas generadas"""
+    filas = 0
+    tiempo = 0.0
+    try:
+        while True:
+            inicio = time.perf_counter()
+            try:
+                elemento = next(generador)
+            except StopIteration:
+                tiempo = tiempo + time.perf_counter() - inicio
+                return
+            tiempo = tiempo + time.perf_counter() - inicio
+            filas = filas + 1
+            yield elemento
+    finally:
+        registrar_metrica(nombre, tiempo, filas)
+
+def envolver_medicion(funcion):
+    """Retorna una version de la funcion que registra sus metricas"""
+    nombre = funcion.__name__
+    
+    @functools.wraps(funcion)
+    def funcion_medida(*argumentos, **opciones):
+        inicio = time.perf_counter()
+        resultado = funcion(*argumentos, **opciones)
+        tiempo = time.perf_counter() - inicio
+        
+        if hasattr(resultado, "__next__") and hasattr(resultado, "send"):
+            return medir_generador(nombre, resultado)
+        
+        registrar_metrica(nombre, tiempo, contar_filas(argumentos, resultado))
+        return resultado
+    
+    return funcion_medida
+
+def instrumentacion_activa():
+    """Indica si las funciones marcadas ya estan instrumentadas"""
+    modulo = sys.modules[__name__]
+    return len(FUNCIONES_MEDIDAS) > 0 and hasattr(getattr(modulo, FUNCIONES_MEDIDAS[0]), "__wrapped__")
+
+def activar_instrumentacion():
+    """Reemplaza cada funcion marcada con @medido por su version medida"""
+    if instrumentacion_activa():
+        return
+    modulo = sys.modules[__name__]
+    for nombre in FUNCIONES_MEDIDAS:
+        setattr(modulo, nombre, envolver_medicion(getattr(modulo, nombre)))
+
+def mostrar_resumen_instrumentacion(salida=None):
+    """Muestra las metricas acumuladas, de la operacion mas lenta a la mas rapida"""
+    if salida is None:
+        salida = sys.stderr
+    
+    print("\n" + "="*80, file=salida)
+    print("RESUMEN DE INSTRUMENTACION", file=salida)
+    print("="*80, file=salida)
+    print(f"{'Operacion':<30} {'Llamadas':>10} {'Tiempo (ms)':>14} {'ms/llamada':>11} {'Filas':>12}", file=salida)
+    print("-"*80, file=salida)
+    
+    nombres = sorted(METRICAS, key=lambda nombre: METRICAS[nombre]["tiempo"], reverse=True)
+    for nombre in nombres:
+        metrica = METRICAS[nombre]
+        tiempo_ms = metrica["tiempo"] * 1000
+        print(f"{nombre:<30} {metrica['llamadas']:>10,} {tiempo_ms:>14.3f} "
+              f"{tiempo_ms / metrica['llamadas']:>11.3f} {metrica['filas']:>12,}", file=salida)
+    
+    print("="*80, file=salida)
+
 # ============================================================================
 # FUNCIONES DE MANEJO DE ARCHIVOS CSV
 # ============================================================================
 
+@medido
+def iterar_csv(ruta, con_diario=True, sin_repetidos=False):
+    """
+    Lee el archivo CSV de forma perezosa y genera un diccionario por pais
+    Solo mantiene en memoria la linea que se esta procesando, por lo que
+    sirve para recorrer archivos muy grandes en una sola pasada
+    con_diario: aplicar los cambios pendientes del diario (ver guardar_cambios)
+    sin_repetidos: omitir los nombres ya leidos (gana la primera aparicion,
+    como en cargar_csv_paralelo); obliga a recordar todos los nombres
+    """
+    # Verificar si el archivo existe
+    if not os.path.exists(ruta):
+        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
+        return
+    
+    altas_diario = {}
+    cambios_diario = {}
+    if con_diario:
+        altas_diario, cambios_diario = leer_diario(ruta)
+    
+    with open(ruta, "r", encoding="utf-8") as archivo:
+        # La primera linea es el encabezado
+        encabezado = archivo.readline()
+        
+        # Verificar que el archivo no este vacio
+        if encabezado == "":
+            print("ADVERTENCIA: El archivo esta vacio.")
+            return
+        
+        # Procesar las lineas de a bloques: cada bloque se valida por
+        # columnas y las lineas invalidas se informan y se saltean
+        numero_linea = 1
+        omitidas = 0
+        hay_cambios = len(cambios_diario) > 0 or len(altas_diario) > 0
+        vistos = set()
+        while True:
+            bloque = archivo.readlines(BYTES_POR_BLOQUE)
+            if len(bloque) == 0:
+                break
+            
+            columnas, rechazados = parsear_bloque("".join(bloque))
+            for indice, linea, motivo in rechazados:
+                omitidas = omitidas + 1
+                if omitidas <= MAXIMO_LINEAS_INFORMADAS:
+                    print(f"ADVERTENCIA: Linea {numero_linea + indice + 1} omitida: {motivo}")
+            
+            if sin_repetidos:
+                repetidos = descartar_repetidos(columnas, vistos)
+                if len(repetidos) > 0:
+                    # Numero de linea de cada fila valida del bloque
+                    indices_rechazados = set(indice for indice, linea, motivo in rechazados)
+                    numeros = [numero_linea + indice + 1 for indice in range(len(bloque))
+                               if indice not in indices_rechazados and bloque[indice].strip() != ""]
+                    for fila in repetidos:
+                        omitidas = omitidas + 1
+                        if omitidas <= MAXIMO_LINEAS_INFORMADAS:
+                            print(f"ADVERTENCIA: Linea {numeros[fila]} omitida: Ya existe un pais con ese nombre.")
+            numero_linea = numero_linea + len(bloque)
+            
+            datos = zip(columnas["nombres"], columnas["poblaciones"],
+                        columnas["superficies"], columnas["continentes"])
+            for nombre, poblacion, superficie, continente in datos:
+                # Crear diccionario para el pais
+                pais = {
+                    "nombre": nombre,
+                    "poblacion": poblacion,
+                    "superficie": superficie,
+                    "continente": continente
+                }
+                
+                if hay_cambios:
+                    clave = normalizar_nombre(nombre)
+                    if clave in cambios_diario:
+                        pais["poblacion"], pais["superficie"] = cambios_diario[clave]
+                    # Un alta del diario que ya esta en el CSV no se repite
+                    altas_diario.pop(clave, None)
+                
+                yield pais
+        
+        if omitidas > 0:
+            print(f"ADVERTENCIA: Se omitieron {omitidas:,} linea(s) invalida(s) de {ruta}.")
+    
+    # Los paises agregados desde el ultimo guardado completo van al final
+    for pais in altas_diario.values():
+        yield pais
+
+def iterar_csv_lotes(ruta, tamano_lote=10000):
+    """
+    Lee el archivo CSV de forma perezosa y genera listas de hasta
+    tamano_lote paises cada una
+    """
+    return iterar_lotes(iterar_csv(ruta), tamano_lote)
+
+def iterar_lotes(elementos, tamano_lote):
+    """Genera listas de hasta tamano_lote elementos de cualquier iterable"""
+    lote = []
+    
+    for elemento in elementos:
+        lote.append(elemento)
+        if len(lote) == tamano_lote:
+            yield lote
+            lote = []
+    
+    if len(lote) > 0:
+        yield lote
+
+def descartar_repetidos(columnas, vistos):
+    """
+    Saca de las columnas de parsear_bloque las filas cuyo nombre normalizado
+    ya esta en vistos (o aparece antes en el mismo bloque) y agrega a vistos
+    los nombres que quedan
+    Retorna las posiciones (en las columnas originales) de las filas sacadas
+    """
+    claves = list(map(normalizar_nombre, columnas["nombres"]))
+    
+    # Caso comun: ningun nombre repetido
+    if len(set(claves)) == len(claves) and vistos.isdisjoint(claves):
+        vistos.update(claves)
+        return []
+    
+    repetidos = []
+    for fila in range(len(claves)):
+        if claves[fila] in vistos:
+            repetidos.append(fila)
+        else:
+            vistos.add(claves[fila])
+    
+    descartadas = set(repetidos)
+    for campo in columnas:
+        columnas[campo] = [valor for fila, valor in enumerate(columnas[campo]) if fila not in descartadas]
+    return repetidos
+
+@medido
 def cargar_csv(ruta):
     """
     Carga los datos del archivo CSV y los retorna como lista de diccionarios
+    Los nombres repetidos se omiten (gana la primera aparicion)
     Retorna una lista vacia si el archivo no existe
     """
     paises = []
     
-    # Verificar si el archivo existe
-    if not os.path.exists(ruta):
-        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
-        return paises
+    for pais in iterar_csv(ruta, sin_repetidos=True):
+        paises.append(pais)
+    
+    return paises
+
+def dividir_csv(ruta, partes):
+    """
+    Divide los datos del CSV (sin el encabezado) en hasta partes rangos de
+    bytes (inicio, fin) que empiezan y terminan en un salto de linea
+    """
+    tamano = os.path.getsize(ruta)
+    archivo = open(ruta, "rb")
+    archivo.readline()
+    inicio_datos = archivo.tell()
+    
+    limites = [inicio_datos]
+    for i in range(1, partes):
+        objetivo = inicio_datos + (tamano - inicio_datos) * i // partes
+        if objetivo <= limites[-1]:
+            continue
+        # Avanzar hasta el principio de la linea siguiente
+        archivo.seek(objetivo - 1)
+        archivo.readline()
+        posicion = archivo.tell()
+        if limites[-1] < posicion < tamano:
+            limites.append(posicion)
+    archivo.close()
+    limites.append(tamano)
     
-    # Abrir y leer el archivo
-    archivo = open(ruta, "r", encoding="utf-8")
-    lineas = archivo.readlines()
+    rangos = []
+    for i in range(len(limites) - 1):
+        if limites[i] < limites[i + 1]:
+            rangos.append((limites[i], limites[i + 1]))
+    return rangos
+
+def parsear_fragmento(ruta, inicio, fin):
+    """
+    Convierte un rango de bytes del CSV en columnas (se ejecuta en un
+    proceso aparte). Valida el continente, los numeros y los nombres
+    repetidos dentro del fragmento
+    Retorna un diccionario con las columnas, la clave normalizada de cada
+    nombre y la lista de rechazados (linea, motivo)
+    """
+    archivo = open(ruta, "rb")
+    archivo.seek(inicio)
+    texto = archivo.read(fin - inicio).decode("utf-8")
     archivo.close()
     
-    # Verificar que el archivo no este vacio
-    if len(lineas) == 0:
-        print("ADVERTENCIA: El archivo esta vacio.")
-        return paises
+    columnas, rechazados = parsear_bloque(texto)
+    claves = list(map(normalizar_nombre, columnas["nombres"]))
+    
+    # Sin nombres repetidos las columnas se usan tal como vienen
+    if len(set(claves)) == len(claves):
+        fragmento = dict(columnas)
+        fragmento["claves"] = claves
+        fragmento["rechazados"] = [(linea, motivo) for indice, linea, motivo in rechazados]
+        return fragmento
     
-    # La primera linea es el encabezado
-    encabezado = lineas[0].strip().split(",")
+    fragmento = {
+        "nombres": [],
+        "claves": [],
+        "poblaciones": [],
+        "superficies": [],
+        "continentes": [],
+        "rechazados": [(linea, motivo) for indice, linea, motivo in rechazados]
+    }
+    vistos = set()
     
-    # Procesar cada linea de datos
-    for i in range(1, len(lineas)):
-        linea = lineas[i].strip()
-        if linea == "":  # Ignorar lineas vacias
+    datos = zip(columnas["nombres"], columnas["poblaciones"], columnas["superficies"], columnas["continentes"])
+    for nombre, poblacion, superficie, continente in datos:
+        clave = normalizar_nombre(nombre)
+        if clave in vistos:
+            fragmento["rechazados"].append((f"{nombre},{poblacion},{superficie},{continente}",
+                                            "Ya existe un pais con ese nombre."))
             continue
+        vistos.add(clave)
         
-        valores = linea.split(",")
+        fragmento["nombres"].append(nombre)
+        fragmento["claves"].append(clave)
+        fragmento["poblaciones"].append(poblacion)
+        fragmento["superficies"].append(superficie)
+        fragmento["continentes"].append(continente)
+    
+    return fragmento
+
+@medido
+def cargar_csv_paralelo(ruta, trabajadores=None):
+    """
+    Carga el CSV repartiendo el trabajo entre varios procesos
+    El archivo se divide en rangos de bytes alineados a lineas, cada proceso
+    convierte su rango y los resultados se unen en el orden original. Los
+    nombres repetidos se descartan al unir (gana el primero, como en cargar_csv)
+    Nunca usa mas procesos que nucleos ni que bloques de
+    BYTES_MINIMOS_POR_PROCESO; si queda uno solo, lee en el proceso actual
+    Retorna (paises, rechazados), con rechazados como lista de (linea, motivo)
+    """
+    if not os.path.exists(ruta):
+        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
+        return [], []
+    
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    tamano = os.path.getsize(ruta)
+    trabajadores = max(1, min(trabajadores, os.cpu_count() or 1, tamano // BYTES_MINIMOS_POR_PROCESO))
+    
+    if trabajadores == 1:
+        # Rangos del tamano de los bloques de iterar_csv: misma memoria
+        rangos = dividir_csv(ruta, max(1, tamano // BYTES_POR_BLOQUE))
+    else:
+        # Varios rangos por proceso para repartir mejor la carga
+        rangos = dividir_csv(ruta, trabajadores * 4)
+    rutas = [ruta] * len(rangos)
+    inicios = [rango[0] for rango in rangos]
+    fines = [rango[1] for rango in rangos]
+    
+    if trabajadores == 1:
+        fragmentos = map(parsear_fragmento, rutas, inicios, fines)
+        return unir_fragmentos(ruta, fragmentos)
+    
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        return unir_fragmentos(ruta, ejecutor.map(parsear_fragmento, rutas, inicios, fines))
+
+def unir_fragmentos(ruta, fragmentos):
+    """
+    Une en orden los fragmentos de parsear_fragmento, descarta los nombres
+    repetidos entre fragmentos y aplica el diario de cambios
+    """
+    paises = []
+    rechazados = []
+    vistos = set()
+    
+    for fragmento in fragmentos:
+        rechazados.extend(fragmento["rechazados"])
+        claves = fragmento["claves"]
+        repetidas = vistos.intersection(claves)
         
-        # Crear diccionario para el pais
-        pais = {
-            "nombre": valores[0],
-            "poblacion": int(valores[1]),
-            "superficie": int(valores[2]),
-            "continente": valores[3]
-        }
-        paises.append(pais)
+        columnas = zip(fragmento["nombres"], fragmento["poblaciones"],
+                       fragmento["superficies"], fragmento["continentes"], claves)
+        for nombre, poblacion, superficie, continente, clave in columnas:
+            if clave in repetidas:
+                rechazados.append((f"{nombre},{poblacion},{superficie},{continente}", "Ya existe un pais con ese nombre."))
+                continue
+            paises.append({
+                "nombre": nombre,
+                "poblacion": poblacion,
+                "superficie": superficie,
+                "continente": continente
+            })
+        
+        vistos.update(claves)
     
-    return paises
+    aplicar_diario(paises, ruta)
+    return paises, rechazados
 
+@medido
 def guardar_csv(ruta, paises):
     """
-    Guarda la lista de paises en el archivo CSV
+    Guarda la lista de paises en el archivo CSV de forma atomica
+    Escribe primero un archivo temporal (en bloques de LINEAS_POR_BLOQUE
+    lineas), lo fuerza a disco y recien entonces reemplaza al original, asi
+    un corte a mitad de camino nunca deja el CSV incompleto
     """
-    archivo = open(ruta, "w", encoding="utf-8")
+    ruta_temporal = ruta + ".tmp"
+    archivo = open(ruta_temporal, "w", encoding="utf-8")
     
     # Escribir encabezado
     archivo.write("nombre,poblacion,superficie,continente\n")
     
-    # Escribir cada pais
+    # Escribir los paises en bloques
+    bloque = []
     for pais in paises:
-        linea = f"{pais['nombre']},{pais['poblacion']},{pais['superficie']},{pais['continente']}\n"
-        archivo.write(linea)
+        bloque.append(f"{pais['nombre']},{pais['poblacion']},{pais['superficie']},{pais['continente']}\n")
+        if len(bloque) == LINEAS_POR_BLOQUE:
+            archivo.write("".join(bloque))
+            bloque = []
+    archivo.write("".join(bloque))
     
+    archivo.flush()
+    os.fsync(archivo.fileno())
     archivo.close()
+    os.replace(ruta_temporal, ruta)
+    
+    # El CSV ya tiene todos los cambios: el diario anterior queda obsoleto
+    if os.path.exists(ruta_diario(ruta)):
+        os.remove(ruta_diario(ruta))
+    
     print("OK: Archivo CSV guardado correctamente.")
 
+# ============================================================================
+# DIARIO DE CAMBIOS
+# ============================================================================
+#
+# Para no reescribir todo el CSV despues de cada modificacion, los cambios
+# se agregan al final de un diario (data/paises.csv.diario):
+#   #base,<tamano>,<mtime>      identidad del CSV al que se aplican
+#   A,nombre,poblacion,superficie,continente   pais agregado
+#   U,nombre,poblacion,superficie              pais actualizado
+# Al cargar, iterar_csv aplica el diario sobre el CSV. Cuando el diario
+# supera TAMANO_MAXIMO_DIARIO se compacta: se guarda el CSV completo y se
+# borra el diario. Si el CSV fue reescrito despues de empezar el diario,
+# su identidad ya no coincide y el diario se ignora.
+
+def ruta_diario(ruta):
+    """Retorna la ruta del diario de cambios del CSV"""
+    return ruta + ".diario"
+
+def identidad_archivo(ruta):
+    """Retorna un texto que cambia cada vez que el archivo se reescribe"""
+    datos = os.stat(ruta)
+    return f"{datos.st_size},{datos.st_mtime_ns}"
+
+def parsear_linea_diario(linea):
+    """
+    Convierte una linea del diario en (tipo, valores)
+    Retorna (None, motivo) si la linea no es valida
+    """
+    valores = linea.split(",")
+    
+    if valores[0] == "A":
+        if len(valores) != 5:
+            return None, "Cantidad de columnas invalida."
+        valido, mensaje = validar_continente(valores[4])
+        if not valido:
+            return None, mensaje
+    elif valores[0] == "U":
+        if len(valores) != 4:
+            return None, "Cantidad de columnas invalida."
+    else:
+        return None, "Tipo de cambio desconocido."
+    
+    poblacion, motivo = parsear_entero_positivo(valores[2], True)
+    if poblacion is None:
+        return None, f"Poblacion invalida: {motivo}."
+    superficie, motivo = parsear_entero_positivo(valores[3], True)
+    if superficie is None:
+        return None, f"Superficie invalida: {motivo}."
+    
+    return valores[0], [valores[1], poblacion, superficie] + valores[4:]
+
+def leer_diario(ruta):
+    """
+    Lee el diario de cambios del CSV
+    Las lineas invalidas (por ejemplo una linea cortada durante la
+    escritura) se informan con su numero y motivo y se omiten
+    Retorna (altas, cambios):
+      altas: diccionario nombre normalizado -> pais agregado (en orden)
+      cambios: diccionario nombre normalizado -> (poblacion, superficie)
+    """
+    altas = {}
+    cambios = {}
+    
+    if not os.path.exists(ruta_diario(ruta)):
+        return altas, cambios
+    
+    archivo = open(ruta_diario(ruta), "r", encoding="utf-8")
+    lineas = archivo.read().splitlines()
+    archivo.close()
+    
+    if len(lineas) == 0 or lineas[0] != "#base," + identidad_archivo(ruta):
+        print("ADVERTENCIA: El diario de cambios no corresponde al CSV actual y se ignora.")
+        return altas, cambios
+    
+    omitidas = 0
+    for numero_linea in range(2, len(lineas) + 1):
+        linea = lineas[numero_linea - 1]
+        if linea.strip() == "":
+            continue
+        
+        tipo, valores = parsear_linea_diario(linea)
+        if tipo is None:
+            omitidas = omitidas + 1
+            if omitidas <= MAXIMO_LINEAS_INFORMADAS:
+                print(f"ADVERTENCIA: Linea {numero_linea} del diario omitida: {valores}")
+            continue
+        
+        clave = normalizar_nombre(valores[0])
+        if tipo == "A":
+            if clave not in altas:
+                altas[clave] = {
+                    "nombre": valores[0],
+                    "poblacion": valores[1],
+                    "superficie": valores[2],
+                    "continente": valores[3]
+                }
+        elif clave in altas:
+            altas[clave]["poblacion"] = valores[1]
+            altas[clave]["superficie"] = valores[2]
+        else:
+            cambios[clave] = (valores[1], valores[2])
+    
+    if omitidas > 0:
+        print(f"ADVERTENCIA: Se omitieron {omitidas:,} linea(s) invalida(s) de {ruta_diario(ruta)}.")
+    
+    return altas, cambios
+
+def aplicar_diario(paises, ruta):
+    """Aplica sobre la lista de paises los cambios pendientes del diario"""
+    altas, cambios = leer_diario(ruta)
+    if len(altas) == 0 and len(cambios) == 0:
+        return
+    
+    # El pais cambiado se vuelve a guardar en su posicion (en una
+    # PaisesTabla los paises se arman al leerlos)
+    for posicion, pais in enumerate(paises):
+        clave = normalizar_nombre(pais["nombre"])
+        if clave in cambios:
+            pais["poblacion"], pais["superficie"] = cambios[clave]
+            paises[posicion] = pais
+        altas.pop(clave, None)
+    
+    for pais in altas.values():
+        paises.append(pais)
+
+def registrar_en_diario(ruta, lineas):
+    """
+    Agrega lineas al final del diario de cambios y las fuerza a disco
+    Retorna False sin escribir nada si el diario existente no corresponde
+    al CSV actual (al cargar se ignoraria y los cambios se perderian)
+    """
+    base = "#base," + identidad_archivo(ruta) + "\n"
+    nuevo = not os.path.exists(ruta_diario(ruta))
+    
+    if not nuevo:
+        with open(ruta_diario(ruta), "r", encoding="utf-8") as archivo:
+            if archivo.readline() != base:
+                return False
+    
+    archivo = open(ruta_diario(ruta), "a", encoding="utf-8")
+    if nuevo:
+        archivo.write(base)
+    archivo.write("".join(lineas))
+    archivo.flush()
+    os.fsync(archivo.fileno())
+    archivo.close()
+    return True
+
+@medido
+def guardar_cambios(ruta, paises, indices):
+    """
+    Guarda los cambios pendientes (registrados en indices["cambios"])
+    Si es posible solo los agrega al diario, lo que cuesta O(cambios);
+    si el diario crecio demasiado o no corresponde al CSV actual hace un
+    guardado completo con guardar_csv
+    """
+    cambios = indices["cambios"]
+    
+    if not os.path.exists(ruta):
+        guardar_csv(ruta, paises)
+        cambios.clear()
+        return
+    
+    # Armar las lineas (un pais agregado ya lleva sus valores actuales)
+    agregados = set()
+    for tipo, posicion in cambios:
+        if tipo == "A":
+            agregados.add(posicion)
+    
+    lineas = []
+    escritos = set()
+    for tipo, posicion in cambios:
+        if posicion in escritos or (tipo == "U" and posicion in agregados):
+            continue
+        escritos.add(posicion)
+        pais = paises[posicion]
+        if tipo == "A":
+            lineas.append(f"A,{pais['nombre']},{pais['poblacion']},{pais['superficie']},{pais['continente']}\n")
+        else:
+            lineas.append(f"U,{pais['nombre']},{pais['poblacion']},{pais['superficie']}\n")
+    
+    if len(lineas) > 0 and not registrar_en_diario(ruta, lineas):
+        # El CSV cambio despues de empezar el diario: se guarda todo
+        print("ADVERTENCIA: El diario de cambios no corresponde al CSV actual, se guarda el CSV completo.")
+        guardar_csv(ruta, paises)
+        cambios.clear()
+        return
+    cambios.clear()
+    
+    if os.path.exists(ruta_diario(ruta)) and os.path.getsize(ruta_diario(ruta)) > TAMANO_MAXIMO_DIARIO:
+        print("Compactando el diario de cambios...")
+        guardar_csv(ruta, paises)
+    else:
+        print(f"OK: Se guardaron {len(lineas)} cambio(s) en el diario.")
+
 # ============================================================================
 # FUNCIONES DE VALIDACION
 # ============================================================================
 
-def validar_nombre(nombre, paises, excluir_nombre=None):
+def validar_nombre(nombre, paises, excluir_nombre=None, indices=None):
     """
-    Valida que el nombre no este vacio y no este duplicado
+    Valida que el nombre no este vacio, no tenga comas (separan las columnas
+    del CSV y del diario) y no este duplicado
     excluir_nombre: nombre a excluir de la validacion de duplicados (para actualizar)
+    indices: si se pasan, los duplicados se buscan en el indice de nombres (O(1))
     """
     if not texto_valido(nombre):
         return False, "El nombre no puede estar vacio."
+    if "," in nombre:
+        return False, "El nombre no puede contener comas."
     
     # Verificar duplicados
-    nombre_lower = nombre.lower()
+    nombre_normalizado = normalizar_nombre(nombre)
+    if excluir_nombre and normalizar_nombre(excluir_nombre) == nombre_normalizado:
+        return True, ""
+    
+    if indices is not None:
+        if nombre_normalizado in indices["nombres"]:
+            return False, "Ya existe un pais con ese nombre."
+        return True, ""
+    
     for pais in paises:
-        if excluir_nombre and pais["nombre"].lower() == excluir_nombre.lower():
-            continue
-        if pais["nombre"].lower() == nombre_lower:
+        if normalizar_nombre(pais["nombre"]) == nombre_normalizado:
             return False, "Ya existe un pais con ese nombre."
     
     return True, ""
 
+def parsear_poblacion(poblacion_texto, permitir_cero=False):
+    """
+    Convierte la poblacion a entero validandola
+    Retorna (poblacion, mensaje); poblacion es None si no es valida
+    """
+    poblacion, motivo = parsear_entero_positivo(poblacion_texto, permitir_cero)
+    if poblacion is None:
+        return None, f"La poblacion debe ser un numero entero positivo ({motivo})."
+    return poblacion, ""
+
+def parsear_superficie(superficie_texto, permitir_cero=False):
+    """
+    Convierte la superficie a entero validandola
+    Retorna (superficie, mensaje); superficie es None si no es valida
+    """
+    superficie, motivo = parsear_entero_positivo(superficie_texto, permitir_cero)
+    if superficie is None:
+        return None, f"La superficie debe ser un numero entero positivo ({motivo})."
+    return superficie, ""
+
 def validar_poblacion(poblacion_texto):
     """Valida que la poblacion sea un numero entero positivo"""
-    if not es_numero_entero(poblacion_texto):
-        return False, "La poblacion debe ser un numero entero positivo."
-    return True, ""
+    poblacion, mensaje = parsear_poblacion(poblacion_texto)
+    return poblacion is not None, mensaje
 
 def validar_superficie(superficie_texto):
     """Valida que la superficie sea un numero entero positivo"""
-    if not es_numero_entero(superficie_texto):
-        return False, "La superficie debe ser un numero entero positivo."
-    return True, ""
+    superficie, mensaje = parsear_superficie(superficie_texto)
+    return superficie is not None, mensaje
 
 def validar_continente(continente):
     """Valida que el continente pertenezca a la lista valida"""
@@ -154,80 +897,959 @@ def validar_continente(continente):
         return False, f"El continente debe ser uno de: {', '.join(CONTINENTES_VALIDOS)}"
     return True, ""
 
-# ============================================================================
-# FUNCIONES DE BUSQUEDA Y FILTRADO
-# ============================================================================
+# Columna de enteros validos: digitos separados por saltos de linea
+PATRON_COLUMNA_ENTEROS = re.compile(r"[0-9]+(?:\n[0-9]+)*")
 
-def buscar_pais_por_nombre(paises, nombre_buscar):
+def parsear_columna_enteros(textos, permitir_cero=False):
     """
-    Busca paises por coincidencia parcial o exacta en el nombre
-    Retorna lista de paises que coinciden
+    Convierte una columna de textos en enteros validandola de una vez: una
+    sola expresion regular revisa toda la columna y, si esta bien, se
+    convierte con map(int). Solo si algun valor es invalido se revisan uno
+    por uno para saber cuales y por que
+    Retorna (valores, errores): valores tiene None en las posiciones
+    invalidas y errores es una lista de (posicion, motivo)
     """
-    resultados = []
-    nombre_buscar_lower = nombre_buscar.lower()
+    if len(textos) > 0 and PATRON_COLUMNA_ENTEROS.fullmatch("\n".join(textos)):
+        valores = list(map(int, textos))
+        if permitir_cero or min(valores) > 0:
+            return valores, []
     
-    for pais in paises:
-        if nombre_buscar_lower in pais["nombre"].lower():
-            resultados.append(pais)
-    
-    return resultados
+    valores = []
+    errores = []
+    for posicion in range(len(textos)):
+        valor, motivo = parsear_entero_positivo(textos[posicion], permitir_cero)
+        valores.append(valor)
+        if valor is None:
+            errores.append((posicion, motivo))
+    return valores, errores
 
-def filtrar_por_continente(paises, continente):
-    """Filtra paises por continente"""
-    resultados = []
+# Bloque de lineas de datos con la forma correcta: nombre (no vacio y sin
+# espacios alrededor), dos enteros sin signo y continente, cada una
+# terminada en salto de linea
+PATRON_BLOQUE_CSV = re.compile(r"(?:[^\s,][^,\n]*(?<!\s),[0-9]+,[0-9]+,[^,\n]+\n)*")
+
+def parsear_bloque(texto):
+    """
+    Convierte un bloque de lineas de datos del CSV (sin el encabezado) en
+    columnas. Si una sola expresion regular valida la forma de todo el
+    bloque, las columnas se separan y convierten sin recorrer las lineas
+    una por una.
+    Si no, se revisa cada linea (cantidad de columnas, nombre y continente)
+    y la poblacion y la superficie de a una columna entera (pueden valer 0).
+    En los dos casos el nombre queda sin los espacios de alrededor
+    Retorna (columnas, rechazados): columnas tiene las listas "nombres",
+    "poblaciones", "superficies" y "continentes"; rechazados es una lista
+    ordenada de (indice de la linea en el bloque, linea, motivo). Las
+    lineas vacias se ignoran
+    """
+    if "\r" in texto:
+        texto = texto.replace("\r\n", "\n")
+    if not texto.endswith("\n"):
+        texto = texto + "\n"
     
-    for pais in paises:
-        if pais["continente"] == continente:
-            resultados.append(pais)
+    if PATRON_BLOQUE_CSV.fullmatch(texto):
+        campos = texto.replace("\n", ",").split(",")
+        campos.pop()  # Lo que sigue al ultimo salto de linea
+        continentes = campos[3::4]
+        if set(continentes).issubset(CONTINENTES_VALIDOS):
+            columnas = {
+                "nombres": campos[0::4],
+                "poblaciones": list(map(int, campos[1::4])),
+                "superficies": list(map(int, campos[2::4])),
+                "continentes": continentes
+            }
+            return columnas, []
     
-    return resultados
-
-def filtrar_por_poblacion(paises, min_poblacion, max_poblacion):
-    """Filtra paises por rango de poblacion"""
-    resultados = []
+    # Hay alguna linea invalida: se busca cual y por que
+    filas = []
+    partes = []
+    rechazados = []
     
-    for pais in paises:
-        if min_poblacion <= pais["poblacion"] <= max_poblacion:
-            resultados.append(pais)
+    for indice, linea in enumerate(texto.split("\n")):
+        linea = linea.strip()
+        if linea == "":
+            continue
+        
+        valores = linea.split(",")
+        if len(valores) != 4:
+            rechazados.append((indice, linea, "Cantidad de columnas invalida."))
+            continue
+        
+        valores[0] = valores[0].strip()
+        if valores[0] == "":
+            rechazados.append((indice, linea, "El nombre no puede estar vacio."))
+            continue
+        
+        if valores[3] not in CONTINENTES_VALIDOS:
+            valido, mensaje = validar_continente(valores[3])
+            rechazados.append((indice, linea, mensaje))
+            continue
+        
+        filas.append(indice)
+        partes.append(valores)
     
-    return resultados
-
-def filtrar_por_superficie(paises, min_superficie, max_superficie):
-    """Filtra paises por rango de superficie"""
-    resultados = []
+    nombres, textos_poblacion, textos_superficie, continentes = [list(columna) for columna in zip(*partes)] or [[], [], [], []]
+    poblaciones, errores_poblacion = parsear_columna_enteros(textos_poblacion, True)
+    superficies, errores_superficie = parsear_columna_enteros(textos_superficie, True)
     
-    for pais in paises:
-        if min_superficie <= pais["superficie"] <= max_superficie:
-            resultados.append(pais)
+    motivos = {}
+    for posicion, motivo in errores_superficie:
+        motivos[posicion] = f"Superficie invalida: {motivo}."
+    for posicion, motivo in errores_poblacion:
+        motivos[posicion] = f"Poblacion invalida: {motivo}."
     
-    return resultados
+    # Las filas con algun numero invalido se sacan de todas las columnas
+    for posicion in sorted(motivos, reverse=True):
+        rechazados.append((filas[posicion], ",".join(partes[posicion]), motivos[posicion]))
+        for columna in [nombres, poblaciones, superficies, continentes]:
+            del columna[posicion]
+    
+    columnas = {"nombres": nombres, "poblaciones": poblaciones, "superficies": superficies, "continentes": continentes}
+    rechazados.sort()
+    return columnas, rechazados
 
 # ============================================================================
-# ALGORITMOS DE ORDENAMIENTO MANUAL
+# CAMPOS DERIVADOS
 # ============================================================================
+#
+# La densidad depende solo del pais: se calcula la primera vez que hace
+# falta, queda guardada en el propio diccionario (clave "densidad") y
+# actualizar_pais la recalcula solo para el pais modificado. La
+# participacion depende ademas del total de su continente, asi que no se
+# guarda: se calcula en O(1) con los totales por continente, que el
+# acumulador de estadisticas mantiene al dia con cada alta o cambio.
 
-def ordenar_burbuja(paises, campo, ascendente=True):
+def calcular_densidad(pais):
+    """Retorna la densidad del pais (habitantes por km2), guardandola en el pais"""
+    densidad = pais.get("densidad")
+    if densidad is None:
+        densidad = recalcular_densidad(pais)
+    return densidad
+
+def recalcular_densidad(pais):
+    """Vuelve a calcular la densidad guardada del pais (tras un cambio)"""
+    densidad = 0.0
+    if pais["superficie"] > 0:
+        densidad = pais["poblacion"] / pais["superficie"]
+    pais["densidad"] = densidad
+    return densidad
+
+def totales_por_continente(paises):
+    """Suma poblacion y superficie por continente recorriendo la lista una vez"""
+    totales = {}
+    for pais in paises:
+        sumar_a_totales(totales, pais["continente"], pais["poblacion"], pais["superficie"])
+    return totales
+
+def sumar_a_totales(totales, continente, poblacion, superficie):
+    """Suma poblacion y superficie a los totales del continente"""
+    total = totales.get(continente)
+    if total is None:
+        total = {"poblacion": 0, "superficie": 0}
+        totales[continente] = total
+    total["poblacion"] = total["poblacion"] + poblacion
+    total["superficie"] = total["superficie"] + superficie
+
+def obtener_totales_continente(paises, indices=None):
     """
-    Ordenamiento por metodo de burbuja
-    campo: 'nombre', 'poblacion' o 'superficie'
-    ascendente: True para orden ascendente, False para descendente
+    Retorna los totales por continente: los del acumulador si hay indices
+    (O(1)) o los de recorrer la lista
     """
-    # Crear copia de la lista para no modificar la original
-    lista_ordenada = []
-    for pais in paises:
-        lista_ordenada.append(pais)
+    if indices is not None:
+        return indices["estadisticas"]["totales_continente"]
+    return totales_por_continente(paises)
+
+def calcular_participacion(pais, totales):
+    """Retorna el porcentaje de la poblacion de su continente que tiene el pais"""
+    total = totales[pais["continente"]]["poblacion"]
+    if total == 0:
+        return 0.0
+    return pais["poblacion"] * 100 / total
+
+def valor_campo(pais, campo, totales=None):
+    """
+    Retorna el valor de un campo del pais, sea propio o derivado
+    totales: totales por continente (solo para 'participacion')
+    """
+    if campo == "densidad":
+        return calcular_densidad(pais)
+    if campo == "participacion":
+        return calcular_participacion(pais, totales)
+    return pais[campo]
+
+def usa_participacion(campos):
+    """Indica si alguno de los campos es la participacion (necesita totales)"""
+    return "participacion" in campos
+
+# ============================================================================
+# FUNCIONES DE INDICES
+# ============================================================================
+#
+# Los indices se guardan en un diccionario que acompana a la lista de paises.
+# Para cada campo de CAMPOS_INDEXADOS hay una lista de tuplas
+# (valor, posicion) ordenada, donde posicion es el indice del pais dentro de
+# la lista. Como los paises nunca se eliminan, las posiciones no cambian.
+# Toda modificacion de la lista debe pasar por agregar_pais y actualizar_pais
+# para que los indices se mantengan sincronizados.
+
+def normalizar_nombre(nombre):
+    """Normaliza un nombre para compararlo sin distinguir mayusculas"""
+    return nombre.casefold()
+
+@medido
+def construir_indices(paises):
+    """Construye todos los indices de la lista de paises"""
+    indices = {"nombres": {}, "cambios": []}
+    for campo in CAMPOS_INDEXADOS:
+        indices[campo] = []
     
-    n = len(lista_ordenada)
+    # Acumulador de estadisticas, se alimenta pais por pais
+    indices["estadisticas"] = crear_acumulador_estadisticas()
     
-    for i in range(n):
-        for j in range(0, n - i - 1):
-            # Comparar según el campo especificado
-            if campo == "nombre":
-                valor1 = lista_ordenada[j][campo].lower()
-                valor2 = lista_ordenada[j + 1][campo].lower()
-            else:
-                valor1 = lista_ordenada[j][campo]
-                valor2 = lista_ordenada[j + 1][campo]
+    if USAR_NUMPY and isinstance(paises, PaisesTabla):
+        # Los indices salen de las columnas de la tabla, sin armar los paises
+        numpy_indexar_tabla(indices, paises)
+    else:
+        # Una sola pasada por la lista (en una PaisesTabla cada pais se arma al leerlo)
+        for posicion, pais in enumerate(paises):
+            # Indice hash nombre normalizado -> posicion (gana la primera aparicion)
+            clave = normalizar_nombre(pais["nombre"])
+            if clave not in indices["nombres"]:
+                indices["nombres"][clave] = posicion
+            
+            for campo in CAMPOS_INDEXADOS:
+                indices[campo].append((valor_campo(pais, campo), posicion))
+            
+            acumular_pais(indices["estadisticas"], pais)
+        
+        for campo in CAMPOS_INDEXADOS:
+            indices[campo].sort()
+    
+    # El indice de busqueda se construye recien en la primera busqueda
+    indices["busqueda"] = None
+    
+    # Cache de consultas, nace vacia con cada carga
+    indices["cache"] = crear_cache()
+    
+    return indices
+
+def indexar_alta(indices, paises, posicion):
+    """Agrega a los indices el pais que esta en la posicion indicada"""
+    pais = paises[posicion]
+    
+    clave = normalizar_nombre(pais["nombre"])
+    if clave not in indices["nombres"]:
+        indices["nombres"][clave] = posicion
+    
+    for campo in CAMPOS_INDEXADOS:
+        insort(indices[campo], (valor_campo(pais, campo), posicion))
+    
+    acumular_pais(indices["estadisticas"], pais)
+    invalidar_cache(indices)
+    
+    if indices["busqueda"] is not None:
+        indexar_busqueda(indices["busqueda"], pais["nombre"], posicion)
+        insort(indices["busqueda"]["prefijos"], (pais["nombre"].lower(), posicion))
+
+def indexar_altas_lote(indices, paises, desde):
+    """
+    Agrega a los indices todos los paises a partir de la posicion desde
+    Los indices ordenados se reordenan una sola vez al final (en lugar de
+    insertar de a uno), lo que es mucho mas rapido para lotes grandes
+    """
+    for posicion in range(desde, len(paises)):
+        clave = normalizar_nombre(paises[posicion]["nombre"])
+        if clave not in indices["nombres"]:
+            indices["nombres"][clave] = posicion
+        acumular_pais(indices["estadisticas"], paises[posicion])
+    
+    if len(paises) > desde:
+        invalidar_cache(indices)
+    
+    for campo in CAMPOS_INDEXADOS:
+        entradas = indices[campo]
+        for posicion in range(desde, len(paises)):
+            entradas.append((valor_campo(paises[posicion], campo), posicion))
+        entradas.sort()
+    
+    if indices["busqueda"] is not None:
+        prefijos = indices["busqueda"]["prefijos"]
+        for posicion in range(desde, len(paises)):
+            indexar_busqueda(indices["busqueda"], paises[posicion]["nombre"], posicion)
+            prefijos.append((paises[posicion]["nombre"].lower(), posicion))
+        prefijos.sort()
+
+def indexar_cambio(indices, posicion, campo, valor_anterior, valor_nuevo, continente=None):
+    """
+    Reubica en el indice del campo al pais cuyo valor cambio
+    continente: el del pais, para ajustar los totales por continente
+    """
+    acumular_cambio(indices["estadisticas"], campo, valor_anterior, valor_nuevo, continente)
+    invalidar_cache(indices)
+    
+    if campo not in indices:
+        return
+    
+    entradas = indices[campo]
+    i = bisect_left(entradas, (valor_anterior, posicion))
+    if i < len(entradas) and entradas[i] == (valor_anterior, posicion):
+        del entradas[i]
+    else:
+        # El valor anterior no coincide con el indice: se busca la entrada
+        # del pais recorriendo el indice para no dejarlo repetido
+        entradas[:] = [entrada for entrada in entradas if entrada[1] != posicion]
+    insort(entradas, (valor_nuevo, posicion))
+
+def posiciones_en_rango(indices, campo, minimo, maximo):
+    """
+    Retorna las posiciones de los paises con campo en [minimo, maximo]
+    Usa busqueda binaria: O(log n + k). Las posiciones se devuelven en el
+    orden de la lista para que el resultado sea igual al de recorrerla
+    """
+    entradas = indices[campo]
+    inicio = bisect_left(entradas, (minimo,))
+    fin = bisect_right(entradas, (maximo, float("inf")))
+    
+    posiciones = []
+    for i in range(inicio, fin):
+        posiciones.append(entradas[i][1])
+    posiciones.sort()
+    
+    return posiciones
+
+@medido
+def construir_indice_busqueda(paises):
+    """
+    Construye el indice de busqueda por nombre:
+      - "ngramas": cada fragmento de 1 a LARGO_NGRAMA letras del nombre en
+        minusculas -> posiciones (en orden) de los paises que lo contienen
+      - "prefijos": lista ordenada de (nombre en minusculas, posicion) para
+        autocompletar con busqueda binaria
+    """
+    indice = {"ngramas": {}, "prefijos": []}
+    
+    for posicion, pais in enumerate(paises):
+        nombre = pais["nombre"]
+        indexar_busqueda(indice, nombre, posicion)
+        indice["prefijos"].append((nombre.lower(), posicion))
+    
+    indice["prefijos"].sort()
+    return indice
+
+def indexar_busqueda(indice, nombre, posicion):
+    """
+    Agrega un nombre a los n-gramas del indice de busqueda
+    La posicion debe ser mayor a todas las ya indexadas, asi las listas de
+    posiciones quedan ordenadas sin tener que reordenarlas
+    """
+    nombre_lower = nombre.lower()
+    ngramas = indice["ngramas"]
+    
+    fragmentos = set()
+    for inicio in range(len(nombre_lower)):
+        for largo in range(1, LARGO_NGRAMA + 1):
+            fragmentos.add(nombre_lower[inicio:inicio + largo])
+    
+    for fragmento in fragmentos:
+        posiciones = ngramas.get(fragmento)
+        if posiciones is None:
+            posiciones = array("q")
+            ngramas[fragmento] = posiciones
+        posiciones.append(posicion)
+
+def obtener_indice_busqueda(paises, indices):
+    """Retorna el indice de busqueda, construyendolo si todavia no existe"""
+    if indices["busqueda"] is None:
+        indices["busqueda"] = construir_indice_busqueda(paises)
+    return indices["busqueda"]
+
+def buscar_posiciones(paises, indice, nombre_buscar):
+    """
+    Retorna las posiciones (en orden) de los paises cuyo nombre contiene
+    nombre_buscar, sin distinguir mayusculas
+    Los textos cortos se responden directo con el indice. Los largos toman
+    el n-grama con menos candidatos y solo verifican esos paises
+    """
+    nombre_buscar_lower = nombre_buscar.lower()
+    ngramas = indice["ngramas"]
+    
+    if len(nombre_buscar_lower) == 0:
+        return list(range(len(paises)))
+    
+    if len(nombre_buscar_lower) <= LARGO_NGRAMA:
+        return list(ngramas.get(nombre_buscar_lower, []))
+    
+    # Elegir el n-grama mas selectivo de la busqueda
+    candidatos = None
+    for inicio in range(len(nombre_buscar_lower) - LARGO_NGRAMA + 1):
+        posiciones = ngramas.get(nombre_buscar_lower[inicio:inicio + LARGO_NGRAMA])
+        if posiciones is None:
+            return []
+        if candidatos is None or len(posiciones) < len(candidatos):
+            candidatos = posiciones
+    
+    # Si el n-grama no descarta casi nada conviene recorrer toda la lista
+    if len(candidatos) * 2 > len(paises):
+        candidatos = range(len(paises))
+    
+    resultados = []
+    for posicion in candidatos:
+        if nombre_buscar_lower in paises[posicion]["nombre"].lower():
+            resultados.append(posicion)
+    return resultados
+
+def autocompletar(paises, indices, prefijo, limite=10):
+    """
+    Retorna hasta limite nombres (en orden alfabetico) que empiezan con
+    prefijo, sin distinguir mayusculas. Cuesta O(log n + limite)
+    """
+    prefijos = obtener_indice_busqueda(paises, indices)["prefijos"]
+    prefijo_lower = prefijo.lower()
+    
+    sugerencias = []
+    i = bisect_left(prefijos, (prefijo_lower,))
+    while i < len(prefijos) and len(sugerencias) < limite:
+        nombre_lower, posicion = prefijos[i]
+        if not nombre_lower.startswith(prefijo_lower):
+            break
+        sugerencias.append(paises[posicion]["nombre"])
+        i = i + 1
+    
+    return sugerencias
+
+def agregar_pais(paises, indices, pais):
+    """Agrega un pais a la lista y actualiza los indices (si hay)"""
+    paises.append(pais)
+    if indices is not None:
+        indexar_alta(indices, paises, len(paises) - 1)
+        indices["cambios"].append(("A", len(paises) - 1))
+
+def buscar_posicion_por_nombre(paises, nombre, indices=None):
+    """
+    Busca un pais por nombre exacto sin distinguir mayusculas
+    Retorna su posicion en la lista o None si no existe
+    Con los indices la busqueda es O(1); sin ellos se recorre la lista
+    """
+    clave = normalizar_nombre(nombre)
+    
+    if indices is not None:
+        return indices["nombres"].get(clave)
+    
+    for posicion in range(len(paises)):
+        if normalizar_nombre(paises[posicion]["nombre"]) == clave:
+            return posicion
+    return None
+
+@medido
+def agregar_paises_lote(paises, indices, nuevos):
+    """
+    Valida y agrega un lote de paises usando el indice de nombres
+    nuevos: iterable de diccionarios con nombre, poblacion, superficie y
+    continente (poblacion y superficie pueden venir como texto o entero)
+    Los duplicados se detectan contra los paises existentes y contra los
+    del mismo lote. Retorna (cantidad_agregados, rechazados), donde
+    rechazados es una lista de tuplas (pais, motivo)
+    """
+    desde = len(paises)
+    rechazados = []
+    nombres_lote = {}
+    
+    for pais in nuevos:
+        nombre = str(pais["nombre"]).strip()
+        valido, mensaje = validar_nombre(nombre, paises, indices=indices)
+        if valido and normalizar_nombre(nombre) in nombres_lote:
+            valido, mensaje = False, "Ya existe un pais con ese nombre."
+        if not valido:
+            rechazados.append((pais, mensaje))
+            continue
+        
+        poblacion, mensaje = parsear_poblacion(str(pais["poblacion"]))
+        if poblacion is None:
+            rechazados.append((pais, mensaje))
+            continue
+        
+        superficie, mensaje = parsear_superficie(str(pais["superficie"]))
+        if superficie is None:
+            rechazados.append((pais, mensaje))
+            continue
+        
+        continente = str(pais["continente"]).strip()
+        valido, mensaje = validar_continente(continente)
+        if not valido:
+            rechazados.append((pais, mensaje))
+            continue
+        
+        nombres_lote[normalizar_nombre(nombre)] = len(paises)
+        paises.append({
+            "nombre": nombre,
+            "poblacion": poblacion,
+            "superficie": superficie,
+            "continente": continente
+        })
+    
+    indexar_altas_lote(indices, paises, desde)
+    for posicion in range(desde, len(paises)):
+        indices["cambios"].append(("A", posicion))
+    
+    return len(paises) - desde, rechazados
+
+def actualizar_pais(paises, indices, posicion, poblacion=None, superficie=None):
+    """
+    Actualiza la poblacion y/o superficie del pais en la posicion indicada
+    y actualiza los indices (si hay)
+    """
+    pais = paises[posicion]
+    densidad_anterior = calcular_densidad(pais)
+    
+    for campo, valor_nuevo in [("poblacion", poblacion), ("superficie", superficie)]:
+        if valor_nuevo is None:
+            continue
+        valor_anterior = pais[campo]
+        pais[campo] = valor_nuevo
+        if indices is not None:
+            indexar_cambio(indices, posicion, campo, valor_anterior, valor_nuevo, pais["continente"])
+    
+    # La densidad guardada se recalcula solo para este pais
+    densidad_nueva = recalcular_densidad(pais)
+    paises[posicion] = pais
+    if indices is not None:
+        indexar_cambio(indices, posicion, "densidad", densidad_anterior, densidad_nueva)
+        indices["cambios"].append(("U", posicion))
+
+# ============================================================================
+# IMPORTACION DE CSV
+# ============================================================================
+#
+# importar_csv lee un CSV externo de a lotes, sin cargarlo entero, y los
+# pasa por agregar_paises_lote: los duplicados se detectan con el indice de
+# nombres y los indices ordenados se actualizan una sola vez por lote. En
+# modo "combinar" las filas con un nombre que ya existe actualizan
+# poblacion y superficie en lugar de rechazarse. Las filas rechazadas se
+# escriben, con el motivo, en un archivo aparte.
+
+COLUMNAS_RECHAZOS = ["linea", "nombre", "poblacion", "superficie", "continente", "motivo"]
+
+def validar_fila_importada(fila):
+    """Valida la forma de una fila del CSV externo (columnas y comas)"""
+    if None in fila or None in fila.values():
+        return False, "Cantidad de columnas incorrecta."
+    if "," in fila["nombre"]:
+        return False, "El nombre no puede contener comas."
+    return True, ""
+
+def combinar_pais(paises, indices, fila):
+    """
+    Actualiza poblacion y superficie de un pais existente con los datos de
+    la fila. Retorna (actualizado, mensaje): actualizado es None si la fila
+    es invalida y False si no cambia nada
+    """
+    posicion = indices["nombres"].get(normalizar_nombre(fila["nombre"].strip()))
+    if posicion is None:
+        return None, "No existe un pais con ese nombre."
+    
+    poblacion, mensaje = parsear_poblacion(fila["poblacion"])
+    if poblacion is None:
+        return None, mensaje
+    
+    superficie, mensaje = parsear_superficie(fila["superficie"])
+    if superficie is None:
+        return None, mensaje
+    
+    pais = paises[posicion]
+    if fila["continente"].strip() != pais["continente"]:
+        return None, f"El continente no coincide con el del pais existente ({pais['continente']})."
+    
+    if poblacion == pais["poblacion"] and superficie == pais["superficie"]:
+        return False, ""
+    
+    actualizar_pais(paises, indices, posicion, poblacion, superficie)
+    return True, ""
+
+@medido
+def importar_csv(paises, indices, ruta, modo="insertar", ruta_rechazos=None, tamano_lote=LINEAS_POR_BLOQUE):
+    """
+    Importa los paises de un CSV externo (con encabezado nombre, poblacion,
+    superficie y continente, en cualquier orden)
+    modo: "insertar" (los nombres repetidos se rechazan) o "combinar" (los
+    nombres que ya existen actualizan poblacion y superficie)
+    ruta_rechazos: CSV donde anotar las filas rechazadas y el motivo (solo
+    se crea si hay rechazos; el de una importacion anterior se borra)
+    Retorna (resumen, mensaje); resumen es None si no se pudo importar
+    """
+    if modo not in MODOS_IMPORTACION:
+        return None, f"Modo de importacion invalido. Opciones: {', '.join(MODOS_IMPORTACION)}"
+    if not os.path.exists(ruta):
+        return None, f"El archivo {ruta} no existe."
+    
+    resumen = {"leidas": 0, "agregados": 0, "actualizados": 0, "sin_cambios": 0, "rechazados": 0, "segundos": 0.0}
+    inicio = time.perf_counter()
+    escritor_rechazos = None
+    
+    # El archivo de rechazos se abre recien con el primer rechazo; la pila
+    # lo cierra al salir, aunque la importacion falle a mitad de camino
+    with open(ruta, "r", encoding="utf-8-sig", newline="") as archivo, contextlib.ExitStack() as pila:
+        lector = csv.DictReader(archivo)
+        if lector.fieldnames is None or not set(COLUMNAS_CSV) <= set(lector.fieldnames):
+            return None, f"El archivo debe tener las columnas: {', '.join(COLUMNAS_CSV)}"
+        
+        # Los rechazos de una importacion anterior no deben confundirse con
+        # los de esta
+        if ruta_rechazos is not None and os.path.exists(ruta_rechazos):
+            os.remove(ruta_rechazos)
+        
+        fin_archivo = False
+        while not fin_archivo:
+            # Armar el lote: filas nuevas por un lado y, en modo combinar,
+            # filas de paises que ya existen (o que agrega este mismo lote)
+            nuevos = []
+            combinados = []
+            nombres_nuevos = set()
+            rechazados = []
+            
+            for fila in lector:
+                fila["linea"] = lector.line_num
+                resumen["leidas"] = resumen["leidas"] + 1
+                
+                valido, mensaje = validar_fila_importada(fila)
+                if not valido:
+                    rechazados.append((fila, mensaje))
+                elif modo == "combinar":
+                    clave = normalizar_nombre(fila["nombre"].strip())
+                    if clave in indices["nombres"] or clave in nombres_nuevos:
+                        combinados.append(fila)
+                    else:
+                        nombres_nuevos.add(clave)
+                        nuevos.append(fila)
+                else:
+                    nuevos.append(fila)
+                
+                if len(nuevos) + len(combinados) + len(rechazados) == tamano_lote:
+                    break
+            else:
+                fin_archivo = True
+            
+            agregados, rechazados_lote = agregar_paises_lote(paises, indices, nuevos)
+            resumen["agregados"] = resumen["agregados"] + agregados
+            rechazados.extend(rechazados_lote)
+            
+            for fila in combinados:
+                actualizado, mensaje = combinar_pais(paises, indices, fila)
+                if actualizado is None:
+                    rechazados.append((fila, mensaje))
+                elif actualizado:
+                    resumen["actualizados"] = resumen["actualizados"] + 1
+                else:
+                    resumen["sin_cambios"] = resumen["sin_cambios"] + 1
+            
+            if len(rechazados) > 0 and ruta_rechazos is not None:
+                if escritor_rechazos is None:
+                    archivo_rechazos = pila.enter_context(open(ruta_rechazos, "w", encoding="utf-8", newline=""))
+                    escritor_rechazos = csv.writer(archivo_rechazos, lineterminator="\n")
+                    escritor_rechazos.writerow(COLUMNAS_RECHAZOS)
+                rechazados.sort(key=lambda rechazo: rechazo[0]["linea"])
+                for fila, motivo in rechazados:
+                    escritor_rechazos.writerow([fila["linea"], fila["nombre"], fila["poblacion"],
+                                                fila["superficie"], fila["continente"], motivo])
+            resumen["rechazados"] = resumen["rechazados"] + len(rechazados)
+    
+    resumen["segundos"] = time.perf_counter() - inicio
+    return resumen, ""
+
+def describir_importacion(resumen):
+    """Retorna un texto con el resultado de una importacion"""
+    filas_por_segundo = 0.0
+    if resumen["segundos"] > 0:
+        filas_por_segundo = resumen["leidas"] / resumen["segundos"]
+    return (f"{resumen['leidas']:,} filas leidas: {resumen['agregados']:,} agregadas, "
+            f"{resumen['actualizados']:,} actualizadas, {resumen['sin_cambios']:,} sin cambios, "
+            f"{resumen['rechazados']:,} rechazadas ({resumen['segundos']:.2f} s, {filas_por_segundo:,.0f} filas/s)")
+
+# ============================================================================
+# CACHE DE CONSULTAS
+# ============================================================================
+#
+# Los resultados de busquedas y filtros se guardan en indices["cache"],
+# con la clave normalizada de la consulta. Es una cache LRU: el diccionario
+# conserva el orden de uso (cada acierto mueve la entrada al final) y se
+# descartan las mas antiguas al pasar CACHE_MAXIMO_ENTRADAS consultas o
+# CACHE_MAXIMO_FILAS filas guardadas. Cualquier alta o cambio la vacia y
+# una recarga crea indices nuevos, asi que nunca devuelve datos viejos.
+
+def crear_cache(maximo_entradas=CACHE_MAXIMO_ENTRADAS, maximo_filas=CACHE_MAXIMO_FILAS):
+    """Crea una cache de consultas vacia"""
+    return {
+        "entradas": {},
+        "filas": 0,
+        "maximo_entradas": maximo_entradas,
+        "maximo_filas": maximo_filas,
+        "aciertos": 0,
+        "fallos": 0,
+        "invalidaciones": 0
+    }
+
+def obtener_de_cache(indices, clave):
+    """
+    Retorna el resultado guardado para la clave o None: las vistas se
+    retornan tal cual (son de solo lectura) y las listas como copia
+    Sin indices (o sin cache) siempre retorna None
+    """
+    if indices is None or "cache" not in indices:
+        return None
+    cache = indices["cache"]
+    
+    resultados = cache["entradas"].pop(clave, None)
+    if resultados is None:
+        cache["fallos"] = cache["fallos"] + 1
+        return None
+    
+    cache["entradas"][clave] = resultados
+    cache["aciertos"] = cache["aciertos"] + 1
+    if isinstance(resultados, VistaPaises):
+        return resultados
+    return list(resultados)
+
+def guardar_en_cache(indices, clave, resultados):
+    """
+    Guarda el resultado (las listas como copia), descartando las consultas
+    menos usadas
+    """
+    if indices is None or "cache" not in indices:
+        return
+    cache = indices["cache"]
+    
+    # Un resultado mas grande que toda la cache no se guarda
+    if len(resultados) > cache["maximo_filas"]:
+        return
+    
+    anterior = cache["entradas"].pop(clave, None)
+    if anterior is not None:
+        cache["filas"] = cache["filas"] - len(anterior)
+    
+    if not isinstance(resultados, VistaPaises):
+        resultados = list(resultados)
+    cache["entradas"][clave] = resultados
+    cache["filas"] = cache["filas"] + len(resultados)
+    
+    while len(cache["entradas"]) > cache["maximo_entradas"] or cache["filas"] > cache["maximo_filas"]:
+        clave_vieja = next(iter(cache["entradas"]))
+        cache["filas"] = cache["filas"] - len(cache["entradas"].pop(clave_vieja))
+
+def invalidar_cache(indices):
+    """Descarta todos los resultados guardados (los datos cambiaron)"""
+    if "cache" not in indices:
+        return
+    cache = indices["cache"]
+    if len(cache["entradas"]) > 0:
+        cache["entradas"].clear()
+        cache["filas"] = 0
+        cache["invalidaciones"] = cache["invalidaciones"] + 1
+
+def clave_consulta(consulta):
+    """Clave de cache de una consulta combinada (nombre sin distinguir mayusculas)"""
+    nombre = consulta["nombre"]
+    if nombre:
+        nombre = nombre.lower()
+    orden = None
+    if consulta["orden"]:
+        orden = tuple(consulta["orden"])
+    return ("consulta", consulta["continente"], consulta["poblacion"], consulta["superficie"],
+            consulta["densidad"], consulta["participacion"], nombre, orden, consulta["limite"])
+
+def mostrar_resumen_cache(indices, salida=None):
+    """Muestra aciertos, fallos y ocupacion de la cache de consultas"""
+    if indices is None or "cache" not in indices:
+        return
+    if salida is None:
+        salida = sys.stderr
+    
+    cache = indices["cache"]
+    total = cache["aciertos"] + cache["fallos"]
+    porcentaje = 0.0
+    if total > 0:
+        porcentaje = cache["aciertos"] * 100 / total
+    
+    print(f"Cache de consultas: {cache['aciertos']:,} aciertos, {cache['fallos']:,} fallos "
+          f"({porcentaje:.1f}% de aciertos), {len(cache['entradas']):,} consultas y "
+          f"{cache['filas']:,} filas guardadas, {cache['invalidaciones']:,} invalidaciones", file=salida)
+
+# ============================================================================
+# VISTAS DE PAISES
+# ============================================================================
+#
+# Los filtros, la busqueda y ordenar_paises no copian los paises: retornan
+# una vista con las posiciones elegidas sobre la lista base. La vista se usa
+# como una lista de solo lectura (len, indice, recorte y recorrido), asi que
+# mostrar, guardar o exportar la recorren sin armar otra lista. Filtrar u
+# ordenar una vista retorna otra vista sobre la misma lista base (nunca una
+# vista de una vista), y un recorte solo copia posiciones. Las filas son las
+# de la lista base: una vista ve los cambios de un pais pero no las altas
+# posteriores, igual que una lista con los mismos paises.
+
+class VistaPaises:
+    """Seleccion de paises de una lista base, guardada como posiciones"""
+    
+    def __init__(self, base, posiciones=None):
+        """
+        base: lista de paises u otra vista (se usa su lista base)
+        posiciones: posiciones dentro de base, en el orden de la vista
+                    (None para todos los paises de base); se guardan en un
+                    array de enteros de 8 bytes
+        """
+        if isinstance(base, VistaPaises):
+            if posiciones is None:
+                posiciones = base.posiciones
+            else:
+                posiciones = array("q", map(base.posiciones.__getitem__, posiciones))
+            base = base.base
+        elif posiciones is None:
+            posiciones = range(len(base))
+        elif not isinstance(posiciones, (array, range)):
+            posiciones = array("q", posiciones)
+        self.base = base
+        self.posiciones = posiciones
+    
+    def __len__(self):
+        return len(self.posiciones)
+    
+    def __iter__(self):
+        # Vista de toda la base: se recorre la base directamente
+        if self.posiciones == range(len(self.base)):
+            return iter(self.base)
+        return map(self.base.__getitem__, self.posiciones)
+    
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return VistaPaises(self.base, self.posiciones[posicion])
+        return self.base[self.posiciones[posicion]]
+    
+    def __eq__(self, otra):
+        if not isinstance(otra, (list, tuple, VistaPaises, PaisesTabla)):
+            return NotImplemented
+        return list(self) == list(otra)
+    
+    def __repr__(self):
+        return f"VistaPaises({len(self):,} de {len(self.base):,} paises)"
+
+def base_y_posiciones(paises):
+    """
+    Retorna la lista base y las posiciones de los paises recibidos
+    paises puede ser una vista, una lista o un iterador (que se convierte
+    en lista, por ejemplo un generador)
+    """
+    if isinstance(paises, VistaPaises):
+        return paises.base, paises.posiciones
+    if not isinstance(paises, (list, PaisesTabla)):
+        paises = list(paises)
+    return paises, range(len(paises))
+
+def lista_base(paises):
+    """Retorna la lista base de una vista (o la misma lista)"""
+    if isinstance(paises, VistaPaises):
+        return paises.base
+    return paises
+
+def posiciones_en_vista(paises, posiciones):
+    """
+    Restringe posiciones de la lista base (por ejemplo las de un indice) a
+    los paises recibidos: si paises es una vista se conservan solo las que
+    estan en ella, en el orden de la vista; con la lista base no cambian
+    """
+    if not isinstance(paises, VistaPaises):
+        return posiciones
+    elegidas = set(posiciones)
+    return [posicion for posicion in paises.posiciones if posicion in elegidas]
+
+# ============================================================================
+# FUNCIONES DE BUSQUEDA Y FILTRADO
+# ============================================================================
+
+@medido
+def buscar_pais_por_nombre(paises, nombre_buscar, indices=None):
+    """
+    Busca paises por coincidencia parcial o exacta en el nombre
+    paises puede ser una lista, una vista o un iterador (por ejemplo
+    iterar_csv); con un iterador se retorna una lista
+    Si se pasan los indices se usa el indice de busqueda en lugar de recorrer
+    (los indices son siempre los de la lista base)
+    Retorna una vista con los paises que coinciden
+    """
+    if indices is not None:
+        base = lista_base(paises)
+        posiciones = buscar_posiciones(base, obtener_indice_busqueda(base, indices), nombre_buscar)
+        return VistaPaises(base, posiciones_en_vista(paises, posiciones))
+    nombre_buscar_lower = nombre_buscar.lower()
+    
+    if not isinstance(paises, (list, VistaPaises, PaisesTabla)):
+        resultados = []
+        for pais in paises:
+            if nombre_buscar_lower in pais["nombre"].lower():
+                resultados.append(pais)
+        return resultados
+    
+    base, posiciones = base_y_posiciones(paises)
+    seleccion = [posicion for posicion in posiciones if nombre_buscar_lower in base[posicion]["nombre"].lower()]
+    return VistaPaises(base, seleccion)
+
+@medido
+def filtrar_por_continente(paises, continente):
+    """Filtra paises por continente (retorna una vista)"""
+    base, posiciones = base_y_posiciones(paises)
+    seleccion = [posicion for posicion in posiciones if base[posicion]["continente"] == continente]
+    return VistaPaises(base, seleccion)
+
+@medido
+def filtrar_por_poblacion(paises, min_poblacion, max_poblacion, indices=None):
+    """
+    Filtra paises por rango de poblacion (retorna una vista)
+    Si se pasan los indices se usa el indice ordenado en lugar de recorrer
+    """
+    if indices is not None:
+        posiciones = posiciones_en_rango(indices, "poblacion", min_poblacion, max_poblacion)
+        return VistaPaises(lista_base(paises), posiciones_en_vista(paises, posiciones))
+    
+    base, posiciones = base_y_posiciones(paises)
+    seleccion = [posicion for posicion in posiciones if min_poblacion <= base[posicion]["poblacion"] <= max_poblacion]
+    return VistaPaises(base, seleccion)
+
+@medido
+def filtrar_por_superficie(paises, min_superficie, max_superficie, indices=None):
+    """
+    Filtra paises por rango de superficie (retorna una vista)
+    Si se pasan los indices se usa el indice ordenado en lugar de recorrer
+    """
+    if indices is not None:
+        posiciones = posiciones_en_rango(indices, "superficie", min_superficie, max_superficie)
+        return VistaPaises(lista_base(paises), posiciones_en_vista(paises, posiciones))
+    
+    base, posiciones = base_y_posiciones(paises)
+    seleccion = [posicion for posicion in posiciones if min_superficie <= base[posicion]["superficie"] <= max_superficie]
+    return VistaPaises(base, seleccion)
+
+# ============================================================================
+# ALGORITMOS DE ORDENAMIENTO MANUAL
+# ============================================================================
+
+@medido
+def ordenar_burbuja(paises, campo, ascendente=True):
+    """
+    Ordenamiento por metodo de burbuja
+    campo: 'nombre', 'poblacion' o 'superficie'
+    ascendente: True para orden ascendente, False para descendente
+    """
+    # Crear copia de la lista para no modificar la original
+    lista_ordenada = list(paises)
+    
+    n = len(lista_ordenada)
+    
+    for i in range(n):
+        for j in range(0, n - i - 1):
+            # Comparar según el campo especificado
+            if campo == "nombre":
+                valor1 = lista_ordenada[j][campo].lower()
+                valor2 = lista_ordenada[j + 1][campo].lower()
+            else:
+                valor1 = lista_ordenada[j][campo]
+                valor2 = lista_ordenada[j + 1][campo]
             
             # Intercambiar si es necesario
             if ascendente:
@@ -243,6 +1865,7 @@ def ordenar_burbuja(paises, campo, ascendente=True):
     
     return lista_ordenada
 
+@medido
 def ordenar_insercion(paises, campo, ascendente=True):
     """
     Ordenamiento por metodo de insercion
@@ -250,9 +1873,7 @@ def ordenar_insercion(paises, campo, ascendente=True):
     ascendente: True para orden ascendente, False para descendente
     """
     # Crear copia de la lista para no modificar la original
-    lista_ordenada = []
-    for pais in paises:
-        lista_ordenada.append(pais)
+    lista_ordenada = list(paises)
     
     n = len(lista_ordenada)
     
@@ -289,95 +1910,2287 @@ def ordenar_insercion(paises, campo, ascendente=True):
     return lista_ordenada
 
 # ============================================================================
-# FUNCIONES DE ESTADISTICAS
+# MOTOR DE ORDENAMIENTO O(n log n)
 # ============================================================================
+#
+# Los metodos burbuja e insercion se conservan para comparar. Este motor
+# calcula la clave de cada pais una sola vez y ordena posiciones con un
+# algoritmo estable, por lo que admite varios criterios: se ordena primero
+# por el ultimo criterio y al final por el primero (orden lexicografico).
 
-def calcular_estadisticas(paises):
+def clave_orden(pais, campo, totales=None):
     """
-    Calcula y muestra estadisticas de los paises
+    Retorna el valor por el que se compara un pais segun el campo
+    totales: totales por continente (solo para ordenar por 'participacion')
     """
-    if len(paises) == 0:
-        print("No hay datos para calcular estadisticas.")
-        return
+    if campo == "nombre" or campo == "continente":
+        return pais[campo].lower()
+    return valor_campo(pais, campo, totales)
+
+def ordenar_mezcla(posiciones, claves, ascendente=True):
+    """
+    Ordenamiento por metodo de mezcla (merge sort), estable, O(n log n)
+    Ordena la lista de posiciones segun claves[posicion]
+    """
+    n = len(posiciones)
+    if n <= 1:
+        return list(posiciones)
     
-    # Pais con mayor y menor poblacion
-    pais_mayor_pob = paises[0]
-    pais_menor_pob = paises[0]
-    suma_poblacion = 0
-    suma_superficie = 0
+    mitad = n // 2
+    izquierda = ordenar_mezcla(posiciones[:mitad], claves, ascendente)
+    derecha = ordenar_mezcla(posiciones[mitad:], claves, ascendente)
     
-    for pais in paises:
-        # Mayor y menor poblacion
-        if pais["poblacion"] > pais_mayor_pob["poblacion"]:
-            pais_mayor_pob = pais
-        if pais["poblacion"] < pais_menor_pob["poblacion"]:
-            pais_menor_pob = pais
+    # Mezclar tomando de la izquierda en caso de empate (estabilidad)
+    resultado = []
+    i = 0
+    j = 0
+    while i < len(izquierda) and j < len(derecha):
+        valor_izquierda = claves[izquierda[i]]
+        valor_derecha = claves[derecha[j]]
+        if ascendente:
+            tomar_izquierda = valor_izquierda <= valor_derecha
+        else:
+            tomar_izquierda = valor_izquierda >= valor_derecha
         
-        # Sumas para promedios
-        suma_poblacion = suma_poblacion + pais["poblacion"]
-        suma_superficie = suma_superficie + pais["superficie"]
+        if tomar_izquierda:
+            resultado.append(izquierda[i])
+            i = i + 1
+        else:
+            resultado.append(derecha[j])
+            j = j + 1
     
-    # Promedios
-    promedio_poblacion = suma_poblacion / len(paises)
-    promedio_superficie = suma_superficie / len(paises)
+    resultado.extend(izquierda[i:])
+    resultado.extend(derecha[j:])
+    return resultado
+
+@medido
+def ordenar_paises(paises, criterios, algoritmo="timsort", totales=None):
+    """
+    Ordena los paises por uno o varios criterios sin modificar la lista
+    criterios: lista de tuplas (campo, ascendente), por ejemplo
+               [("continente", True), ("poblacion", False)]
+    algoritmo: 'timsort' (sort de Python) o 'mezcla'
+    totales: totales por continente para la participacion (por defecto se
+             calculan con los mismos paises que se ordenan)
+    Retorna una vista sobre la misma lista base (paises puede ser una
+    lista, una vista o un iterador)
+    """
+    base, seleccion = base_y_posiciones(paises)
+    vista = VistaPaises(base, seleccion)
+    posiciones = list(range(len(seleccion)))
     
-    # Cantidad de paises por continente
-    continentes_count = {}
-    for pais in paises:
-        continente = pais["continente"]
-        if continente in continentes_count:
-            continentes_count[continente] = continentes_count[continente] + 1
-        else:
-            continentes_count[continente] = 1
+    if totales is None and usa_participacion([campo for campo, ascendente in criterios]):
+        totales = totales_por_continente(vista)
     
-    # Mostrar estadisticas
-    print("\n" + "="*60)
-    print("ESTADISTICAS DE LOS PAISES")
-    print("="*60)
+    for campo, ascendente in reversed(criterios):
+        # Precalcular la clave de cada pais una sola vez
+        claves = []
+        for pais in vista:
+            claves.append(clave_orden(pais, campo, totales))
+        
+        if algoritmo == "mezcla":
+            posiciones = ordenar_mezcla(posiciones, claves, ascendente)
+        else:
+            # reverse=True tambien es estable en el sort de Python
+            posiciones.sort(key=claves.__getitem__, reverse=not ascendente)
     
-    print(f"\nPais con MAYOR poblacion:")
-    print(f"   {pais_mayor_pob['nombre']}: {pais_mayor_pob['poblacion']:,} habitantes")
+    return VistaPaises(vista, posiciones)
+
+@medido
+def primeros_k(paises, campo, k, ascendente=False, totales=None):
+    """
+    Retorna los primeros k paises del orden por el campo indicado (por
+    defecto los k mayores) sin ordenar toda la lista
+    Usa un heap de tamano k: O(n log k) en tiempo y O(k) en memoria, por lo
+    que paises puede ser un iterador (por ejemplo iterar_csv)
+    El resultado coincide con ordenar_paises(...)[:k], empates incluidos
+    totales: totales por continente para la participacion (si faltan se
+             calculan con los mismos paises, que entonces se recorren dos veces)
+    """
+    if totales is None and campo == "participacion":
+        paises = list(paises)
+        totales = totales_por_continente(paises)
     
-    print(f"\nPais con MENOR poblacion:")
-    print(f"   {pais_menor_pob['nombre']}: {pais_menor_pob['poblacion']:,} habitantes")
+    def clave(pais):
+        return clave_orden(pais, campo, totales)
     
-    print(f"\nPromedio de poblacion: {promedio_poblacion:,.0f} habitantes")
-    print(f"Promedio de superficie: {promedio_superficie:,.0f} km2")
+    if ascendente:
+        return heapq.nsmallest(k, paises, key=clave)
+    return heapq.nlargest(k, paises, key=clave)
+
+def primeros_k_posiciones(paises, posiciones, campo, k, ascendente=False, totales=None):
+    """
+    Como primeros_k pero recorre las posiciones indicadas de la lista y
+    retorna las posiciones elegidas (para armar una vista sin copiar)
+    """
+    def clave(posicion):
+        return clave_orden(paises[posicion], campo, totales)
     
-    print(f"\nCantidad de paises por continente:")
+    if ascendente:
+        return heapq.nsmallest(k, posiciones, key=clave)
+    return heapq.nlargest(k, posiciones, key=clave)
+
+def primeros_k_csv(ruta, campo, k, ascendente=False):
+    """
+    Version en streaming de primeros_k: lee el CSV con iterar_csv y nunca
+    tiene en memoria mas de k paises
+    """
+    return primeros_k(iterar_csv(ruta), campo, k, ascendente)
+
+def parsear_criterios(texto):
+    """
+    Convierte un texto como 'continente,-poblacion' en una lista de criterios
+    Un '-' delante del campo indica orden descendente
+    Retorna (criterios, mensaje de error)
+    """
+    criterios = []
+    
+    for parte in texto.split(","):
+        parte = parte.strip()
+        ascendente = True
+        if parte.startswith("-"):
+            ascendente = False
+            parte = parte[1:].strip()
+        
+        if parte not in CAMPOS_ORDENABLES:
+            return None, f"Campo invalido '{parte}'. Campos validos: {', '.join(CAMPOS_ORDENABLES)}"
+        criterios.append((parte, ascendente))
+    
+    return criterios, ""
+
+def describir_criterios(criterios):
+    """Retorna un texto legible con los criterios de orden"""
+    partes = []
+    for campo, ascendente in criterios:
+        if ascendente:
+            partes.append(campo)
+        else:
+            partes.append(f"{campo} desc")
+    return ", ".join(partes)
+
+# ============================================================================
+# CONSULTAS COMBINADAS
+# ============================================================================
+#
+# Una consulta es un diccionario con filtros opcionales (continente, rangos
+# de poblacion, superficie, densidad y participacion, texto en el nombre), un
+# orden y un limite. Se arma con crear_consulta o encadenando
+# donde_continente, donde_poblacion, donde_superficie, donde_rango,
+# nombre_contiene, ordenar_por y limitar (cada una retorna una consulta
+# nueva). iterar_posiciones_consulta evalua todos los filtros en una sola
+# pasada perezosa, empezando por el indice mas selectivo que haya, y recien
+# ejecutar_consulta arma la vista final.
+
+def crear_consulta(continente=None, poblacion=None, superficie=None, nombre=None, orden=None, limite=None,
+                   densidad=None, participacion=None):
+    """
+    Crea una consulta
+    poblacion, superficie, densidad y participacion: tuplas (minimo, maximo)
+    orden: lista de criterios (campo, ascendente) o texto como '-poblacion'
+    """
+    consulta = {
+        "continente": continente,
+        "poblacion": poblacion,
+        "superficie": superficie,
+        "densidad": densidad,
+        "participacion": participacion,
+        "nombre": nombre,
+        "orden": None,
+        "limite": limite
+    }
+    if orden is not None:
+        consulta = ordenar_por(consulta, orden)
+    return consulta
+
+def donde_continente(consulta, continente):
+    """Retorna la consulta filtrando ademas por continente"""
+    return dict(consulta, continente=continente)
+
+def combinar_rango(rango, minimo, maximo):
+    """Intersecta un rango existente (o None) con [minimo, maximo]"""
+    if rango is None:
+        return (minimo, maximo)
+    return (max(rango[0], minimo), min(rango[1], maximo))
+
+def donde_rango(consulta, campo, minimo, maximo):
+    """Retorna la consulta filtrando ademas por rango del campo"""
+    nueva = dict(consulta)
+    nueva[campo] = combinar_rango(consulta[campo], minimo, maximo)
+    return nueva
+
+def donde_poblacion(consulta, minimo, maximo):
+    """Retorna la consulta filtrando ademas por rango de poblacion"""
+    return donde_rango(consulta, "poblacion", minimo, maximo)
+
+def donde_superficie(consulta, minimo, maximo):
+    """Retorna la consulta filtrando ademas por rango de superficie"""
+    return donde_rango(consulta, "superficie", minimo, maximo)
+
+def nombre_contiene(consulta, texto):
+    """Retorna la consulta filtrando ademas por texto en el nombre"""
+    return dict(consulta, nombre=texto)
+
+def ordenar_por(consulta, orden):
+    """Retorna la consulta con el orden indicado (criterios o texto)"""
+    if isinstance(orden, str):
+        criterios, mensaje = parsear_criterios(orden)
+        if criterios is None:
+            raise ValueError(mensaje)
+        orden = criterios
+    return dict(consulta, orden=list(orden))
+
+def limitar(consulta, limite):
+    """Retorna la consulta devolviendo como maximo limite paises"""
+    return dict(consulta, limite=limite)
+
+def elegir_candidatos(paises, consulta, indices):
+    """
+    Elige el indice mas selectivo para la consulta y retorna las
+    posiciones candidatas (en orden), o None si conviene recorrer todo
+    """
+    if indices is None:
+        return None
+    
+    mejor_estimacion = len(paises) // 2
+    mejor_opcion = None
+    
+    # Rangos: la cantidad exacta sale de dos busquedas binarias
+    for campo in CAMPOS_INDEXADOS:
+        rango = consulta[campo]
+        if rango is None:
+            continue
+        entradas = indices[campo]
+        cantidad = bisect_right(entradas, (rango[1], float("inf"))) - bisect_left(entradas, (rango[0],))
+        if cantidad < mejor_estimacion:
+            mejor_estimacion = cantidad
+            mejor_opcion = campo
+    
+    # Nombre: solo si el indice de busqueda ya esta construido
+    if consulta["nombre"] and indices["busqueda"] is not None:
+        texto = consulta["nombre"].lower()
+        ngramas = indices["busqueda"]["ngramas"]
+        cantidad = len(ngramas.get(texto[:LARGO_NGRAMA], []))
+        if cantidad < mejor_estimacion:
+            mejor_estimacion = cantidad
+            mejor_opcion = "nombre"
+    
+    if mejor_opcion is None:
+        return None
+    if mejor_opcion == "nombre":
+        return buscar_posiciones(paises, indices["busqueda"], consulta["nombre"])
+    rango = consulta[mejor_opcion]
+    return posiciones_en_rango(indices, mejor_opcion, rango[0], rango[1])
+
+def totales_de_consulta(paises, consulta, indices=None):
+    """
+    Retorna los totales por continente si la consulta filtra u ordena por
+    participacion (siempre los de todos los paises, no solo los filtrados)
+    """
+    campos = []
+    if consulta["participacion"] is not None:
+        campos.append("participacion")
+    if consulta["orden"]:
+        for campo, ascendente in consulta["orden"]:
+            campos.append(campo)
+    if not usa_participacion(campos):
+        return None
+    return obtener_totales_continente(lista_base(paises), indices)
+
+def iterar_posiciones_consulta(paises, consulta, indices=None, totales=None):
+    """
+    Genera, en el orden de la lista (o de la vista), las posiciones en la
+    lista base de los paises que cumplen todos los filtros de la consulta
+    (sin aplicar orden ni limite)
+    """
+    if totales is None:
+        totales = totales_de_consulta(paises, consulta, indices)
+    base, todas = base_y_posiciones(paises)
+    candidatos = elegir_candidatos(base, consulta, indices)
+    if candidatos is None:
+        candidatos = todas
+    else:
+        candidatos = posiciones_en_vista(paises, candidatos)
+    
+    continente = consulta["continente"]
+    poblacion = consulta["poblacion"]
+    superficie = consulta["superficie"]
+    densidad = consulta["densidad"]
+    participacion = consulta["participacion"]
+    nombre = None
+    if consulta["nombre"]:
+        nombre = consulta["nombre"].lower()
+    
+    for posicion in candidatos:
+        pais = base[posicion]
+        if continente is not None and pais["continente"] != continente:
+            continue
+        if poblacion is not None and not poblacion[0] <= pais["poblacion"] <= poblacion[1]:
+            continue
+        if superficie is not None and not superficie[0] <= pais["superficie"] <= superficie[1]:
+            continue
+        if densidad is not None and not densidad[0] <= calcular_densidad(pais) <= densidad[1]:
+            continue
+        if participacion is not None and not participacion[0] <= calcular_participacion(pais, totales) <= participacion[1]:
+            continue
+        if nombre is not None and nombre not in pais["nombre"].lower():
+            continue
+        yield posicion
+
+def iterar_consulta(paises, consulta, indices=None, totales=None):
+    """
+    Genera, en el orden de la lista, los paises que cumplen todos los
+    filtros de la consulta (sin aplicar orden ni limite)
+    """
+    return map(lista_base(paises).__getitem__, iterar_posiciones_consulta(paises, consulta, indices, totales))
+
+@medido
+def ejecutar_consulta(paises, consulta, indices=None):
+    """
+    Ejecuta la consulta y retorna una vista con los paises resultantes
+    Con orden y limite de un solo criterio usa un heap (O(n log k))
+    """
+    totales = totales_de_consulta(paises, consulta, indices)
+    posiciones = iterar_posiciones_consulta(paises, consulta, indices, totales)
+    base = lista_base(paises)
+    orden = consulta["orden"]
+    limite = consulta["limite"]
+    
+    if orden:
+        if limite is not None and len(orden) == 1:
+            return VistaPaises(base, primeros_k_posiciones(base, posiciones, orden[0][0], limite, orden[0][1], totales))
+        filas = ordenar_paises(VistaPaises(base, list(posiciones)), orden, totales=totales)
+        if limite is not None:
+            return filas[:limite]
+        return filas
+    
+    if limite is not None:
+        posiciones = itertools.islice(posiciones, limite)
+    return VistaPaises(base, list(posiciones))
+
+def describir_consulta(consulta):
+    """Retorna un texto legible con los filtros de la consulta"""
+    partes = []
+    if consulta["continente"] is not None:
+        partes.append(f"continente {consulta['continente']}")
+    if consulta["poblacion"] is not None:
+        partes.append(f"poblacion entre {consulta['poblacion'][0]:,} y {consulta['poblacion'][1]:,}")
+    if consulta["superficie"] is not None:
+        partes.append(f"superficie entre {consulta['superficie'][0]:,} y {consulta['superficie'][1]:,} km2")
+    if consulta["densidad"] is not None:
+        partes.append(f"densidad entre {consulta['densidad'][0]:,} y {consulta['densidad'][1]:,} hab/km2")
+    if consulta["participacion"] is not None:
+        partes.append(f"participacion entre {consulta['participacion'][0]}% y {consulta['participacion'][1]}% de su continente")
+    if consulta["nombre"]:
+        partes.append(f"nombre con '{consulta['nombre']}'")
+    if consulta["orden"]:
+        partes.append(f"ordenados por {describir_criterios(consulta['orden'])}")
+    if consulta["limite"] is not None:
+        partes.append(f"primeros {consulta['limite']}")
+    if len(partes) == 0:
+        return "Todos los paises"
+    return "Paises con " + ", ".join(partes)
+
+# ============================================================================
+# FUNCIONES DE ESTADISTICAS
+# ============================================================================
+
+@medido
+def obtener_estadisticas(paises):
+    """
+    Calcula las estadisticas de los paises recorriendolos una sola vez
+    paises puede ser una lista o un iterador (por ejemplo iterar_csv)
+    Retorna un diccionario con los resultados o None si no hay datos
+    """
+    cantidad = 0
+    pais_mayor_pob = None
+    pais_menor_pob = None
+    pais_mayor_densidad = None
+    pais_menor_densidad = None
+    suma_poblacion = 0
+    suma_superficie = 0
+    continentes_count = {}
+    totales_continente = {}
+    
+    for pais in paises:
+        cantidad = cantidad + 1
+        
+        # Mayor y menor poblacion
+        if pais_mayor_pob is None or pais["poblacion"] > pais_mayor_pob["poblacion"]:
+            pais_mayor_pob = pais
+        if pais_menor_pob is None or pais["poblacion"] < pais_menor_pob["poblacion"]:
+            pais_menor_pob = pais
+        
+        # Mayor y menor densidad
+        densidad = calcular_densidad(pais)
+        if pais_mayor_densidad is None or densidad > calcular_densidad(pais_mayor_densidad):
+            pais_mayor_densidad = pais
+        if pais_menor_densidad is None or densidad < calcular_densidad(pais_menor_densidad):
+            pais_menor_densidad = pais
+        
+        # Sumas para promedios
+        suma_poblacion = suma_poblacion + pais["poblacion"]
+        suma_superficie = suma_superficie + pais["superficie"]
+        
+        # Cantidad de paises y totales por continente
+        continente = pais["continente"]
+        if continente in continentes_count:
+            continentes_count[continente] = continentes_count[continente] + 1
+        else:
+            continentes_count[continente] = 1
+        sumar_a_totales(totales_continente, continente, pais["poblacion"], pais["superficie"])
+    
+    if cantidad == 0:
+        return None
+    
+    return {
+        "cantidad": cantidad,
+        "mayor_poblacion": pais_mayor_pob,
+        "menor_poblacion": pais_menor_pob,
+        "mayor_densidad": pais_mayor_densidad,
+        "menor_densidad": pais_menor_densidad,
+        "suma_poblacion": suma_poblacion,
+        "suma_superficie": suma_superficie,
+        "promedio_poblacion": suma_poblacion / cantidad,
+        "promedio_superficie": suma_superficie / cantidad,
+        "densidad_total": densidad_de_totales(suma_poblacion, suma_superficie),
+        "por_continente": continentes_count,
+        "totales_continente": totales_continente
+    }
+
+def densidad_de_totales(poblacion, superficie):
+    """Densidad de un conjunto de paises a partir de sus totales"""
+    if superficie == 0:
+        return 0.0
+    return poblacion / superficie
+
+def crear_acumulador_estadisticas():
+    """
+    Crea un acumulador de estadisticas que se actualiza con cada alta o
+    cambio, para poder leer las estadisticas en O(1) sin recorrer la lista
+    """
+    return {
+        "cantidad": 0,
+        "suma_poblacion": 0,
+        "suma_superficie": 0,
+        "por_continente": {},
+        "totales_continente": {}
+    }
+
+def acumular_pais(acumulador, pais):
+    """Suma un pais nuevo al acumulador de estadisticas"""
+    acumulador["cantidad"] = acumulador["cantidad"] + 1
+    acumulador["suma_poblacion"] = acumulador["suma_poblacion"] + pais["poblacion"]
+    acumulador["suma_superficie"] = acumulador["suma_superficie"] + pais["superficie"]
+    
+    continente = pais["continente"]
+    if continente in acumulador["por_continente"]:
+        acumulador["por_continente"][continente] = acumulador["por_continente"][continente] + 1
+    else:
+        acumulador["por_continente"][continente] = 1
+    
+    sumar_a_totales(acumulador["totales_continente"], continente, pais["poblacion"], pais["superficie"])
+
+def acumular_cambio(acumulador, campo, valor_anterior, valor_nuevo, continente=None):
+    """
+    Ajusta las sumas del acumulador cuando cambia un valor de un pais
+    continente: el del pais, para ajustar tambien los totales por continente
+    """
+    clave = "suma_" + campo
+    if clave in acumulador:
+        acumulador[clave] = acumulador[clave] - valor_anterior + valor_nuevo
+    
+    if continente is not None and campo in ["poblacion", "superficie"]:
+        total = acumulador["totales_continente"][continente]
+        total[campo] = total[campo] - valor_anterior + valor_nuevo
+
+@medido
+def estadisticas_indexadas(paises, indices):
+    """
+    Arma las estadisticas a partir del acumulador y de los indices, sin
+    recorrer la lista. El mayor y el menor salen del indice ordenado de
+    poblacion, que sigue siendo correcto aunque se modifiquen los extremos
+    """
+    acumulador = indices["estadisticas"]
+    cantidad = acumulador["cantidad"]
+    if cantidad == 0:
+        return None
+    
+    # Ante empates se elige el primero de la lista, igual que al recorrerla
+    entradas = indices["poblacion"]
+    posicion_menor = entradas[0][1]
+    posicion_mayor = entradas[bisect_left(entradas, (entradas[-1][0],))][1]
+    
+    entradas = indices["densidad"]
+    posicion_menor_densidad = entradas[0][1]
+    posicion_mayor_densidad = entradas[bisect_left(entradas, (entradas[-1][0],))][1]
+    
+    totales_continente = {}
+    for continente in acumulador["totales_continente"]:
+        totales_continente[continente] = dict(acumulador["totales_continente"][continente])
+    
+    return {
+        "cantidad": cantidad,
+        "mayor_poblacion": paises[posicion_mayor],
+        "menor_poblacion": paises[posicion_menor],
+        "mayor_densidad": paises[posicion_mayor_densidad],
+        "menor_densidad": paises[posicion_menor_densidad],
+        "suma_poblacion": acumulador["suma_poblacion"],
+        "suma_superficie": acumulador["suma_superficie"],
+        "promedio_poblacion": acumulador["suma_poblacion"] / cantidad,
+        "promedio_superficie": acumulador["suma_superficie"] / cantidad,
+        "densidad_total": densidad_de_totales(acumulador["suma_poblacion"], acumulador["suma_superficie"]),
+        "por_continente": dict(acumulador["por_continente"]),
+        "totales_continente": totales_continente
+    }
+
+def mostrar_estadisticas(estadisticas):
+    """Muestra las estadisticas calculadas por obtener_estadisticas"""
+    if estadisticas is None:
+        print("No hay datos para calcular estadisticas.")
+        return
+    
+    pais_mayor_pob = estadisticas["mayor_poblacion"]
+    pais_menor_pob = estadisticas["menor_poblacion"]
+    continentes_count = estadisticas["por_continente"]
+    
+    print("\n" + "="*60)
+    print("ESTADISTICAS DE LOS PAISES")
+    print("="*60)
+    
+    print(f"\nPais con MAYOR poblacion:")
+    print(f"   {pais_mayor_pob['nombre']}: {pais_mayor_pob['poblacion']:,} habitantes")
+    
+    print(f"\nPais con MENOR poblacion:")
+    print(f"   {pais_menor_pob['nombre']}: {pais_menor_pob['poblacion']:,} habitantes")
+    
+    print(f"\nPromedio de poblacion: {estadisticas['promedio_poblacion']:,.0f} habitantes")
+    print(f"Promedio de superficie: {estadisticas['promedio_superficie']:,.0f} km2")
+    
+    if "densidad_total" in estadisticas:
+        pais_mayor_densidad = estadisticas["mayor_densidad"]
+        pais_menor_densidad = estadisticas["menor_densidad"]
+        print(f"\nDensidad total: {estadisticas['densidad_total']:,.1f} hab/km2")
+        print(f"Pais con MAYOR densidad: {pais_mayor_densidad['nombre']} ({calcular_densidad(pais_mayor_densidad):,.1f} hab/km2)")
+        print(f"Pais con MENOR densidad: {pais_menor_densidad['nombre']} ({calcular_densidad(pais_menor_densidad):,.1f} hab/km2)")
+    
+    print(f"\nCantidad de paises por continente:")
     for continente in continentes_count:
         print(f"   {continente}: {continentes_count[continente]} pais(es)")
     
-    print("="*60)
+    if "totales_continente" in estadisticas:
+        totales = estadisticas["totales_continente"]
+        print("\nPoblacion y densidad por continente:")
+        for continente in totales:
+            total = totales[continente]
+            porcentaje = 0.0
+            if estadisticas["suma_poblacion"] > 0:
+                porcentaje = total["poblacion"] * 100 / estadisticas["suma_poblacion"]
+            print(f"   {continente}: {total['poblacion']:,} habitantes ({porcentaje:.1f}% del total), "
+                  f"{densidad_de_totales(total['poblacion'], total['superficie']):,.1f} hab/km2")
+    
+    print("="*60)
+
+def calcular_estadisticas(paises, indices=None):
+    """
+    Calcula y muestra estadisticas de los paises
+    Si se pasan los indices se usan las estadisticas ya acumuladas
+    """
+    if indices is not None:
+        mostrar_estadisticas(estadisticas_indexadas(paises, indices))
+    else:
+        mostrar_estadisticas(obtener_estadisticas(paises))
+
+# ============================================================================
+# AGRUPACION
+# ============================================================================
+#
+# agrupar recorre los paises una sola vez (lista, iterar_csv o cualquier
+# iterador) y arma un agregado por grupo. Cada agregado guarda, por campo,
+# cantidad, suma, minimo y maximo exactos y un bosquejo de cuantiles KLL
+# (ver ESTADISTICAS APROXIMADAS) para la mediana y los percentiles, asi que
+# ocupa lo mismo sin importar cuantas filas tenga el grupo. Mientras el
+# bosquejo no compacta (grupos de hasta KLL_K filas) guarda todos los
+# valores y los percentiles son exactos; despues el error de rango es
+# error_rango_kll(KLL_K). Los valores se pasan al bosquejo de a lotes de
+# KLL_K. Los agregados se pueden combinar (combinar_agrupaciones), asi que
+# el mismo calculo se puede repartir en fragmentos o en varios procesos.
+
+def crear_agregado(campos):
+    """Crea un agregado vacio para los campos indicados"""
+    agregado = {"cantidad": 0}
+    for campo in campos:
+        tipo = "q"
+        if campo in CAMPOS_DERIVADOS:
+            tipo = "d"
+        agregado[campo] = {"suma": 0, "minimo": None, "maximo": None, "cuantiles": crear_kll(),
+                           "pendientes": array(tipo)}
+    return agregado
+
+def volcar_pendientes(resumen):
+    """Pasa al bosquejo de cuantiles los valores acumulados del lote"""
+    if len(resumen["pendientes"]) > 0:
+        kll_agregar(resumen["cuantiles"], resumen["pendientes"].tolist())
+        del resumen["pendientes"][:]
+
+def acumular_en_agregado(agregado, pais, campos):
+    """Suma un pais al agregado"""
+    agregado["cantidad"] = agregado["cantidad"] + 1
+    for campo in campos:
+        valor = valor_campo(pais, campo)
+        resumen = agregado[campo]
+        resumen["suma"] = resumen["suma"] + valor
+        if resumen["minimo"] is None or valor < resumen["minimo"]:
+            resumen["minimo"] = valor
+        if resumen["maximo"] is None or valor > resumen["maximo"]:
+            resumen["maximo"] = valor
+        resumen["pendientes"].append(valor)
+    
+    if agregado["cantidad"] % KLL_K == 0:
+        for campo in campos:
+            volcar_pendientes(agregado[campo])
+
+def combinar_agregados(destino, origen, campos):
+    """Suma el agregado origen al destino (el origen no cambia)"""
+    destino["cantidad"] = destino["cantidad"] + origen["cantidad"]
+    for campo in campos:
+        resumen = destino[campo]
+        otro = origen[campo]
+        if otro["minimo"] is None:
+            continue
+        resumen["suma"] = resumen["suma"] + otro["suma"]
+        if resumen["minimo"] is None or otro["minimo"] < resumen["minimo"]:
+            resumen["minimo"] = otro["minimo"]
+        if resumen["maximo"] is None or otro["maximo"] > resumen["maximo"]:
+            resumen["maximo"] = otro["maximo"]
+        combinar_kll(resumen["cuantiles"], otro["cuantiles"])
+        resumen["pendientes"].extend(otro["pendientes"])
+        volcar_pendientes(resumen)
+
+def validar_agrupacion(por, campos):
+    """Valida el campo de agrupacion y los campos a resumir"""
+    if por not in CAMPOS_AGRUPABLES:
+        return False, f"No se puede agrupar por '{por}'. Campos validos: {', '.join(CAMPOS_AGRUPABLES)}"
+    for campo in campos:
+        if campo not in CAMPOS_AGREGABLES:
+            return False, f"No se puede resumir '{campo}'. Campos validos: {', '.join(CAMPOS_AGREGABLES)}"
+    return True, ""
+
+@medido
+def agrupar(paises, por="continente", campos=None):
+    """
+    Agrupa los paises por el campo indicado en una sola pasada
+    paises puede ser una lista o un iterador (por ejemplo iterar_csv)
+    campos: campos a resumir (por defecto poblacion y superficie)
+    Retorna un diccionario grupo -> agregado, en orden de aparicion
+    """
+    if campos is None:
+        campos = ["poblacion", "superficie"]
+    
+    if USAR_NUMPY and isinstance(paises, PaisesTabla) and por == "continente":
+        return numpy_agrupar_tabla(paises, campos)
+    
+    grupos = {}
+    for pais in paises:
+        grupo = pais[por]
+        agregado = grupos.get(grupo)
+        if agregado is None:
+            agregado = crear_agregado(campos)
+            grupos[grupo] = agregado
+        acumular_en_agregado(agregado, pais, campos)
+    return grupos
+
+def combinar_agrupaciones(destino, origen, campos):
+    """Une los grupos de origen a los de destino (agrega los grupos nuevos)"""
+    for grupo in origen:
+        if grupo not in destino:
+            destino[grupo] = crear_agregado(campos)
+        combinar_agregados(destino[grupo], origen[grupo], campos)
+    return destino
+
+def iterar_fragmento(ruta, inicio, fin):
+    """Genera los paises (diccionarios) de un rango de bytes del CSV"""
+    fragmento = parsear_fragmento(ruta, inicio, fin)
+    columnas = zip(fragmento["nombres"], fragmento["poblaciones"],
+                   fragmento["superficies"], fragmento["continentes"])
+    for nombre, poblacion, superficie, continente in columnas:
+        yield {"nombre": nombre, "poblacion": poblacion, "superficie": superficie, "continente": continente}
+
+def agrupar_fragmento(ruta, inicio, fin, por, campos):
+    """
+    Agrupa un rango de bytes del CSV (se ejecuta en un proceso aparte)
+    Retorna la agrupacion del fragmento
+    """
+    return agrupar(iterar_fragmento(ruta, inicio, fin), por, campos)
+
+@medido
+def agrupar_csv_paralelo(ruta, por="continente", campos=None, trabajadores=None):
+    """
+    Agrupa el CSV sin cargarlo, repartiendo los fragmentos entre procesos
+    y combinando sus agregados en el orden del archivo
+    Si hay cambios pendientes en el diario se usa la lectura en streaming
+    (iterar_csv), que los aplica. A diferencia de la carga, los nombres
+    repetidos en distintos fragmentos no se descartan
+    """
+    if campos is None:
+        campos = ["poblacion", "superficie"]
+    if not os.path.exists(ruta):
+        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
+        return {}
+    
+    altas, cambios = leer_diario(ruta)
+    if len(altas) > 0 or len(cambios) > 0:
+        return agrupar(iterar_csv(ruta), por, campos)
+    
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    
+    rangos = dividir_csv(ruta, trabajadores * 4)
+    argumentos = [[ruta] * len(rangos), [rango[0] for rango in rangos], [rango[1] for rango in rangos],
+                  [por] * len(rangos), [campos] * len(rangos)]
+    
+    grupos = {}
+    if trabajadores == 1:
+        for parcial in map(agrupar_fragmento, *argumentos):
+            combinar_agrupaciones(grupos, parcial, campos)
+        return grupos
+    
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        for parcial in ejecutor.map(agrupar_fragmento, *argumentos):
+            combinar_agrupaciones(grupos, parcial, campos)
+    return grupos
+
+def percentil_interpolado(ordenados, porcentaje):
+    """
+    Percentil de una lista ordenada, interpolando entre los dos valores
+    mas cercanos (el percentil 50 es la mediana)
+    """
+    posicion = (len(ordenados) - 1) * porcentaje / 100
+    i = int(posicion)
+    if i + 1 >= len(ordenados):
+        return ordenados[i]
+    return ordenados[i] + (ordenados[i + 1] - ordenados[i]) * (posicion - i)
+
+def percentil_kll(kll, porcentaje):
+    """
+    Percentil de un bosquejo de cuantiles: exacto (interpolado) si todavia
+    guarda todos los valores, aproximado si ya compacto
+    """
+    if len(kll["niveles"]) == 1:
+        return percentil_interpolado(sorted(kll["niveles"][0]), porcentaje)
+    return cuantiles_kll(kll, [porcentaje / 100])[0]
+
+def resumir_agrupacion(grupos, campos, percentiles=None):
+    """
+    Convierte los agregados en filas (una por grupo y campo) con cantidad,
+    suma, promedio, minimo, maximo, mediana y los percentiles pedidos
+    (exactos mientras el bosquejo del grupo no compacto)
+    """
+    if percentiles is None:
+        percentiles = PERCENTILES_INFORME
+    
+    filas = []
+    for grupo in grupos:
+        agregado = grupos[grupo]
+        for campo in campos:
+            resumen = agregado[campo]
+            if agregado["cantidad"] == 0:
+                continue
+            volcar_pendientes(resumen)
+            kll = resumen["cuantiles"]
+            fila = {
+                "grupo": grupo,
+                "campo": campo,
+                "cantidad": agregado["cantidad"],
+                "suma": resumen["suma"],
+                "promedio": resumen["suma"] / agregado["cantidad"],
+                "minimo": resumen["minimo"],
+                "maximo": resumen["maximo"],
+                "mediana": percentil_kll(kll, 50)
+            }
+            for porcentaje in percentiles:
+                fila[f"p{porcentaje}"] = percentil_kll(kll, porcentaje)
+            filas.append(fila)
+    return filas
+
+def formatear_numero(valor):
+    """Formatea un numero con separador de miles (un decimal si no es entero)"""
+    if isinstance(valor, int):
+        return f"{valor:,}"
+    return f"{valor:,.1f}"
+
+def mostrar_agrupacion(filas, titulo):
+    """Muestra las filas de resumir_agrupacion, una tabla por campo"""
+    if len(filas) == 0:
+        print("No hay datos para agrupar.")
+        return
+    
+    columnas = ["cantidad", "suma", "promedio", "minimo", "mediana", "maximo"]
+    for clave in filas[0]:
+        if clave.startswith("p") and clave[1:].isdigit():
+            columnas.append(clave)
+    
+    campos = []
+    for fila in filas:
+        if fila["campo"] not in campos:
+            campos.append(fila["campo"])
+    
+    for campo in campos:
+        filas_campo = []
+        for fila in filas:
+            if fila["campo"] == campo:
+                filas_campo.append(fila)
+        
+        # Cada columna toma el ancho de su valor mas largo
+        anchos = {}
+        for columna in columnas:
+            anchos[columna] = len(columna)
+            for fila in filas_campo:
+                anchos[columna] = max(anchos[columna], len(formatear_numero(fila[columna])))
+        
+        encabezado = f"{'Grupo':<12}"
+        for columna in columnas:
+            encabezado = encabezado + f" {columna.capitalize():>{anchos[columna]}}"
+        ancho = len(encabezado)
+        
+        print("\n" + "="*ancho)
+        print(f"  {titulo}: {campo}")
+        print("="*ancho)
+        print(encabezado)
+        print("-"*ancho)
+        for fila in filas_campo:
+            linea = f"{str(fila['grupo']):<12}"
+            for columna in columnas:
+                linea = linea + f" {formatear_numero(fila[columna]):>{anchos[columna]}}"
+            print(linea)
+        print("="*ancho)
+
+# ============================================================================
+# ESTADISTICAS APROXIMADAS
+# ============================================================================
+#
+# Mediana, percentiles y cantidad de nombres distintos con memoria acotada,
+# para archivos demasiado grandes para cargar o agrupar de forma exacta.
+# Un bosquejo resume los paises en una sola pasada:
+#   - cuantiles: bosquejo KLL por campo (unos 3 * KLL_K valores, sin
+#     importar la cantidad de filas), con error de rango acotado
+#   - nombres distintos: HyperLogLog (2**HLL_PRECISION registros de un
+#     byte), con error relativo 1.04 / raiz(registros)
+#   - vista previa: muestra al azar por reservorio
+# Cantidad, suma, promedio, minimo y maximo se siguen calculando exactos.
+# Los bosquejos se pueden combinar, asi que el calculo se reparte entre
+# procesos igual que la agrupacion. Con los datos cargados e indexados no
+# hace falta aproximar: los percentiles salen de los indices ordenados.
+# Cada resultado es una fila con su valor, el intervalo que lo contiene con
+# CONFIANZA_APROXIMADA de probabilidad y el metodo usado.
+
+def error_rango_kll(k):
+    """
+    Error de rango normalizado de un bosquejo KLL de tamano k: la fraccion
+    de filas que puede haber entre el valor informado y el real
+    """
+    return 2.296 / k ** 0.9723
+
+def crear_kll(k=KLL_K, semilla=0):
+    """Crea un bosquejo de cuantiles vacio"""
+    kll = {"k": k, "niveles": [[]], "cantidad": 0, "retenidos": 0, "capacidad": 0,
+           "minimo": None, "maximo": None, "azar": random.Random(semilla)}
+    kll["capacidad"] = capacidad_kll(kll)
+    return kll
+
+def capacidad_nivel_kll(kll, nivel):
+    """Tamano de referencia de un nivel: los de abajo son mas chicos"""
+    altura = len(kll["niveles"]) - nivel - 1
+    return max(8, math.ceil(kll["k"] * (2 / 3) ** altura))
+
+def capacidad_kll(kll):
+    """Cantidad de valores que se guardan antes de compactar algun nivel"""
+    capacidad = 0
+    for nivel in range(len(kll["niveles"])):
+        capacidad = capacidad + capacidad_nivel_kll(kll, nivel)
+    return capacidad
+
+def compactar_kll(kll):
+    """
+    Mientras el bosquejo este lleno, compacta el nivel mas bajo que paso
+    su tamano: lo ordena y pasa la mitad de sus valores (los pares o los
+    impares, al azar) al nivel de arriba, donde cada valor representa el
+    doble de filas
+    """
+    niveles = kll["niveles"]
+    while kll["retenidos"] > kll["capacidad"]:
+        nivel = 0
+        while len(niveles[nivel]) < capacidad_nivel_kll(kll, nivel):
+            nivel = nivel + 1
+        if nivel + 1 == len(niveles):
+            niveles.append([])
+            kll["capacidad"] = capacidad_kll(kll)
+        
+        valores = sorted(niveles[nivel])
+        resto = []
+        if len(valores) % 2 == 1:
+            resto.append(valores.pop())
+        promovidos = valores[kll["azar"].getrandbits(1)::2]
+        niveles[nivel + 1].extend(promovidos)
+        niveles[nivel] = resto
+        kll["retenidos"] = kll["retenidos"] - len(valores) + len(promovidos)
+
+def kll_agregar(kll, valores):
+    """
+    Agrega una lista de valores al bosquejo de cuantiles. Conviene pasarlos
+    de a lotes: se compacta una vez por lote en lugar de una vez cada pocos
+    valores
+    """
+    if len(valores) == 0:
+        return
+    kll["niveles"][0].extend(valores)
+    kll["cantidad"] = kll["cantidad"] + len(valores)
+    kll["retenidos"] = kll["retenidos"] + len(valores)
+    minimo = min(valores)
+    maximo = max(valores)
+    if kll["minimo"] is None or minimo < kll["minimo"]:
+        kll["minimo"] = minimo
+    if kll["maximo"] is None or maximo > kll["maximo"]:
+        kll["maximo"] = maximo
+    if kll["retenidos"] > kll["capacidad"]:
+        compactar_kll(kll)
+
+def combinar_kll(destino, origen):
+    """Suma el bosquejo origen al destino (el origen no cambia)"""
+    if origen["cantidad"] == 0:
+        return
+    while len(destino["niveles"]) < len(origen["niveles"]):
+        destino["niveles"].append([])
+    for nivel in range(len(origen["niveles"])):
+        destino["niveles"][nivel].extend(origen["niveles"][nivel])
+    destino["cantidad"] = destino["cantidad"] + origen["cantidad"]
+    destino["retenidos"] = destino["retenidos"] + origen["retenidos"]
+    destino["capacidad"] = capacidad_kll(destino)
+    if destino["minimo"] is None or origen["minimo"] < destino["minimo"]:
+        destino["minimo"] = origen["minimo"]
+    if destino["maximo"] is None or origen["maximo"] > destino["maximo"]:
+        destino["maximo"] = origen["maximo"]
+    compactar_kll(destino)
+
+def cuantiles_kll(kll, fracciones):
+    """
+    Valores aproximados de los cuantiles pedidos (fracciones entre 0 y 1)
+    Fuera de ese rango se usan el minimo o el maximo exactos
+    """
+    pares = []
+    for nivel in range(len(kll["niveles"])):
+        peso = 2 ** nivel
+        for valor in kll["niveles"][nivel]:
+            pares.append((valor, peso))
+    pares.sort()
+    total = 0
+    for valor, peso in pares:
+        total = total + peso
+    
+    resultados = []
+    for fraccion in fracciones:
+        if fraccion <= 0:
+            resultados.append(kll["minimo"])
+            continue
+        if fraccion >= 1:
+            resultados.append(kll["maximo"])
+            continue
+        objetivo = fraccion * total
+        acumulado = 0
+        encontrado = pares[-1][0]
+        for valor, peso in pares:
+            acumulado = acumulado + peso
+            if acumulado >= objetivo:
+                encontrado = valor
+                break
+        resultados.append(encontrado)
+    return resultados
+
+def crear_hll(precision=HLL_PRECISION):
+    """Crea un contador de distintos (HyperLogLog) vacio"""
+    return {"precision": precision, "registros": bytearray(2 ** precision)}
+
+def hll_agregar(hll, texto):
+    """Anota un texto en el contador de distintos"""
+    resumen = hashlib.blake2b(texto.encode("utf-8"), digest_size=8).digest()
+    valor = int.from_bytes(resumen, "big")
+    bits = 64 - hll["precision"]
+    registro = valor >> bits
+    resto = valor & ((1 << bits) - 1)
+    rango = bits - resto.bit_length() + 1
+    if rango > hll["registros"][registro]:
+        hll["registros"][registro] = rango
+
+def combinar_hll(destino, origen):
+    """Suma el contador origen al destino (el origen no cambia)"""
+    destino["registros"] = bytearray(map(max, destino["registros"], origen["registros"]))
+
+def estimar_hll(hll):
+    """Estimacion de la cantidad de textos distintos anotados"""
+    registros = hll["registros"]
+    m = len(registros)
+    suma = 0.0
+    for rango in registros:
+        suma = suma + 2.0 ** -rango
+    estimacion = 0.7213 / (1 + 1.079 / m) * m * m / suma
+    
+    # Con pocos valores se cuentan los registros vacios (conteo lineal)
+    vacios = registros.count(0)
+    if estimacion <= 2.5 * m and vacios > 0:
+        estimacion = m * math.log(m / vacios)
+    return estimacion
+
+def error_hll(hll):
+    """Error relativo estandar del contador de distintos"""
+    return 1.04 / math.sqrt(len(hll["registros"]))
+
+def azar_positivo(azar):
+    """Numero al azar en el intervalo abierto (0, 1)"""
+    valor = azar.random()
+    while valor == 0.0:
+        valor = azar.random()
+    return valor
+
+def crear_reservorio(tamano, semilla=None):
+    """
+    Crea una muestra al azar por reservorio: guarda tamano elementos de
+    un recorrido de largo desconocido, todos con la misma probabilidad
+    """
+    return {"tamano": tamano, "muestra": [], "vistos": 0, "proximo": 0, "peso": 0.0,
+            "azar": random.Random(semilla)}
+
+def saltar_reservorio(reservorio):
+    """
+    Elige cual sera el proximo elemento que entra a la muestra. Se salta
+    directo a el en lugar de sortear uno por uno (algoritmo L de Li)
+    """
+    azar = reservorio["azar"]
+    reservorio["peso"] = reservorio["peso"] * math.exp(math.log(azar_positivo(azar)) / reservorio["tamano"])
+    salto = 0
+    if reservorio["peso"] < 1.0:
+        salto = math.floor(math.log(azar_positivo(azar)) / math.log(1 - reservorio["peso"]))
+    reservorio["proximo"] = reservorio["vistos"] + salto
+
+def reservorio_agregar(reservorio, elemento):
+    """Ofrece un elemento a la muestra"""
+    posicion = reservorio["vistos"]
+    reservorio["vistos"] = posicion + 1
+    muestra = reservorio["muestra"]
+    
+    if len(muestra) < reservorio["tamano"]:
+        muestra.append(elemento)
+        if len(muestra) == reservorio["tamano"]:
+            reservorio["peso"] = 1.0
+            saltar_reservorio(reservorio)
+    elif posicion == reservorio["proximo"]:
+        muestra[reservorio["azar"].randrange(reservorio["tamano"])] = elemento
+        saltar_reservorio(reservorio)
+
+def combinar_reservorios(destino, origen):
+    """
+    Une dos muestras en una muestra al azar del recorrido completo: cada
+    lugar se toma de una u otra segun la cantidad de elementos que vio cada
+    una. El destino sigue aceptando elementos despues de combinar
+    """
+    azar = destino["azar"]
+    izquierda = list(destino["muestra"])
+    derecha = list(origen["muestra"])
+    azar.shuffle(izquierda)
+    azar.shuffle(derecha)
+    vistos_izquierda = destino["vistos"]
+    vistos_derecha = origen["vistos"]
+    
+    muestra = []
+    while len(muestra) < destino["tamano"] and (len(izquierda) > 0 or len(derecha) > 0):
+        if len(derecha) == 0 or (len(izquierda) > 0 and
+                                 azar.random() * (vistos_izquierda + vistos_derecha) < vistos_izquierda):
+            muestra.append(izquierda.pop())
+            vistos_izquierda = vistos_izquierda - 1
+        else:
+            muestra.append(derecha.pop())
+            vistos_derecha = vistos_derecha - 1
+    
+    destino["muestra"] = muestra
+    destino["vistos"] = destino["vistos"] + origen["vistos"]
+    if len(muestra) == destino["tamano"]:
+        destino["peso"] = destino["tamano"] / destino["vistos"]
+        saltar_reservorio(destino)
+
+def muestra_uniforme(paises, tamano, semilla=None):
+    """
+    Muestra al azar de tamano paises, en el orden en que aparecen
+    Con una lista o una vista se sortean posiciones sin recorrerla; con un
+    iterador (por ejemplo iterar_csv) se usa un reservorio
+    """
+    if isinstance(paises, (list, VistaPaises, PaisesTabla)):
+        if len(paises) <= tamano:
+            return list(paises)
+        posiciones = sorted(random.Random(semilla).sample(range(len(paises)), tamano))
+        return [paises[posicion] for posicion in posiciones]
+    
+    reservorio = crear_reservorio(tamano, semilla)
+    for pais in paises:
+        reservorio_agregar(reservorio, pais)
+    return reservorio["muestra"]
+
+def crear_bosquejo(campos, semilla=0, tamano_muestra=FILAS_POR_PAGINA):
+    """Crea un bosquejo vacio para los campos indicados"""
+    bosquejo = {
+        "cantidad": 0,
+        "nombres": crear_hll(),
+        "muestra": crear_reservorio(tamano_muestra, semilla)
+    }
+    for campo in campos:
+        bosquejo[campo] = {"suma": 0, "cuantiles": crear_kll(semilla=semilla)}
+    return bosquejo
+
+def combinar_bosquejos(destino, origen, campos):
+    """Suma el bosquejo origen al destino (el origen no cambia)"""
+    destino["cantidad"] = destino["cantidad"] + origen["cantidad"]
+    combinar_hll(destino["nombres"], origen["nombres"])
+    combinar_reservorios(destino["muestra"], origen["muestra"])
+    for campo in campos:
+        destino[campo]["suma"] = destino[campo]["suma"] + origen[campo]["suma"]
+        combinar_kll(destino[campo]["cuantiles"], origen[campo]["cuantiles"])
+    return destino
+
+@medido
+def bosquejar(paises, campos=None, semilla=0):
+    """
+    Resume los paises en un bosquejo, en una sola pasada y con memoria
+    acotada. paises puede ser una lista o un iterador (por ejemplo iterar_csv)
+    """
+    if campos is None:
+        campos = CAMPOS_AGREGABLES
+    
+    bosquejo = crear_bosquejo(campos, semilla)
+    for lote in iterar_lotes(paises, KLL_K):
+        bosquejo["cantidad"] = bosquejo["cantidad"] + len(lote)
+        for pais in lote:
+            hll_agregar(bosquejo["nombres"], normalizar_nombre(pais["nombre"]))
+            reservorio_agregar(bosquejo["muestra"], pais)
+        for campo in campos:
+            valores = [valor_campo(pais, campo) for pais in lote]
+            bosquejo[campo]["suma"] = bosquejo[campo]["suma"] + sum(valores)
+            kll_agregar(bosquejo[campo]["cuantiles"], valores)
+    return bosquejo
+
+def bosquejar_fragmento(ruta, inicio, fin, campos):
+    """
+    Resume un rango de bytes del CSV (se ejecuta en un proceso aparte)
+    Cada fragmento usa su propia semilla para que los sorteos no se repitan
+    """
+    return bosquejar(iterar_fragmento(ruta, inicio, fin), campos, inicio)
+
+@medido
+def bosquejar_csv_paralelo(ruta, campos=None, trabajadores=None):
+    """
+    Resume el CSV sin cargarlo, repartiendo los fragmentos entre procesos
+    Igual que agrupar_csv_paralelo, con cambios pendientes en el diario se
+    usa la lectura en streaming y los nombres repetidos no se descartan
+    """
+    if campos is None:
+        campos = CAMPOS_AGREGABLES
+    if not os.path.exists(ruta):
+        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
+        return crear_bosquejo(campos)
+    
+    altas, cambios = leer_diario(ruta)
+    if len(altas) > 0 or len(cambios) > 0:
+        return bosquejar(iterar_csv(ruta), campos)
+    
+    if trabajadores is None:
+        trabajadores = os.cpu_count() or 1
+    
+    rangos = dividir_csv(ruta, trabajadores * 4)
+    argumentos = [[ruta] * len(rangos), [rango[0] for rango in rangos], [rango[1] for rango in rangos],
+                  [campos] * len(rangos)]
+    
+    bosquejo = crear_bosquejo(campos)
+    if trabajadores == 1:
+        for parcial in map(bosquejar_fragmento, *argumentos):
+            combinar_bosquejos(bosquejo, parcial, campos)
+        return bosquejo
+    
+    with ProcessPoolExecutor(max_workers=trabajadores) as ejecutor:
+        for parcial in ejecutor.map(bosquejar_fragmento, *argumentos):
+            combinar_bosquejos(bosquejo, parcial, campos)
+    return bosquejo
+
+def fila_aproximada(medida, campo, valor, cota_inferior=None, cota_superior=None, error=0.0, metodo="exacto"):
+    """
+    Arma una fila de resultado aproximado. error es el error de rango (para
+    percentiles) o el error relativo (para distintos) con el que se
+    calcularon las cotas; sin cotas el valor es exacto
+    """
+    if cota_inferior is None:
+        cota_inferior = valor
+    if cota_superior is None:
+        cota_superior = valor
+    return {
+        "medida": medida,
+        "campo": campo,
+        "valor": valor,
+        "cota_inferior": cota_inferior,
+        "cota_superior": cota_superior,
+        "error": round(error, 6),
+        "confianza": CONFIANZA_APROXIMADA,
+        "metodo": metodo
+    }
+
+def percentiles_aproximados(percentiles=None):
+    """Percentiles que se informan: la mediana y los de PERCENTILES_INFORME"""
+    if percentiles is None:
+        percentiles = PERCENTILES_INFORME
+    return sorted(set([50] + list(percentiles)))
+
+def resumir_bosquejo(bosquejo, campos, percentiles=None):
+    """
+    Convierte el bosquejo en filas (ver fila_aproximada). Cada percentil
+    va con el intervalo de valores entre los rangos p - error y p + error
+    """
+    cantidad = bosquejo["cantidad"]
+    filas = [fila_aproximada("cantidad", "paises", cantidad)]
+    if cantidad == 0:
+        return filas
+    
+    for campo in campos:
+        kll = bosquejo[campo]["cuantiles"]
+        error = error_rango_kll(kll["k"])
+        filas.append(fila_aproximada("promedio", campo, bosquejo[campo]["suma"] / cantidad))
+        filas.append(fila_aproximada("minimo", campo, kll["minimo"]))
+        for porcentaje in percentiles_aproximados(percentiles):
+            if len(kll["niveles"]) == 1:
+                # Sin compactar todavia el bosquejo guarda todos los valores
+                filas.append(fila_aproximada(f"p{porcentaje}", campo, percentil_kll(kll, porcentaje)))
+                continue
+            fraccion = porcentaje / 100
+            valor, inferior, superior = cuantiles_kll(kll, [fraccion, fraccion - error, fraccion + error])
+            filas.append(fila_aproximada(f"p{porcentaje}", campo, valor, inferior, superior, error, "kll"))
+        filas.append(fila_aproximada("maximo", campo, kll["maximo"]))
+    
+    hll = bosquejo["nombres"]
+    error = Z_CONFIANZA * error_hll(hll)
+    estimacion = estimar_hll(hll)
+    filas.append(fila_aproximada("distintos", "nombre", min(round(estimacion), cantidad),
+                                 max(1, math.floor(estimacion * (1 - error))),
+                                 min(cantidad, math.ceil(estimacion * (1 + error))), error, "hll"))
+    return filas
+
+def percentil_de_indice(entradas, porcentaje):
+    """Como percentil_interpolado, sobre un indice ordenado de (valor, posicion)"""
+    posicion = (len(entradas) - 1) * porcentaje / 100
+    i = int(posicion)
+    if i + 1 >= len(entradas):
+        return entradas[i][0]
+    return entradas[i][0] + (entradas[i + 1][0] - entradas[i][0]) * (posicion - i)
+
+@medido
+def resumir_indices(paises, indices, percentiles=None):
+    """
+    Las mismas filas que resumir_bosquejo, exactas y sin recorrer la lista:
+    los percentiles salen de los indices ordenados y los distintos del
+    indice de nombres
+    """
+    acumulador = indices["estadisticas"]
+    cantidad = acumulador["cantidad"]
+    filas = [fila_aproximada("cantidad", "paises", cantidad, metodo="indice")]
+    if cantidad == 0:
+        return filas
+    
+    for campo in CAMPOS_INDEXADOS:
+        entradas = indices[campo]
+        suma = acumulador.get("suma_" + campo)
+        if suma is not None:
+            filas.append(fila_aproximada("promedio", campo, suma / cantidad, metodo="indice"))
+        filas.append(fila_aproximada("minimo", campo, entradas[0][0], metodo="indice"))
+        for porcentaje in percentiles_aproximados(percentiles):
+            filas.append(fila_aproximada(f"p{porcentaje}", campo, percentil_de_indice(entradas, porcentaje),
+                                         metodo="indice"))
+        filas.append(fila_aproximada("maximo", campo, entradas[-1][0], metodo="indice"))
+    
+    filas.append(fila_aproximada("distintos", "nombre", len(indices["nombres"]), metodo="indice"))
+    return filas
+
+def estadisticas_aproximadas(paises, indices=None, percentiles=None):
+    """
+    Filas de estadisticas con cota de error: exactas desde los indices si
+    estan, o aproximadas con un bosquejo de una pasada si no
+    """
+    if indices is not None:
+        return resumir_indices(paises, indices, percentiles)
+    return resumir_bosquejo(bosquejar(paises), CAMPOS_AGREGABLES, percentiles)
+
+def mostrar_estadisticas_aproximadas(filas, titulo="Estadisticas aproximadas"):
+    """Muestra las filas de estadisticas_aproximadas con su intervalo"""
+    lineas = []
+    for fila in filas:
+        intervalo = ""
+        if fila["cota_inferior"] != fila["cota_superior"]:
+            intervalo = f"{formatear_numero(fila['cota_inferior'])} a {formatear_numero(fila['cota_superior'])}"
+        lineas.append([fila["medida"], fila["campo"], formatear_numero(fila["valor"]), intervalo, fila["metodo"]])
+    
+    encabezados = ["Medida", "Campo", "Valor", f"Intervalo ({CONFIANZA_APROXIMADA:.0%})", "Metodo"]
+    anchos = []
+    for columna in range(len(encabezados)):
+        ancho = len(encabezados[columna])
+        for linea in lineas:
+            ancho = max(ancho, len(linea[columna]))
+        anchos.append(ancho)
+    
+    textos = []
+    for valores in [encabezados] + lineas:
+        textos.append(f"{valores[0]:<{anchos[0]}} {valores[1]:<{anchos[1]}} {valores[2]:>{anchos[2]}} "
+                      f"{valores[3]:>{anchos[3]}} {valores[4]:<{anchos[4]}}")
+    
+    ancho = len(textos[0])
+    print("\n" + "="*ancho)
+    print(f"  {titulo}")
+    print("="*ancho)
+    print(textos[0])
+    print("-"*ancho)
+    for texto in textos[1:]:
+        print(texto)
+    print("="*ancho)
+
+# ============================================================================
+# TABLA COLUMNAR COMPACTA
+# ============================================================================
+#
+# Representacion alternativa a la lista de diccionarios pensada para
+# conjuntos de millones de filas. Cada campo se guarda en una columna:
+#   - poblacion y superficie en arreglos de enteros de 64 bits
+#   - continente codificado como un entero chico que apunta a "continentes"
+#   - los nombres empaquetados en un unico bloque de bytes UTF-8, con el
+#     desplazamiento donde empieza cada uno en "inicio_nombres"
+# Las filas se identifican por su posicion (indice) dentro de la tabla.
+
+def crear_tabla():
+    """Crea una tabla columnar vacia"""
+    return {
+        "nombres": bytearray(),
+        "inicio_nombres": array("q", [0]),
+        "poblacion": array("q"),
+        "superficie": array("q"),
+        "continente": array("H"),
+        "continentes": [],
+        "codigos_continente": {},
+        "indice_nombres": None
+    }
+
+def tabla_cantidad(tabla):
+    """Retorna la cantidad de filas de la tabla"""
+    return len(tabla["poblacion"])
+
+def tabla_agregar(tabla, nombre, poblacion, superficie, continente):
+    """
+    Agrega una fila al final de la tabla
+    Retorna la posicion de la fila agregada
+    """
+    # Codificar el continente (se agrega al diccionario si es nuevo)
+    codigo = tabla["codigos_continente"].get(continente)
+    if codigo is None:
+        codigo = len(tabla["continentes"])
+        tabla["continentes"].append(continente)
+        tabla["codigos_continente"][continente] = codigo
+    
+    tabla["nombres"] += nombre.encode("utf-8")
+    tabla["inicio_nombres"].append(len(tabla["nombres"]))
+    tabla["poblacion"].append(poblacion)
+    tabla["superficie"].append(superficie)
+    tabla["continente"].append(codigo)
+    
+    posicion = len(tabla["poblacion"]) - 1
+    # El indice de nombres de tabla_buscar_exacto, si ya se armo
+    indice_nombres = tabla.get("indice_nombres")
+    if indice_nombres is not None:
+        clave = normalizar_nombre(nombre)
+        if clave not in indice_nombres:
+            indice_nombres[clave] = posicion
+    
+    return posicion
+
+def tabla_desde_paises(paises):
+    """
+    Construye una tabla columnar a partir de una lista o iterador de paises
+    Con iterar_csv permite cargar el CSV sin crear la lista de diccionarios
+    """
+    tabla = crear_tabla()
+    for pais in paises:
+        tabla_agregar(tabla, pais["nombre"], pais["poblacion"], pais["superficie"], pais["continente"])
+    return tabla
+
+@medido
+def cargar_csv_columnar(ruta):
+    """Carga el archivo CSV directamente en una tabla columnar"""
+    return tabla_desde_paises(iterar_csv(ruta, sin_repetidos=True))
+
+def tabla_nombre(tabla, posicion):
+    """Retorna el nombre de la fila indicada"""
+    inicio = tabla["inicio_nombres"]
+    return str(tabla["nombres"][inicio[posicion]:inicio[posicion + 1]], "utf-8")
+
+def tabla_iterar_nombres(tabla, desde=0, hasta=None):
+    """Genera en orden los nombres de las filas [desde, hasta) (por defecto todas)"""
+    if hasta is None:
+        hasta = tabla_cantidad(tabla)
+    inicio = tabla["inicio_nombres"]
+    nombres = tabla["nombres"][inicio[desde]:inicio[hasta]]
+    base = inicio[desde]
+    
+    # Si todo es ASCII cada byte es un caracter: se decodifica una sola vez
+    texto = str(nombres, "utf-8")
+    if len(texto) == len(nombres):
+        for i in range(desde, hasta):
+            yield texto[inicio[i] - base:inicio[i + 1] - base]
+        return
+    
+    for i in range(desde, hasta):
+        yield str(nombres[inicio[i] - base:inicio[i + 1] - base], "utf-8")
+
+def tabla_iterar_paises(tabla, desde=0, hasta=None):
+    """Genera en orden las filas [desde, hasta) (por defecto todas) como diccionarios de pais"""
+    if hasta is None:
+        hasta = tabla_cantidad(tabla)
+    continentes = tabla["continentes"]
+    columnas = zip(tabla_iterar_nombres(tabla, desde, hasta), tabla["poblacion"][desde:hasta],
+                   tabla["superficie"][desde:hasta], tabla["continente"][desde:hasta])
+    for nombre, poblacion, superficie, codigo in columnas:
+        yield {
+            "nombre": nombre,
+            "poblacion": poblacion,
+            "superficie": superficie,
+            "continente": continentes[codigo]
+        }
+
+def tabla_fila(tabla, posicion):
+    """Retorna la fila indicada como diccionario de pais"""
+    return {
+        "nombre": tabla_nombre(tabla, posicion),
+        "poblacion": tabla["poblacion"][posicion],
+        "superficie": tabla["superficie"][posicion],
+        "continente": tabla["continentes"][tabla["continente"][posicion]]
+    }
+
+def tabla_a_paises(tabla, posiciones=None):
+    """
+    Convierte filas de la tabla en una lista de diccionarios de pais
+    posiciones: filas a convertir (por defecto todas, en orden)
+    """
+    if posiciones is None:
+        # Conversion completa: se recorren las columnas en paralelo
+        return list(tabla_iterar_paises(tabla))
+    
+    paises = []
+    for posicion in posiciones:
+        paises.append(tabla_fila(tabla, posicion))
+    return paises
+
+def tabla_actualizar(tabla, posicion, poblacion=None, superficie=None):
+    """Actualiza la poblacion y/o superficie de una fila"""
+    if poblacion is not None:
+        tabla["poblacion"][posicion] = poblacion
+    if superficie is not None:
+        tabla["superficie"][posicion] = superficie
+
+def tabla_buscar_exacto(tabla, nombre):
+    """
+    Busca una fila por nombre exacto sin distinguir mayusculas en O(1)
+    Usa un indice hash nombre normalizado -> posicion (gana la primera
+    aparicion, como indices["nombres"]) que se arma en la primera busqueda
+    y que tabla_agregar mantiene al dia
+    Retorna su posicion o None si no existe
+    """
+    if tabla.get("indice_nombres") is None:
+        indice_nombres = {}
+        for posicion, nombre_fila in enumerate(tabla_iterar_nombres(tabla)):
+            clave = normalizar_nombre(nombre_fila)
+            if clave not in indice_nombres:
+                indice_nombres[clave] = posicion
+        tabla["indice_nombres"] = indice_nombres
+    
+    return tabla["indice_nombres"].get(normalizar_nombre(nombre))
+
+def tabla_buscar(tabla, nombre_buscar):
+    """
+    Busca filas por coincidencia parcial en el nombre
+    Retorna la lista de posiciones que coinciden
+    """
+    nombre_buscar_lower = nombre_buscar.lower()
+    resultados = []
+    posicion = 0
+    for nombre_fila in tabla_iterar_nombres(tabla):
+        if nombre_buscar_lower in nombre_fila.lower():
+            resultados.append(posicion)
+        posicion = posicion + 1
+    return resultados
+
+def tabla_filtrar_continente(tabla, continente):
+    """Retorna las posiciones de las filas del continente indicado"""
+    codigo = tabla["codigos_continente"].get(continente)
+    if codigo is None:
+        return []
+    
+    if USAR_NUMPY:
+        return numpy_filtrar_continente(tabla, codigo)
+    
+    resultados = []
+    posicion = 0
+    for codigo_fila in tabla["continente"]:
+        if codigo_fila == codigo:
+            resultados.append(posicion)
+        posicion = posicion + 1
+    return resultados
+
+def tabla_filtrar_rango(tabla, campo, minimo, maximo):
+    """
+    Retorna las posiciones de las filas cuyo campo esta en [minimo, maximo]
+    campo: 'poblacion' o 'superficie'
+    """
+    if USAR_NUMPY:
+        return numpy_filtrar_rango(tabla, campo, minimo, maximo)
+    
+    resultados = []
+    posicion = 0
+    for valor in tabla[campo]:
+        if minimo <= valor <= maximo:
+            resultados.append(posicion)
+        posicion = posicion + 1
+    return resultados
+
+def tabla_ordenar(tabla, campo, ascendente=True):
+    """
+    Retorna las posiciones de la tabla ordenadas por el campo indicado
+    campo: 'nombre', 'poblacion' o 'superficie'
+    """
+    if campo == "nombre":
+        claves = []
+        for nombre_fila in tabla_iterar_nombres(tabla):
+            claves.append(nombre_fila.lower())
+    else:
+        claves = tabla[campo]
+    
+    return sorted(range(len(claves)), key=claves.__getitem__, reverse=not ascendente)
+
+@medido
+def tabla_estadisticas(tabla):
+    """
+    Calcula las estadisticas de la tabla
+    Retorna un diccionario con el mismo formato que obtener_estadisticas
+    """
+    cantidad = tabla_cantidad(tabla)
+    if cantidad == 0:
+        return None
+    
+    if USAR_NUMPY:
+        return numpy_estadisticas(tabla)
+    
+    poblaciones = tabla["poblacion"]
+    posicion_mayor = 0
+    posicion_menor = 0
+    for posicion in range(1, cantidad):
+        if poblaciones[posicion] > poblaciones[posicion_mayor]:
+            posicion_mayor = posicion
+        if poblaciones[posicion] < poblaciones[posicion_menor]:
+            posicion_menor = posicion
+    
+    suma_poblacion = sum(poblaciones)
+    suma_superficie = sum(tabla["superficie"])
+    
+    # Contar por codigo y traducir al nombre del continente
+    conteo_codigos = [0] * len(tabla["continentes"])
+    for codigo in tabla["continente"]:
+        conteo_codigos[codigo] = conteo_codigos[codigo] + 1
+    
+    continentes_count = {}
+    for codigo in range(len(conteo_codigos)):
+        if conteo_codigos[codigo] > 0:
+            continentes_count[tabla["continentes"][codigo]] = conteo_codigos[codigo]
+    
+    return {
+        "cantidad": cantidad,
+        "mayor_poblacion": tabla_fila(tabla, posicion_mayor),
+        "menor_poblacion": tabla_fila(tabla, posicion_menor),
+        "suma_poblacion": suma_poblacion,
+        "suma_superficie": suma_superficie,
+        "promedio_poblacion": suma_poblacion / cantidad,
+        "promedio_superficie": suma_superficie / cantidad,
+        "por_continente": continentes_count
+    }
+
+# La lista de paises de la aplicacion tambien puede estar respaldada por una
+# tabla (PaisesTabla): cargar_csv_rapido la arma sobre el snapshot mapeado
+# con mmap, asi los paises no se copian a diccionarios al cargar. Cada pais
+# se arma al leerlo; los que cambian se guardan aparte con paises[i] = pais
+# (actualizar_pais lo hace) y las altas van a una lista al final.
+
+class PaisesTabla:
+    """Lista de paises respaldada por una tabla columnar"""
+    
+    def __init__(self, tabla, ruta=None):
+        """
+        tabla: tabla columnar (por ejemplo la de obtener_tabla_snapshot)
+        ruta: CSV del que salio la tabla, para volver a leerlo si el
+              snapshot resulta danado
+        """
+        self.tabla = tabla
+        self.ruta = ruta
+        self.cantidad = tabla_cantidad(tabla)
+        self.cambiados = {}
+        self.agregados = []
+    
+    def __len__(self):
+        return self.cantidad + len(self.agregados)
+    
+    def __iter__(self):
+        desde = 0
+        while desde < self.cantidad:
+            hasta = min(desde + FILAS_POR_BLOQUE_SNAPSHOT, self.cantidad)
+            # Si el snapshot estaba danado la tabla nueva puede tener otra cantidad
+            self.verificar(desde, hasta)
+            hasta = min(hasta, self.cantidad)
+            posicion = desde
+            for pais in tabla_iterar_paises(self.tabla, desde, hasta):
+                if len(self.cambiados) > 0:
+                    pais = self.cambiados.get(posicion, pais)
+                yield pais
+                posicion = posicion + 1
+            desde = hasta
+        for pais in self.agregados:
+            yield pais
+    
+    def __getitem__(self, posicion):
+        if isinstance(posicion, slice):
+            return [self[i] for i in range(*posicion.indices(len(self)))]
+        posicion = self.posicion_valida(posicion)
+        if posicion >= self.cantidad:
+            return self.agregados[posicion - self.cantidad]
+        
+        pais = self.cambiados.get(posicion)
+        if pais is None:
+            if not self.verificar(posicion, posicion + 1):
+                return self[posicion]
+            pais = tabla_fila(self.tabla, posicion)
+        return pais
+    
+    def __setitem__(self, posicion, pais):
+        posicion = self.posicion_valida(posicion)
+        if posicion >= self.cantidad:
+            self.agregados[posicion - self.cantidad] = pais
+        else:
+            self.cambiados[posicion] = pais
+    
+    def __eq__(self, otra):
+        if not isinstance(otra, (list, tuple, VistaPaises, PaisesTabla)):
+            return NotImplemented
+        return list(self) == list(otra)
+    
+    def __repr__(self):
+        return f"PaisesTabla({len(self):,} paises)"
+    
+    def append(self, pais):
+        self.agregados.append(pais)
+    
+    def posicion_valida(self, posicion):
+        """Traduce una posicion negativa y controla que exista"""
+        if posicion < 0:
+            posicion = posicion + len(self)
+        if posicion < 0 or posicion >= len(self):
+            raise IndexError("posicion fuera de la lista de paises")
+        return posicion
+    
+    def verificar(self, desde, hasta):
+        """
+        Verifica las filas [desde, hasta) del snapshot (cada bloque una sola
+        vez); si estan danadas vuelve a armar la tabla desde el CSV
+        Retorna False si tuvo que volver a armar la tabla
+        """
+        if verificar_filas_snapshot(self.tabla, desde, hasta):
+            return True
+        print("ADVERTENCIA: El snapshot binario esta danado, se vuelve a leer el CSV.")
+        self.tabla = regenerar_snapshot(self.ruta)
+        self.cantidad = tabla_cantidad(self.tabla)
+        return False
+
+# ============================================================================
+# SNAPSHOT BINARIO
+# ============================================================================
+#
+# Copia de la tabla columnar del CSV (sin el diario) en formato binario,
+# guardada junto al CSV (data/paises.bin). Se abre con mmap y las columnas
+# se leen directamente del archivo mapeado, sin convertir texto a numeros.
+# Estructura: encabezado | poblacion (int64) | superficie (int64) |
+# inicio_nombres (int64) | continente (uint16) | nombres UTF-8 |
+# tabla de continentes (texto separado por saltos de linea) |
+# crc32 (uint32) de cada bloque de FILAS_POR_BLOQUE_SNAPSHOT filas.
+# El encabezado guarda el tamano, la fecha y un hash del CSV del que salio:
+# si el CSV cambia, el snapshot se regenera automaticamente. Si solo cambio
+# la fecha y el hash coincide, se guarda la fecha nueva en el encabezado.
+# Al abrirlo solo se verifican el encabezado y la tabla de continentes; cada
+# bloque de filas se verifica la primera vez que se lee (PaisesTabla).
+
+def ruta_snapshot(ruta):
+    """Retorna la ruta del snapshot binario del CSV"""
+    return os.path.splitext(ruta)[0] + ".bin"
+
+def hash_archivo(ruta):
+    """Calcula el hash (16 bytes) del contenido de un archivo"""
+    resumen = hashlib.blake2b(digest_size=16)
+    archivo = open(ruta, "rb")
+    bloque = archivo.read(1024 * 1024)
+    while len(bloque) > 0:
+        resumen.update(bloque)
+        bloque = archivo.read(1024 * 1024)
+    archivo.close()
+    return resumen.digest()
+
+def crc_bloque_snapshot(tabla, bloque):
+    """Calcula el crc32 de las filas del bloque en todas las columnas"""
+    desde = bloque * FILAS_POR_BLOQUE_SNAPSHOT
+    hasta = min(desde + FILAS_POR_BLOQUE_SNAPSHOT, tabla_cantidad(tabla))
+    inicio_nombres = tabla["inicio_nombres"]
+    
+    crc = zlib.crc32(memoryview(tabla["poblacion"])[desde:hasta])
+    crc = zlib.crc32(memoryview(tabla["superficie"])[desde:hasta], crc)
+    crc = zlib.crc32(memoryview(inicio_nombres)[desde:hasta + 1], crc)
+    crc = zlib.crc32(memoryview(tabla["continente"])[desde:hasta], crc)
+    return zlib.crc32(memoryview(tabla["nombres"])[inicio_nombres[desde]:inicio_nombres[hasta]], crc)
+
+def cantidad_bloques_snapshot(cantidad):
+    """Retorna la cantidad de bloques de filas de un snapshot"""
+    return (cantidad + FILAS_POR_BLOQUE_SNAPSHOT - 1) // FILAS_POR_BLOQUE_SNAPSHOT
+
+def escribir_snapshot(ruta, tabla):
+    """
+    Escribe el snapshot binario de la tabla construida a partir del CSV
+    ruta: ruta del CSV (el snapshot se guarda en ruta_snapshot(ruta))
+    """
+    continentes = "\n".join(tabla["continentes"]).encode("utf-8")
+    bloques = array("I")
+    for bloque in range(cantidad_bloques_snapshot(tabla_cantidad(tabla))):
+        bloques.append(crc_bloque_snapshot(tabla, bloque))
+    
+    partes = [
+        tabla["poblacion"].tobytes(),
+        tabla["superficie"].tobytes(),
+        tabla["inicio_nombres"].tobytes(),
+        tabla["continente"].tobytes(),
+        bytes(tabla["nombres"]),
+        continentes,
+        bloques.tobytes()
+    ]
+    
+    datos_csv = os.stat(ruta)
+    encabezado = struct.pack(
+        FORMATO_ENCABEZADO_SNAPSHOT, FIRMA_SNAPSHOT, VERSION_SNAPSHOT,
+        tabla_cantidad(tabla), datos_csv.st_size, datos_csv.st_mtime_ns,
+        len(tabla["nombres"]), len(continentes), zlib.crc32(continentes + partes[-1]),
+        hash_archivo(ruta)
+    )
+    
+    # Escritura atomica, igual que guardar_csv
+    ruta_temporal = ruta_snapshot(ruta) + ".tmp"
+    archivo = open(ruta_temporal, "wb")
+    archivo.write(encabezado)
+    for parte in partes:
+        archivo.write(parte)
+    archivo.flush()
+    os.fsync(archivo.fileno())
+    archivo.close()
+    
+    try:
+        os.replace(ruta_temporal, ruta_snapshot(ruta))
+    except OSError:
+        # Por ejemplo en Windows, si el snapshot anterior sigue mapeado
+        os.remove(ruta_temporal)
+        print("ADVERTENCIA: No se pudo actualizar el snapshot binario; se usara la proxima vez.")
+
+def guardar_fecha_snapshot(ruta, valores, mtime_csv):
+    """
+    Reescribe el encabezado del snapshot con la fecha actual del CSV (despues
+    de comprobar por hash que el contenido no cambio)
+    valores: los campos del encabezado leido
+    """
+    valores = list(valores)
+    valores[4] = mtime_csv
+    try:
+        archivo = open(ruta_snapshot(ruta), "r+b")
+        archivo.write(struct.pack(FORMATO_ENCABEZADO_SNAPSHOT, *valores))
+        archivo.close()
+    except OSError:
+        # Sin la fecha nueva solo se vuelve a calcular el hash la proxima vez
+        pass
+
+def cargar_snapshot(ruta):
+    """
+    Abre con mmap el snapshot binario del CSV y retorna una tabla columnar
+    de solo lectura cuyas columnas son vistas sobre el archivo (sin copia)
+    Los bloques de filas quedan sin verificar (ver verificar_filas_snapshot)
+    Retorna None si no existe, esta danado o no corresponde al CSV actual
+    """
+    if not os.path.exists(ruta_snapshot(ruta)) or os.path.getsize(ruta_snapshot(ruta)) == 0:
+        return None
+    
+    archivo = open(ruta_snapshot(ruta), "rb")
+    mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+    archivo.close()
+    
+    tamano_encabezado = struct.calcsize(FORMATO_ENCABEZADO_SNAPSHOT)
+    if len(mapa) < tamano_encabezado:
+        mapa.close()
+        return None
+    
+    valores = struct.unpack_from(FORMATO_ENCABEZADO_SNAPSHOT, mapa)
+    (firma, version, cantidad, tamano_csv, mtime_csv, bytes_nombres,
+     bytes_continentes, crc, hash_csv) = valores
+    
+    if firma != FIRMA_SNAPSHOT or version != VERSION_SNAPSHOT:
+        mapa.close()
+        return None
+    
+    # Verificar que el snapshot corresponda al CSV (fecha o contenido)
+    datos_csv = os.stat(ruta)
+    if datos_csv.st_size != tamano_csv:
+        mapa.close()
+        return None
+    if datos_csv.st_mtime_ns != mtime_csv:
+        if hash_archivo(ruta) != hash_csv:
+            mapa.close()
+            return None
+        guardar_fecha_snapshot(ruta, valores, datos_csv.st_mtime_ns)
+    
+    bloques = cantidad_bloques_snapshot(cantidad)
+    tamano_esperado = (tamano_encabezado + 8 * cantidad * 3 + 8 + 2 * cantidad
+                       + bytes_nombres + bytes_continentes + 4 * bloques)
+    if len(mapa) != tamano_esperado:
+        mapa.close()
+        return None
+    
+    vista = memoryview(mapa)
+    inicio_continentes = len(mapa) - 4 * bloques - bytes_continentes
+    if zlib.crc32(vista[inicio_continentes:]) != crc:
+        vista.release()
+        mapa.close()
+        return None
+    
+    # Ubicar cada columna dentro del archivo
+    inicio = tamano_encabezado
+    poblacion = vista[inicio:inicio + 8 * cantidad].cast("q")
+    inicio = inicio + 8 * cantidad
+    superficie = vista[inicio:inicio + 8 * cantidad].cast("q")
+    inicio = inicio + 8 * cantidad
+    inicio_nombres = vista[inicio:inicio + 8 * (cantidad + 1)].cast("q")
+    inicio = inicio + 8 * (cantidad + 1)
+    continente = vista[inicio:inicio + 2 * cantidad].cast("H")
+    inicio = inicio + 2 * cantidad
+    nombres = vista[inicio:inicio + bytes_nombres]
+    inicio = inicio + bytes_nombres
+    
+    continentes = []
+    if bytes_continentes > 0:
+        continentes = str(vista[inicio:inicio + bytes_continentes], "utf-8").split("\n")
+    inicio = inicio + bytes_continentes
+    
+    codigos_continente = {}
+    for codigo in range(len(continentes)):
+        codigos_continente[continentes[codigo]] = codigo
+    
+    return {
+        "nombres": nombres,
+        "inicio_nombres": inicio_nombres,
+        "poblacion": poblacion,
+        "superficie": superficie,
+        "continente": continente,
+        "continentes": continentes,
+        "codigos_continente": codigos_continente,
+        "indice_nombres": None,
+        "crc_bloques": vista[inicio:].cast("I"),
+        "bloques_verificados": bytearray(bloques)
+    }
+
+def verificar_filas_snapshot(tabla, desde, hasta):
+    """
+    Verifica el crc32 de los bloques del snapshot que contienen las filas
+    [desde, hasta). Cada bloque se verifica una sola vez y las tablas que no
+    salen de un snapshot no se verifican
+    Retorna False si algun bloque esta danado
+    """
+    crc_bloques = tabla.get("crc_bloques")
+    if crc_bloques is None or hasta <= desde:
+        return True
+    
+    verificados = tabla["bloques_verificados"]
+    for bloque in range(desde // FILAS_POR_BLOQUE_SNAPSHOT, (hasta - 1) // FILAS_POR_BLOQUE_SNAPSHOT + 1):
+        if not verificados[bloque]:
+            if crc_bloque_snapshot(tabla, bloque) != crc_bloques[bloque]:
+                return False
+            verificados[bloque] = 1
+    return True
+
+def regenerar_snapshot(ruta):
+    """Arma la tabla columnar leyendo el CSV y reescribe su snapshot"""
+    tabla = tabla_desde_paises(iterar_csv(ruta, con_diario=False, sin_repetidos=True))
+    escribir_snapshot(ruta, tabla)
+    return tabla
+
+@medido
+def obtener_tabla_snapshot(ruta):
+    """
+    Retorna la tabla columnar del CSV leida desde el snapshot binario
+    Si el snapshot no existe o esta desactualizado, lo regenera
+    Retorna None si el CSV no existe
+    """
+    if not os.path.exists(ruta):
+        print(f"ADVERTENCIA: El archivo {ruta} no existe.")
+        return None
+    
+    tabla = cargar_snapshot(ruta)
+    if tabla is None:
+        tabla = regenerar_snapshot(ruta)
+    
+    return tabla
+
+@medido
+def cargar_csv_rapido(ruta):
+    """
+    Carga los paises como cargar_csv, pero a partir del snapshot binario
+    (evita convertir el texto del CSV en cada inicio). Retorna una
+    PaisesTabla que lee los paises del snapshot mapeado, sin copiarlos
+    """
+    tabla = obtener_tabla_snapshot(ruta)
+    if tabla is None:
+        return []
+    
+    paises = PaisesTabla(tabla, ruta)
+    aplicar_diario(paises, ruta)
+    return paises
+
+# ============================================================================
+# MOTOR NUMPY (OPCIONAL)
+# ============================================================================
+#
+# Versiones vectorizadas de los filtros y estadisticas de la tabla columnar.
+# Operan sobre vistas de NumPy de las columnas (sin copiar los datos), por lo
+# que procesan todas las filas en una sola operacion en lugar de un ciclo.
+# La aplicacion las usa a traves de la lista de paises cargada desde el
+# snapshot (PaisesTabla): construir_indices y agrupar por continente.
+# Las vistas no deben guardarse fuera de estas funciones: mientras existan,
+# las columnas no pueden crecer con tabla_agregar.
+
+def columna_numpy(tabla, campo):
+    """Retorna una vista de NumPy sobre una columna entera de la tabla"""
+    if campo == "continente":
+        return np.frombuffer(tabla[campo], dtype=np.uint16)
+    return np.frombuffer(tabla[campo], dtype=np.int64)
+
+def numpy_mascara_rango(tabla, campo, minimo, maximo):
+    """Retorna la mascara booleana de las filas con campo en [minimo, maximo]"""
+    columna = columna_numpy(tabla, campo)
+    return (columna >= minimo) & (columna <= maximo)
+
+def numpy_filtrar_rango(tabla, campo, minimo, maximo):
+    """Version vectorizada de tabla_filtrar_rango"""
+    return np.flatnonzero(numpy_mascara_rango(tabla, campo, minimo, maximo)).tolist()
+
+def numpy_filtrar_continente(tabla, codigo):
+    """Version vectorizada de tabla_filtrar_continente (recibe el codigo)"""
+    return np.flatnonzero(columna_numpy(tabla, "continente") == codigo).tolist()
+
+def numpy_estadisticas(tabla):
+    """Version vectorizada de tabla_estadisticas"""
+    cantidad = tabla_cantidad(tabla)
+    poblaciones = columna_numpy(tabla, "poblacion")
+    superficies = columna_numpy(tabla, "superficie")
+    
+    # argmax y argmin retornan la primera ocurrencia, igual que el ciclo
+    posicion_mayor = int(np.argmax(poblaciones))
+    posicion_menor = int(np.argmin(poblaciones))
+    suma_poblacion = int(poblaciones.sum())
+    suma_superficie = int(superficies.sum())
+    
+    conteo_codigos = np.bincount(columna_numpy(tabla, "continente"), minlength=len(tabla["continentes"]))
+    continentes_count = {}
+    for codigo in range(len(tabla["continentes"])):
+        if conteo_codigos[codigo] > 0:
+            continentes_count[tabla["continentes"][codigo]] = int(conteo_codigos[codigo])
+    
+    return {
+        "cantidad": cantidad,
+        "mayor_poblacion": tabla_fila(tabla, posicion_mayor),
+        "menor_poblacion": tabla_fila(tabla, posicion_menor),
+        "suma_poblacion": suma_poblacion,
+        "suma_superficie": suma_superficie,
+        "promedio_poblacion": suma_poblacion / cantidad,
+        "promedio_superficie": suma_superficie / cantidad,
+        "por_continente": continentes_count
+    }
+
+def numpy_columnas_paises(paises):
+    """
+    Retorna las columnas de las filas de la tabla de una PaisesTabla como
+    arreglos de NumPy: poblacion, superficie y densidad (con los cambios de
+    paises.cambiados) y los codigos de continente. Antes verifica todos los
+    bloques del snapshot, porque estas lecturas no pasan por PaisesTabla
+    """
+    paises.verificar(0, paises.cantidad)
+    tabla = paises.tabla
+    poblacion = columna_numpy(tabla, "poblacion")
+    superficie = columna_numpy(tabla, "superficie")
+    
+    if len(paises.cambiados) > 0:
+        poblacion = poblacion.copy()
+        superficie = superficie.copy()
+        for posicion, pais in paises.cambiados.items():
+            poblacion[posicion] = pais["poblacion"]
+            superficie[posicion] = pais["superficie"]
+    
+    # Mismo valor que calcular_densidad (la division de float64 es exacta
+    # mientras los enteros no pasen de 2**53)
+    densidad = np.zeros(len(poblacion))
+    np.divide(poblacion, superficie, out=densidad, where=superficie > 0)
+    
+    return {"poblacion": poblacion, "superficie": superficie, "densidad": densidad,
+            "continente": columna_numpy(tabla, "continente")}
+
+def numpy_codigos_en_orden(codigos):
+    """Retorna los codigos distintos en el orden en que aparecen por primera vez"""
+    presentes, primeras = np.unique(codigos, return_index=True)
+    return presentes[np.argsort(primeras)].tolist()
+
+def numpy_indexar_tabla(indices, paises):
+    """
+    Version vectorizada de construir_indices para una PaisesTabla: cada
+    indice ordenado sale de un argsort estable (los empates quedan por
+    posicion, igual que al ordenar las tuplas) y el acumulador de
+    estadisticas de sumas por continente. Los paises agregados despues de
+    la tabla se suman como en construir_indices
+    """
+    columnas = numpy_columnas_paises(paises)
+    tabla = paises.tabla
+    agregados = paises.agregados
+    
+    # Indice hash nombre normalizado -> posicion (gana la primera aparicion)
+    nombres = indices["nombres"]
+    for posicion, nombre in enumerate(tabla_iterar_nombres(tabla)):
+        clave = normalizar_nombre(nombre)
+        if clave not in nombres:
+            nombres[clave] = posicion
+    
+    for campo in CAMPOS_INDEXADOS:
+        valores = columnas[campo]
+        if len(agregados) > 0:
+            extra = np.array([valor_campo(pais, campo) for pais in agregados], dtype=valores.dtype)
+            valores = np.concatenate([valores, extra])
+        orden = np.argsort(valores, kind="stable")
+        indices[campo] = list(zip(valores[orden].tolist(), orden.tolist()))
+    
+    acumulador = indices["estadisticas"]
+    acumulador["cantidad"] = paises.cantidad
+    acumulador["suma_poblacion"] = int(columnas["poblacion"].sum())
+    acumulador["suma_superficie"] = int(columnas["superficie"].sum())
+    
+    # Continentes en el orden en que aparecen, igual que acumular_pais
+    codigos = columnas["continente"]
+    for codigo in numpy_codigos_en_orden(codigos):
+        del_continente = codigos == codigo
+        continente = tabla["continentes"][codigo]
+        acumulador["por_continente"][continente] = int(np.count_nonzero(del_continente))
+        acumulador["totales_continente"][continente] = {
+            "poblacion": int(columnas["poblacion"][del_continente].sum()),
+            "superficie": int(columnas["superficie"][del_continente].sum())
+        }
+    
+    for posicion in range(paises.cantidad, len(paises)):
+        pais = paises[posicion]
+        clave = normalizar_nombre(pais["nombre"])
+        if clave not in nombres:
+            nombres[clave] = posicion
+        acumular_pais(acumulador, pais)
+
+def numpy_agrupar_tabla(paises, campos):
+    """
+    Version vectorizada de agrupar por continente para una PaisesTabla:
+    separa cada columna por grupo con una mascara y pasa los valores al
+    bosquejo en los mismos lotes de KLL_K que acumular_en_agregado, asi el
+    resultado es identico al de recorrer los paises
+    """
+    columnas = numpy_columnas_paises(paises)
+    codigos = columnas["continente"]
+    
+    grupos = {}
+    for codigo in numpy_codigos_en_orden(codigos):
+        del_grupo = codigos == codigo
+        agregado = crear_agregado(campos)
+        agregado["cantidad"] = int(np.count_nonzero(del_grupo))
+        completos = agregado["cantidad"] - agregado["cantidad"] % KLL_K
+        
+        for campo in campos:
+            # Suma, minimo y maximo en Python: misma suma de floats que el ciclo
+            valores = columnas[campo][del_grupo].tolist()
+            resumen = agregado[campo]
+            resumen["suma"] = sum(valores)
+            resumen["minimo"] = min(valores)
+            resumen["maximo"] = max(valores)
+            for inicio in range(0, completos, KLL_K):
+                kll_agregar(resumen["cuantiles"], valores[inicio:inicio + KLL_K])
+            resumen["pendientes"].extend(valores[completos:])
+        
+        grupos[paises.tabla["continentes"][codigo]] = agregado
+    
+    # Los paises agregados despues de la tabla se suman uno por uno
+    for pais in paises.agregados:
+        agregado = grupos.get(pais["continente"])
+        if agregado is None:
+            agregado = crear_agregado(campos)
+            grupos[pais["continente"]] = agregado
+        acumular_en_agregado(agregado, pais, campos)
+    return grupos
+
+# ============================================================================
+# FUNCIONES DE VISUALIZACION
+# ============================================================================
+
+def configurar_listado(modo=None, filas_por_pagina=None):
+    """
+    Cambia como se muestran los listados del menu
+    Retorna (exito, mensaje)
+    """
+    if modo is not None and modo not in MODOS_LISTADO:
+        return False, f"Modo de listado invalido. Opciones: {', '.join(MODOS_LISTADO)}"
+    if filas_por_pagina is not None and filas_por_pagina <= 0:
+        return False, "Las filas por pagina deben ser un numero entero positivo."
+    
+    if modo is not None:
+        CONFIGURACION_LISTADO["modo"] = modo
+    if filas_por_pagina is not None:
+        CONFIGURACION_LISTADO["filas_por_pagina"] = filas_por_pagina
+    return True, ""
 
-# ============================================================================
-# FUNCIONES DE VISUALIZACION
-# ============================================================================
+def ancho_tabla(totales=None):
+    """Ancho de la tabla de paises (mas ancha con los campos derivados)"""
+    if totales is None:
+        return 80
+    return 106
+
+def formatear_pais(pais, totales=None):
+    """
+    Retorna la fila de la tabla correspondiente a un pais
+    Con los totales por continente agrega densidad y participacion
+    """
+    fila = f"{pais['nombre']:<20} {pais['poblacion']:<15,} {pais['superficie']:<20,} {pais['continente']:<15}"
+    if totales is None:
+        return fila
+    return fila + f" {calcular_densidad(pais):<12,.1f} {calcular_participacion(pais, totales):>10.2f}%"
 
-def mostrar_paises(paises, titulo="Lista de Paises"):
-    """Muestra la lista de paises en formato tabla"""
+def escribir_encabezado_tabla(titulo, totales=None):
+    """Escribe el titulo y los nombres de las columnas de la tabla"""
+    ancho = ancho_tabla(totales)
+    columnas = f"{'Nombre':<20} {'Poblacion':<15} {'Superficie (km2)':<20} {'Continente':<15}"
+    if totales is not None:
+        columnas = columnas + f" {'Densidad':<12} {'% continente':>11}"
+    sys.stdout.write(
+        "\n" + "="*ancho + "\n"
+        f"  {titulo}\n"
+        + "="*ancho + "\n"
+        + columnas + "\n"
+        + "-"*ancho + "\n"
+    )
+
+def escribir_filas(paises, desde, hasta, totales=None):
+    """
+    Escribe las filas de las posiciones [desde, hasta) en bloques de
+    FILAS_POR_ESCRITURA lineas: una sola escritura por bloque en lugar de
+    un print por fila
+    """
+    salida = sys.stdout
+    for inicio in range(desde, hasta, FILAS_POR_ESCRITURA):
+        fin = min(inicio + FILAS_POR_ESCRITURA, hasta)
+        bloque = []
+        for posicion in range(inicio, fin):
+            bloque.append(formatear_pais(paises[posicion], totales))
+        salida.write("\n".join(bloque) + "\n")
+
+def escribir_pie_tabla(texto, totales=None):
+    """Escribe la linea final de la tabla"""
+    ancho = ancho_tabla(totales)
+    sys.stdout.write("-"*ancho + "\n" + texto + "\n" + "="*ancho + "\n")
+
+def mostrar_paises(paises, titulo="Lista de Paises", modo=None, totales=None):
+    """
+    Muestra la lista de paises en formato tabla
+    modo: "paginado" (por defecto), "completo", "contar" (solo la
+    cantidad, sin formatear las filas) o "muestra" (una pagina de paises
+    al azar, como vista previa); None usa CONFIGURACION_LISTADO
+    totales: totales por continente; si se pasan se agregan las columnas
+    de densidad y participacion
+    """
     if len(paises) == 0:
         print("No hay paises para mostrar.")
         return
     
-    print("\n" + "="*80)
-    print(f"  {titulo}")
-    print("="*80)
-    print(f"{'Nombre':<20} {'Poblacion':<15} {'Superficie (km2)':<20} {'Continente':<15}")
-    print("-"*80)
+    if modo is None:
+        modo = CONFIGURACION_LISTADO["modo"]
     
-    for pais in paises:
-        print(f"{pais['nombre']:<20} {pais['poblacion']:<15,} {pais['superficie']:<20,} {pais['continente']:<15}")
+    if modo == "contar":
+        print(f"\n{titulo}: {len(paises):,} pais(es)")
+        return
+    
+    filas_por_pagina = CONFIGURACION_LISTADO["filas_por_pagina"]
+    if modo == "muestra" and len(paises) > filas_por_pagina:
+        muestra = muestra_uniforme(paises, filas_por_pagina)
+        escribir_encabezado_tabla(f"{titulo} (muestra al azar)", totales)
+        escribir_filas(muestra, 0, len(muestra), totales)
+        escribir_pie_tabla(f"Muestra de {len(muestra):,} de {len(paises):,} pais(es)", totales)
+        return
+    
+    if modo == "paginado" and len(paises) > filas_por_pagina:
+        paginar_paises(paises, titulo, filas_por_pagina, totales)
+        return
+    
+    escribir_encabezado_tabla(titulo, totales)
+    escribir_filas(paises, 0, len(paises), totales)
+    escribir_pie_tabla(f"Total: {len(paises)} pais(es)", totales)
+
+def paginar_paises(paises, titulo, filas_por_pagina, totales=None):
+    """Muestra la lista de a una pagina, con navegacion siguiente/anterior"""
+    total_paginas = (len(paises) + filas_por_pagina - 1) // filas_por_pagina
+    pagina = 0
     
-    print("-"*80)
-    print(f"Total: {len(paises)} pais(es)")
-    print("="*80)
+    while True:
+        desde = pagina * filas_por_pagina
+        hasta = min(desde + filas_por_pagina, len(paises))
+        
+        escribir_encabezado_tabla(f"{titulo} (pagina {pagina + 1} de {total_paginas})", totales)
+        escribir_filas(paises, desde, hasta, totales)
+        escribir_pie_tabla(f"Paises {desde + 1:,} a {hasta:,} de {len(paises):,}", totales)
+        
+        opcion = input("[S]iguiente, [A]nterior, [T]odo el resto, numero de pagina o Enter para terminar: ").strip().lower()
+        
+        if opcion == "":
+            return
+        elif opcion == "s":
+            if pagina + 1 < total_paginas:
+                pagina = pagina + 1
+            else:
+                print("ADVERTENCIA: Ya estas en la ultima pagina.")
+        elif opcion == "a":
+            if pagina > 0:
+                pagina = pagina - 1
+            else:
+                print("ADVERTENCIA: Ya estas en la primera pagina.")
+        elif opcion == "t":
+            escribir_filas(paises, hasta, len(paises), totales)
+            escribir_pie_tabla(f"Total: {len(paises)} pais(es)", totales)
+            return
+        elif es_numero_entero(opcion) and int(opcion) <= total_paginas:
+            pagina = int(opcion) - 1
+        else:
+            print("ERROR: Opcion invalida.")
 
 # ============================================================================
 # FUNCIONES DEL MENU PRINCIPAL
 # ============================================================================
 
-def menu_agregar_pais(paises):
+def menu_agregar_pais(paises, indices=None):
     """Opcion 2: Agregar un pais"""
     print("\n" + "="*60)
     print("AGREGAR NUEVO PAIS")
@@ -385,26 +4198,22 @@ def menu_agregar_pais(paises):
     
     # Solicitar nombre
     nombre = input("\nNombre del pais: ").strip()
-    valido, mensaje = validar_nombre(nombre, paises)
+    valido, mensaje = validar_nombre(nombre, paises, indices=indices)
     if not valido:
         print(f"ERROR: {mensaje}")
         return
     
     # Solicitar poblacion
-    poblacion_texto = input("Poblacion: ").strip()
-    valido, mensaje = validar_poblacion(poblacion_texto)
-    if not valido:
+    poblacion, mensaje = parsear_poblacion(input("Poblacion: "))
+    if poblacion is None:
         print(f"ERROR: {mensaje}")
         return
-    poblacion = int(poblacion_texto)
     
     # Solicitar superficie
-    superficie_texto = input("Superficie (km2): ").strip()
-    valido, mensaje = validar_superficie(superficie_texto)
-    if not valido:
+    superficie, mensaje = parsear_superficie(input("Superficie (km2): "))
+    if superficie is None:
         print(f"ERROR: {mensaje}")
         return
-    superficie = int(superficie_texto)
     
     # Solicitar continente
     print(f"\nContinentes validos: {', '.join(CONTINENTES_VALIDOS)}")
@@ -421,12 +4230,12 @@ def menu_agregar_pais(paises):
         "superficie": superficie,
         "continente": continente
     }
-    paises.append(nuevo_pais)
+    agregar_pais(paises, indices, nuevo_pais)
     
     print(f"\nOK: El pais '{nombre}' ha sido agregado correctamente.")
     print("ADVERTENCIA: Recuerda guardar los cambios en el CSV (opcion 8).")
 
-def menu_actualizar_pais(paises):
+def menu_actualizar_pais(paises, indices=None):
     """Opcion 3: Actualizar datos de un pais"""
     print("\n" + "="*60)
     print("ACTUALIZAR DATOS DE UN PAIS")
@@ -435,16 +4244,14 @@ def menu_actualizar_pais(paises):
     nombre = input("\nNombre del pais a actualizar: ").strip()
     
     # Buscar el pais
-    pais_encontrado = None
-    for pais in paises:
-        if pais["nombre"].lower() == nombre.lower():
-            pais_encontrado = pais
-            break
+    posicion_encontrada = buscar_posicion_por_nombre(paises, nombre, indices)
     
-    if pais_encontrado is None:
+    if posicion_encontrada is None:
         print(f"ERROR: No se encontro el pais '{nombre}'.")
         return
     
+    pais_encontrado = paises[posicion_encontrada]
+    
     print(f"\nDatos actuales de {pais_encontrado['nombre']}:")
     print(f"  Poblacion: {pais_encontrado['poblacion']:,}")
     print(f"  Superficie: {pais_encontrado['superficie']:,} km2")
@@ -455,26 +4262,26 @@ def menu_actualizar_pais(paises):
     poblacion_texto = input("Nueva poblacion: ").strip()
     
     if poblacion_texto != "":
-        valido, mensaje = validar_poblacion(poblacion_texto)
-        if not valido:
+        poblacion, mensaje = parsear_poblacion(poblacion_texto)
+        if poblacion is None:
             print(f"ERROR: {mensaje}")
             return
-        pais_encontrado["poblacion"] = int(poblacion_texto)
+        actualizar_pais(paises, indices, posicion_encontrada, poblacion=poblacion)
     
     # Solicitar nueva superficie
     superficie_texto = input("Nueva superficie (km2): ").strip()
     
     if superficie_texto != "":
-        valido, mensaje = validar_superficie(superficie_texto)
-        if not valido:
+        superficie, mensaje = parsear_superficie(superficie_texto)
+        if superficie is None:
             print(f"ERROR: {mensaje}")
             return
-        pais_encontrado["superficie"] = int(superficie_texto)
+        actualizar_pais(paises, indices, posicion_encontrada, superficie=superficie)
     
     print(f"\nOK: El pais '{pais_encontrado['nombre']}' ha sido actualizado correctamente.")
     print("ADVERTENCIA: Recuerda guardar los cambios en el CSV (opcion 8).")
 
-def menu_buscar_pais(paises):
+def menu_buscar_pais(paises, indices=None):
     """Opcion 4: Buscar un pais"""
     print("\n" + "="*60)
     print("BUSCAR PAIS")
@@ -486,14 +4293,18 @@ def menu_buscar_pais(paises):
         print("ERROR: Debes ingresar un nombre valido.")
         return
     
-    resultados = buscar_pais_por_nombre(paises, nombre)
+    clave = ("busqueda", nombre.lower())
+    resultados = obtener_de_cache(indices, clave)
+    if resultados is None:
+        resultados = buscar_pais_por_nombre(paises, nombre, indices)
+        guardar_en_cache(indices, clave, resultados)
     
     if len(resultados) == 0:
         print(f"\nERROR: No se encontraron paises que coincidan con '{nombre}'.")
     else:
         mostrar_paises(resultados, f"Resultados de busqueda: '{nombre}'")
 
-def menu_filtrar_paises(paises):
+def menu_filtrar_paises(paises, indices=None):
     """Opcion 5: Filtrar paises"""
     print("\n" + "="*60)
     print("FILTRAR PAISES")
@@ -501,7 +4312,8 @@ def menu_filtrar_paises(paises):
     print("\n1. Filtrar por continente")
     print("2. Filtrar por rango de poblacion")
     print("3. Filtrar por rango de superficie")
-    print("4. Volver al menu principal")
+    print("4. Filtro combinado (varios criterios a la vez)")
+    print("5. Volver al menu principal")
     
     opcion = input("\nSelecciona una opcion: ").strip()
     
@@ -515,7 +4327,11 @@ def menu_filtrar_paises(paises):
             print(f"ERROR: {mensaje}")
             return
         
-        resultados = filtrar_por_continente(paises, continente)
+        clave = ("continente", continente)
+        resultados = obtener_de_cache(indices, clave)
+        if resultados is None:
+            resultados = filtrar_por_continente(paises, continente)
+            guardar_en_cache(indices, clave, resultados)
         
         if len(resultados) == 0:
             print(f"\nERROR: No se encontraron paises en {continente}.")
@@ -527,18 +4343,16 @@ def menu_filtrar_paises(paises):
         min_pob = input("Poblacion minima: ").strip()
         max_pob = input("Poblacion maxima: ").strip()
         
-        if not es_numero_entero(min_pob) or not es_numero_entero(max_pob):
-            print("ERROR: Los valores deben ser numeros enteros positivos.")
-            return
-        
-        min_poblacion = int(min_pob)
-        max_poblacion = int(max_pob)
-        
-        if min_poblacion > max_poblacion:
-            print("ERROR: La poblacion minima no puede ser mayor que la maxima.")
+        min_poblacion, max_poblacion, mensaje = validar_rango(min_pob, max_pob, "poblacion")
+        if min_poblacion is None:
+            print(f"ERROR: {mensaje}")
             return
         
-        resultados = filtrar_por_poblacion(paises, min_poblacion, max_poblacion)
+        clave = ("poblacion", min_poblacion, max_poblacion)
+        resultados = obtener_de_cache(indices, clave)
+        if resultados is None:
+            resultados = filtrar_por_poblacion(paises, min_poblacion, max_poblacion, indices)
+            guardar_en_cache(indices, clave, resultados)
         
         if len(resultados) == 0:
             print(f"\nERROR: No se encontraron paises con poblacion entre {min_poblacion:,} y {max_poblacion:,}.")
@@ -550,18 +4364,16 @@ def menu_filtrar_paises(paises):
         min_sup = input("Superficie minima (km2): ").strip()
         max_sup = input("Superficie maxima (km2): ").strip()
         
-        if not es_numero_entero(min_sup) or not es_numero_entero(max_sup):
-            print("ERROR: Los valores deben ser numeros enteros positivos.")
-            return
-        
-        min_superficie = int(min_sup)
-        max_superficie = int(max_sup)
-        
-        if min_superficie > max_superficie:
-            print("ERROR: La superficie minima no puede ser mayor que la maxima.")
+        min_superficie, max_superficie, mensaje = validar_rango(min_sup, max_sup, "superficie")
+        if min_superficie is None:
+            print(f"ERROR: {mensaje}")
             return
         
-        resultados = filtrar_por_superficie(paises, min_superficie, max_superficie)
+        clave = ("superficie", min_superficie, max_superficie)
+        resultados = obtener_de_cache(indices, clave)
+        if resultados is None:
+            resultados = filtrar_por_superficie(paises, min_superficie, max_superficie, indices)
+            guardar_en_cache(indices, clave, resultados)
         
         if len(resultados) == 0:
             print(f"\nERROR: No se encontraron paises con superficie entre {min_superficie:,} y {max_superficie:,} km2.")
@@ -569,11 +4381,156 @@ def menu_filtrar_paises(paises):
             mostrar_paises(resultados, f"Paises con superficie entre {min_superficie:,} y {max_superficie:,} km2")
     
     elif opcion == "4":
+        menu_filtro_combinado(paises, indices)
+    
+    elif opcion == "5":
+        return
+    else:
+        print("ERROR: Opcion invalida.")
+
+def pedir_rango(nombre_campo, decimal=False):
+    """
+    Pide un rango opcional (Enter en ambos para omitirlo)
+    decimal: aceptar numeros con decimales (para los campos derivados)
+    Retorna (rango o None, mensaje de error)
+    """
+    minimo = input(f"{nombre_campo} minima (Enter para omitir): ").strip()
+    maximo = input(f"{nombre_campo} maxima (Enter para omitir): ").strip()
+    if minimo == "" and maximo == "":
+        return None, ""
+    
+    if decimal:
+        minimo, maximo, mensaje = validar_rango_decimal(minimo, maximo, nombre_campo.lower())
+    else:
+        minimo, maximo, mensaje = validar_rango(minimo, maximo, nombre_campo.lower())
+    if minimo is None:
+        return None, mensaje
+    return (minimo, maximo), ""
+
+def menu_filtro_combinado(paises, indices=None):
+    """Filtra por varios criterios a la vez con una consulta combinada"""
+    print("\n(Dejar en blanco los criterios que no se usen)")
+    consulta = crear_consulta()
+    
+    print(f"Continentes disponibles: {', '.join(CONTINENTES_VALIDOS)}")
+    continente = input("Continente: ").strip()
+    if continente != "":
+        valido, mensaje = validar_continente(continente)
+        if not valido:
+            print(f"ERROR: {mensaje}")
+            return
+        consulta = donde_continente(consulta, continente)
+    
+    rangos = [
+        ("poblacion", "Poblacion", False),
+        ("superficie", "Superficie", False),
+        ("densidad", "Densidad (hab/km2)", True),
+        ("participacion", "Participacion en su continente (%)", True)
+    ]
+    for campo, nombre_campo, decimal in rangos:
+        rango, mensaje = pedir_rango(nombre_campo, decimal)
+        if mensaje != "":
+            print(f"ERROR: {mensaje}")
+            return
+        if rango is not None:
+            consulta = donde_rango(consulta, campo, rango[0], rango[1])
+    
+    nombre = input("El nombre contiene: ").strip()
+    if nombre != "":
+        consulta = nombre_contiene(consulta, nombre)
+    
+    orden = input("Ordenar por (ej: continente,-poblacion): ").strip()
+    if orden != "":
+        criterios, mensaje = parsear_criterios(orden)
+        if criterios is None:
+            print(f"ERROR: {mensaje}")
+            return
+        consulta = ordenar_por(consulta, criterios)
+    
+    limite = input("Cantidad maxima de resultados: ").strip()
+    if limite != "":
+        if not es_numero_entero(limite):
+            print("ERROR: La cantidad debe ser un numero entero positivo.")
+            return
+        consulta = limitar(consulta, int(limite))
+    
+    resultados = obtener_de_cache(indices, clave_consulta(consulta))
+    if resultados is None:
+        resultados = ejecutar_consulta(paises, consulta, indices)
+        guardar_en_cache(indices, clave_consulta(consulta), resultados)
+    
+    if len(resultados) == 0:
+        print("\nERROR: No se encontraron paises con esos criterios.")
+    else:
+        mostrar_paises(resultados, describir_consulta(consulta), totales=obtener_totales_continente(paises, indices))
+
+def menu_estadisticas(paises, indices=None):
+    """Opcion 7: Mostrar estadisticas"""
+    print("\n" + "="*60)
+    print("ESTADISTICAS")
+    print("="*60)
+    print("\n1. Estadisticas generales")
+    print("2. Resumen por continente (suma, promedio, minimo, maximo, mediana y percentiles)")
+    print("3. Percentiles y nombres distintos del archivo CSV (aproximados, sin cargarlo)")
+    print("4. Volver al menu principal")
+    
+    opcion = input("\nSelecciona una opcion: ").strip()
+    
+    if opcion == "1":
+        calcular_estadisticas(paises, indices)
+    elif opcion == "2":
+        grupos = agrupar(paises, "continente", CAMPOS_AGREGABLES)
+        mostrar_agrupacion(resumir_agrupacion(grupos, CAMPOS_AGREGABLES), "Resumen por continente")
+    elif opcion == "3":
+        ruta = input(f"Archivo CSV (Enter para {RUTA_CSV}): ").strip() or RUTA_CSV
+        if not os.path.exists(ruta):
+            print(f"ERROR: El archivo {ruta} no existe.")
+            return
+        bosquejo = bosquejar(iterar_csv(ruta))
+        mostrar_estadisticas_aproximadas(resumir_bosquejo(bosquejo, CAMPOS_AGREGABLES),
+                                         f"Estadisticas aproximadas de {ruta}")
+        mostrar_paises(bosquejo["muestra"]["muestra"], "Vista previa (muestra al azar)", "completo")
+    elif opcion == "4":
+        return
+    else:
+        print("ERROR: Opcion invalida.")
+
+def menu_importar_paises(paises, indices):
+    """Opcion 10: Importar paises desde otro CSV"""
+    print("\n" + "="*60)
+    print("IMPORTAR PAISES")
+    print("="*60)
+    
+    ruta = input("\nRuta del CSV a importar: ").strip()
+    if not texto_valido(ruta):
+        print("ERROR: Debes ingresar una ruta valida.")
         return
+    
+    print("\n1. Solo agregar paises nuevos (los nombres repetidos se rechazan)")
+    print("2. Combinar (agregar los nuevos y actualizar los que ya existen)")
+    opcion = input("\nSelecciona una opcion: ").strip()
+    if opcion == "1":
+        modo = "insertar"
+    elif opcion == "2":
+        modo = "combinar"
     else:
         print("ERROR: Opcion invalida.")
+        return
+    
+    ruta_rechazos = ruta + ".rechazos.csv"
+    print(f"\nImportando {ruta}...")
+    resumen, mensaje = importar_csv(paises, indices, ruta, modo, ruta_rechazos)
+    if resumen is None:
+        print(f"ERROR: {mensaje}")
+        return
+    
+    print(f"OK: {describir_importacion(resumen)}")
+    if resumen["rechazados"] > 0:
+        print(f"ADVERTENCIA: Las filas rechazadas y sus motivos estan en {ruta_rechazos}")
+    if resumen["agregados"] > 0 or resumen["actualizados"] > 0:
+        print("ADVERTENCIA: Recuerda guardar los cambios en el CSV (opcion 8).")
 
-def menu_ordenar_paises(paises):
+def menu_ordenar_paises(paises, indices=None):
     """Opcion 6: Ordenar paises"""
     print("\n" + "="*60)
     print("ORDENAR PAISES")
@@ -581,15 +4538,41 @@ def menu_ordenar_paises(paises):
     print("\n1. Ordenar por nombre")
     print("2. Ordenar por poblacion")
     print("3. Ordenar por superficie")
-    print("4. Volver al menu principal")
+    print("4. Ordenar por varios campos")
+    print("5. Volver al menu principal")
     
     opcion = input("\nSelecciona una opcion: ").strip()
     
-    if opcion not in ["1", "2", "3", "4"]:
+    if opcion not in ["1", "2", "3", "4", "5"]:
         print("ERROR: Opcion invalida.")
         return
     
+    if opcion == "5":
+        return
+    
     if opcion == "4":
+        # Ordenar por varios campos
+        print(f"\nCampos validos: {', '.join(CAMPOS_ORDENABLES)}")
+        print("Separalos con comas y usa '-' para orden descendente.")
+        texto = input("Campos (ej: continente,-poblacion): ").strip()
+        
+        criterios, mensaje = parsear_criterios(texto)
+        if criterios is None:
+            print(f"ERROR: {mensaje}")
+            return
+        
+        totales = None
+        if usa_participacion([campo for campo, ascendente in criterios]):
+            totales = obtener_totales_continente(paises, indices)
+        paises_ordenados = ordenar_paises(paises, criterios, totales=totales)
+        titulo = f"Paises ordenados por {describir_criterios(criterios)} (Timsort)"
+        
+        # Si se ordena por un campo derivado se muestran sus columnas
+        totales_tabla = None
+        for campo, ascendente in criterios:
+            if campo in CAMPOS_DERIVADOS:
+                totales_tabla = obtener_totales_continente(paises, indices)
+        mostrar_paises(paises_ordenados, titulo, totales=totales_tabla)
         return
     
     # Determinar el campo a ordenar
@@ -604,13 +4587,23 @@ def menu_ordenar_paises(paises):
     print("\nAlgoritmo de ordenamiento:")
     print("1. Metodo burbuja")
     print("2. Metodo insercion")
+    print("3. Timsort (rapido, O(n log n))")
+    print("4. Metodo mezcla (O(n log n))")
+    print("5. Solo los primeros K (heap, O(n log K))")
     
     algoritmo = input("\nSelecciona el algoritmo: ").strip()
     
-    if algoritmo not in ["1", "2"]:
+    if algoritmo not in ["1", "2", "3", "4", "5"]:
         print("ERROR: Opcion invalida.")
         return
     
+    if algoritmo == "5":
+        k_texto = input("Cantidad de paises a mostrar (K): ").strip()
+        if not es_numero_entero(k_texto):
+            print("ERROR: K debe ser un numero entero positivo.")
+            return
+        k = int(k_texto)
+    
     # Seleccionar orden
     print("\nOrden:")
     print("1. Ascendente")
@@ -628,9 +4621,18 @@ def menu_ordenar_paises(paises):
     if algoritmo == "1":
         paises_ordenados = ordenar_burbuja(paises, campo, ascendente)
         metodo = "Burbuja"
-    else:
+    elif algoritmo == "2":
         paises_ordenados = ordenar_insercion(paises, campo, ascendente)
         metodo = "Insercion"
+    elif algoritmo == "3":
+        paises_ordenados = ordenar_paises(paises, [(campo, ascendente)], "timsort")
+        metodo = "Timsort"
+    elif algoritmo == "4":
+        paises_ordenados = ordenar_paises(paises, [(campo, ascendente)], "mezcla")
+        metodo = "Mezcla"
+    else:
+        paises_ordenados = primeros_k(paises, campo, k, ascendente)
+        metodo = f"Primeros {k}"
     
     orden_texto = "Ascendente" if ascendente else "Descendente"
     titulo = f"Paises ordenados por {campo} ({metodo}, {orden_texto})"
@@ -651,6 +4653,7 @@ def mostrar_menu():
     print("7. Mostrar estadisticas")
     print("8. Guardar cambios en el CSV")
     print("9. Salir del programa")
+    print("10. Importar paises desde otro CSV")
     print("\n" + "="*60)
 
 # ============================================================================
@@ -660,6 +4663,7 @@ def mostrar_menu():
 def main():
     """Funcion principal del programa"""
     paises = []
+    indices = None
     datos_cargados = False
     
     print("\nBienvenido al Sistema de Gestion de Paises!")
@@ -672,7 +4676,8 @@ def main():
         if opcion == "1":
             # Cargar/recargar CSV
             print("\nCargando archivo CSV...")
-            paises = cargar_csv(RUTA_CSV)
+            paises = cargar_csv_rapido(RUTA_CSV)
+            indices = construir_indices(paises)
             if len(paises) > 0:
                 datos_cargados = True
                 print(f"OK: Se cargaron {len(paises)} paises correctamente.")
@@ -687,7 +4692,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                menu_agregar_pais(paises)
+                menu_agregar_pais(paises, indices)
             pausar()
         
         elif opcion == "3":
@@ -695,7 +4700,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                menu_actualizar_pais(paises)
+                menu_actualizar_pais(paises, indices)
             pausar()
         
         elif opcion == "4":
@@ -703,7 +4708,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                menu_buscar_pais(paises)
+                menu_buscar_pais(paises, indices)
             pausar()
         
         elif opcion == "5":
@@ -711,7 +4716,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                menu_filtrar_paises(paises)
+                menu_filtrar_paises(paises, indices)
             pausar()
         
         elif opcion == "6":
@@ -719,7 +4724,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                menu_ordenar_paises(paises)
+                menu_ordenar_paises(paises, indices)
             pausar()
         
         elif opcion == "7":
@@ -727,7 +4732,7 @@ def main():
             if not datos_cargados:
                 print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
             else:
-                calcular_estadisticas(paises)
+                menu_estadisticas(paises, indices)
             pausar()
         
         elif opcion == "8":
@@ -737,24 +4742,650 @@ def main():
             else:
                 confirmacion = input("\nEstas seguro de guardar los cambios? (s/n): ").strip().lower()
                 if confirmacion == "s" or confirmacion == "si":
-                    guardar_csv(RUTA_CSV, paises)
+                    guardar_cambios(RUTA_CSV, paises, indices)
                 else:
                     print("ERROR: No se guardaron los cambios.")
             pausar()
         
+        elif opcion == "10":
+            # Importar paises
+            if not datos_cargados:
+                print("ADVERTENCIA: Primero debes cargar el archivo CSV (opcion 1).")
+            else:
+                menu_importar_paises(paises, indices)
+            pausar()
+        
         elif opcion == "9":
             # Salir
+            if instrumentacion_activa():
+                mostrar_resumen_cache(indices)
             print("\nGracias por usar el Sistema de Gestion de Paises!")
             print("Hasta luego!\n")
             break
         
         else:
-            print("ERROR: Opcion invalida. Por favor, selecciona una opcion del 1 al 9.")
+            print("ERROR: Opcion invalida. Por favor, selecciona una opcion del 1 al 10.")
             pausar()
 
+# ============================================================================
+# OPERACIONES SIN MENU
+# ============================================================================
+#
+# Las operaciones del menu expresadas como diccionarios, para poder usarlas
+# desde la linea de comandos o desde otros programas. Cada operacion tiene
+# una clave "op" (load, search, filter, sort, stats, add, update, save) y
+# sus parametros. Todas trabajan sobre una sesion con los datos cargados.
+
+def crear_sesion(ruta=RUTA_CSV):
+    """Crea una sesion sin datos cargados"""
+    return {"ruta": ruta, "paises": None, "indices": None}
+
+def cargar_sesion(sesion, ruta=None):
+    """Carga (o recarga) los datos de la sesion"""
+    if ruta is not None:
+        sesion["ruta"] = ruta
+    sesion["paises"] = cargar_csv_rapido(sesion["ruta"])
+    sesion["indices"] = construir_indices(sesion["paises"])
+
+def parsear_lista(texto):
+    """Convierte un texto como 'poblacion, superficie' en una lista sin vacios"""
+    if isinstance(texto, list):
+        return texto
+    elementos = []
+    for parte in str(texto).split(","):
+        parte = parte.strip()
+        if parte != "":
+            elementos.append(parte)
+    return elementos
+
+def validar_rango(minimo, maximo, campo):
+    """
+    Valida un rango de enteros positivos recibido como texto o numero
+    Retorna (minimo, maximo, mensaje de error)
+    """
+    minimo, motivo_minimo = parsear_entero_positivo(str(minimo))
+    maximo, motivo_maximo = parsear_entero_positivo(str(maximo))
+    if minimo is None:
+        return None, None, f"Los valores deben ser numeros enteros positivos (el minimo {motivo_minimo})."
+    if maximo is None:
+        return None, None, f"Los valores deben ser numeros enteros positivos (el maximo {motivo_maximo})."
+    if minimo > maximo:
+        return None, None, f"La {campo} minima no puede ser mayor que la maxima."
+    return minimo, maximo, ""
+
+def validar_rango_decimal(minimo, maximo, campo):
+    """
+    Valida un rango de numeros decimales no negativos (texto o numero)
+    Retorna (minimo, maximo, mensaje de error)
+    """
+    if not es_numero_decimal(str(minimo)) or not es_numero_decimal(str(maximo)):
+        return None, None, "Los valores deben ser numeros no negativos (ej: 12 o 12.5)."
+    if float(minimo) > float(maximo):
+        return None, None, f"La {campo} minima no puede ser mayor que la maxima."
+    return float(minimo), float(maximo), ""
+
+def ejecutar_operacion(sesion, operacion):
+    """
+    Ejecuta una operacion sobre la sesion (los datos se cargan solos la
+    primera vez que hacen falta)
+    Retorna un diccionario con una de estas claves:
+      "filas": lista de paises, "estadisticas": diccionario,
+      "grupos": lista de resumenes por grupo (ver resumir_agrupacion),
+      "aproximadas": lista de estadisticas con cota de error (ver
+      fila_aproximada),
+      "mensaje": texto informativo o "error": texto del error
+    """
+    op = operacion.get("op")
+    
+    if op == "load":
+        cargar_sesion(sesion, operacion.get("ruta"))
+        return {"mensaje": f"Se cargaron {len(sesion['paises'])} paises correctamente."}
+    
+    percentiles = PERCENTILES_INFORME
+    if operacion.get("percentiles"):
+        percentiles = parsear_lista(operacion["percentiles"])
+        for porcentaje in percentiles:
+            if not es_numero_entero(str(porcentaje)) or int(porcentaje) > 100:
+                return {"error": "Los percentiles deben ser enteros entre 1 y 100."}
+        percentiles = [int(porcentaje) for porcentaje in percentiles]
+    
+    trabajadores = operacion.get("trabajadores")
+    if trabajadores is not None and not es_numero_entero(str(trabajadores)):
+        return {"error": "La cantidad de trabajadores debe ser un numero entero positivo."}
+    
+    if op == "stats" and operacion.get("aproximado"):
+        # Con los datos ya cargados los indices dan el resultado exacto; si
+        # no, se resume el CSV en una pasada sin cargarlo
+        if sesion["paises"] is not None:
+            return {"aproximadas": resumir_indices(sesion["paises"], sesion["indices"], percentiles)}
+        if not os.path.exists(sesion["ruta"]):
+            return {"error": f"El archivo {sesion['ruta']} no existe."}
+        if trabajadores is not None:
+            bosquejo = bosquejar_csv_paralelo(sesion["ruta"], CAMPOS_AGREGABLES, int(trabajadores))
+        else:
+            bosquejo = bosquejar(iterar_csv(sesion["ruta"]))
+        return {"aproximadas": resumir_bosquejo(bosquejo, CAMPOS_AGREGABLES, percentiles)}
+    
+    if op == "group":
+        por = operacion.get("por") or "continente"
+        campos = parsear_lista(operacion.get("campos") or "poblacion,superficie")
+        valido, mensaje = validar_agrupacion(por, campos)
+        if not valido:
+            return {"error": mensaje}
+        
+        if trabajadores is not None:
+            # Directo desde el CSV, sin cargarlo (no ve cambios sin guardar)
+            grupos = agrupar_csv_paralelo(sesion["ruta"], por, campos, int(trabajadores))
+        else:
+            if sesion["paises"] is None:
+                cargar_sesion(sesion)
+            grupos = agrupar(sesion["paises"], por, campos)
+        return {"grupos": resumir_agrupacion(grupos, campos, percentiles)}
+    
+    if sesion["paises"] is None:
+        cargar_sesion(sesion)
+    paises = sesion["paises"]
+    indices = sesion["indices"]
+    
+    if op == "search":
+        texto = operacion.get("texto") or ""
+        if not texto_valido(texto):
+            return {"error": "Debes ingresar un nombre valido."}
+        clave = ("busqueda", texto.strip().lower())
+        resultados = obtener_de_cache(indices, clave)
+        if resultados is None:
+            resultados = buscar_pais_por_nombre(paises, texto.strip(), indices)
+            guardar_en_cache(indices, clave, resultados)
+        return {"filas": resultados}
+    
+    if op == "filter":
+        consulta = crear_consulta()
+        
+        if operacion.get("continente") is not None:
+            valido, mensaje = validar_continente(operacion["continente"])
+            if not valido:
+                return {"error": mensaje}
+            consulta = donde_continente(consulta, operacion["continente"])
+        
+        for campo in ["poblacion", "superficie"] + CAMPOS_DERIVADOS:
+            if operacion.get(campo) is None:
+                continue
+            if campo in CAMPOS_DERIVADOS:
+                minimo, maximo, mensaje = validar_rango_decimal(operacion[campo][0], operacion[campo][1], campo)
+            else:
+                minimo, maximo, mensaje = validar_rango(operacion[campo][0], operacion[campo][1], campo)
+            if minimo is None:
+                return {"error": mensaje}
+            consulta = donde_rango(consulta, campo, minimo, maximo)
+        
+        if operacion.get("nombre"):
+            consulta = nombre_contiene(consulta, operacion["nombre"])
+        
+        if operacion.get("orden"):
+            criterios, mensaje = parsear_criterios(operacion["orden"])
+            if criterios is None:
+                return {"error": mensaje}
+            consulta = ordenar_por(consulta, criterios)
+        
+        if operacion.get("limite") is not None:
+            if not es_numero_entero(str(operacion["limite"])):
+                return {"error": "La cantidad debe ser un numero entero positivo."}
+            consulta = limitar(consulta, int(operacion["limite"]))
+        
+        resultados = obtener_de_cache(indices, clave_consulta(consulta))
+        if resultados is None:
+            resultados = ejecutar_consulta(paises, consulta, indices)
+            guardar_en_cache(indices, clave_consulta(consulta), resultados)
+        return {"filas": resultados}
+    
+    if op == "sort":
+        criterios, mensaje = parsear_criterios(operacion.get("campos") or "nombre")
+        if criterios is None:
+            return {"error": mensaje}
+        
+        top = operacion.get("top")
+        if top is not None and not es_numero_entero(str(top)):
+            return {"error": "K debe ser un numero entero positivo."}
+        
+        algoritmo = operacion.get("algoritmo") or "timsort"
+        if algoritmo in ["burbuja", "insercion"] and criterios[0][0] not in ["nombre", "poblacion", "superficie"]:
+            return {"error": "Burbuja e insercion solo ordenan por nombre, poblacion o superficie."}
+        
+        totales = None
+        if usa_participacion([campo for campo, ascendente in criterios]):
+            totales = obtener_totales_continente(paises, indices)
+        
+        if len(criterios) == 1 and top is not None:
+            return {"filas": primeros_k(paises, criterios[0][0], int(top), criterios[0][1], totales)}
+        if len(criterios) == 1 and algoritmo == "burbuja":
+            filas = ordenar_burbuja(paises, criterios[0][0], criterios[0][1])
+        elif len(criterios) == 1 and algoritmo == "insercion":
+            filas = ordenar_insercion(paises, criterios[0][0], criterios[0][1])
+        else:
+            filas = ordenar_paises(paises, criterios, algoritmo, totales)
+        
+        if top is not None:
+            filas = filas[:int(top)]
+        return {"filas": filas}
+    
+    if op == "stats":
+        estadisticas = estadisticas_indexadas(paises, indices)
+        if estadisticas is None:
+            return {"error": "No hay datos para calcular estadisticas."}
+        return {"estadisticas": estadisticas}
+    
+    if op == "add":
+        nombre = str(operacion.get("nombre") or "").strip()
+        valido, mensaje = validar_nombre(nombre, paises, indices=indices)
+        if not valido:
+            return {"error": mensaje}
+        poblacion, mensaje = parsear_poblacion(str(operacion.get("poblacion")))
+        if poblacion is None:
+            return {"error": mensaje}
+        superficie, mensaje = parsear_superficie(str(operacion.get("superficie")))
+        if superficie is None:
+            return {"error": mensaje}
+        valido, mensaje = validar_continente(operacion.get("continente"))
+        if not valido:
+            return {"error": mensaje}
+        
+        agregar_pais(paises, indices, {
+            "nombre": nombre,
+            "poblacion": poblacion,
+            "superficie": superficie,
+            "continente": operacion["continente"]
+        })
+        return {"mensaje": f"El pais '{nombre}' ha sido agregado correctamente."}
+    
+    if op == "update":
+        nombre = str(operacion.get("nombre") or "").strip()
+        posicion = buscar_posicion_por_nombre(paises, nombre, indices)
+        if posicion is None:
+            return {"error": f"No se encontro el pais '{nombre}'."}
+        
+        poblacion = operacion.get("poblacion")
+        superficie = operacion.get("superficie")
+        if poblacion is not None:
+            poblacion, mensaje = parsear_poblacion(str(poblacion))
+            if poblacion is None:
+                return {"error": mensaje}
+        if superficie is not None:
+            superficie, mensaje = parsear_superficie(str(superficie))
+            if superficie is None:
+                return {"error": mensaje}
+        
+        actualizar_pais(paises, indices, posicion, poblacion, superficie)
+        return {"mensaje": f"El pais '{paises[posicion]['nombre']}' ha sido actualizado correctamente."}
+    
+    if op == "save":
+        guardar_cambios(sesion["ruta"], paises, indices)
+        return {"mensaje": "Cambios guardados."}
+    
+    if op == "import":
+        resumen, mensaje = importar_csv(paises, indices, str(operacion.get("archivo") or ""),
+                                        operacion.get("modo") or "insertar", operacion.get("rechazos"))
+        if resumen is None:
+            return {"error": mensaje}
+        return {"mensaje": describir_importacion(resumen)}
+    
+    return {"error": f"Operacion desconocida: {op}"}
+
+# ============================================================================
+# INTERFAZ DE LINEA DE COMANDOS
+# ============================================================================
+#
+# Ejemplos:
+#   python main.py search arg
+#   python main.py --formato json sort continente,-poblacion --top 10
+#   python main.py batch operaciones.txt      (una operacion por linea)
+#   cat operaciones.txt | python main.py batch
+# Los resultados van a la salida estandar como CSV o JSON (una linea por
+# pais) y los mensajes van a la salida de errores.
+
+def crear_parser_cli():
+    """Crea el parser de argumentos de la linea de comandos"""
+    parser = argparse.ArgumentParser(description="Sistema de Gestion de Paises (modo no interactivo)")
+    parser.add_argument("--csv", default=RUTA_CSV, help="Archivo CSV de datos")
+    parser.add_argument("--formato", choices=["csv", "json"], default="csv", help="Formato de salida")
+    parser.add_argument("--derivados", action="store_true", help="Agregar densidad y participacion a la salida")
+    subparsers = parser.add_subparsers(dest="op", required=True)
+    
+    parser_load = subparsers.add_parser("load", help="Cargar (o recargar) un CSV")
+    parser_load.add_argument("ruta", nargs="?")
+    
+    parser_search = subparsers.add_parser("search", help="Buscar paises por nombre")
+    parser_search.add_argument("texto")
+    
+    parser_filter = subparsers.add_parser("filter", help="Filtrar paises")
+    parser_filter.add_argument("--continente")
+    parser_filter.add_argument("--poblacion", nargs=2, metavar=("MIN", "MAX"))
+    parser_filter.add_argument("--superficie", nargs=2, metavar=("MIN", "MAX"))
+    parser_filter.add_argument("--densidad", nargs=2, metavar=("MIN", "MAX"), help="Habitantes por km2")
+    parser_filter.add_argument("--participacion", nargs=2, metavar=("MIN", "MAX"),
+                               help="Porcentaje de la poblacion de su continente")
+    parser_filter.add_argument("--nombre", help="Texto que debe contener el nombre")
+    parser_filter.add_argument("--orden", help="Ejemplo: continente,-poblacion")
+    parser_filter.add_argument("--limite", help="Cantidad maxima de resultados")
+    
+    parser_sort = subparsers.add_parser("sort", help="Ordenar paises")
+    parser_sort.add_argument("campos", nargs="?", help="Ejemplo: continente,-poblacion (o -poblacion)")
+    parser_sort.add_argument("--top", help="Mostrar solo los primeros K")
+    parser_sort.add_argument("--algoritmo", choices=["timsort", "mezcla", "burbuja", "insercion"], default="timsort")
+    
+    parser_stats = subparsers.add_parser("stats", help="Mostrar estadisticas")
+    parser_stats.add_argument("--aproximado", action="store_true",
+                              help="Mediana, percentiles y nombres distintos con cota de error, sin cargar el CSV")
+    parser_stats.add_argument("--percentiles", help="Ejemplo: 10,25,75,90")
+    parser_stats.add_argument("--trabajadores", help="Resumir el CSV con varios procesos (con --aproximado)")
+    
+    parser_group = subparsers.add_parser("group", help="Resumen por grupo (suma, promedio, mediana, percentiles...)")
+    parser_group.add_argument("--por", default="continente", help=f"Campo de agrupacion: {', '.join(CAMPOS_AGRUPABLES)}")
+    parser_group.add_argument("--campos", default="poblacion,superficie", help=f"Campos a resumir: {', '.join(CAMPOS_AGREGABLES)}")
+    parser_group.add_argument("--percentiles", help="Ejemplo: 10,25,75,90")
+    parser_group.add_argument("--trabajadores", help="Agrupar el CSV directamente con varios procesos")
+    
+    parser_add = subparsers.add_parser("add", help="Agregar un pais")
+    parser_add.add_argument("nombre")
+    parser_add.add_argument("poblacion")
+    parser_add.add_argument("superficie")
+    parser_add.add_argument("continente")
+    
+    parser_update = subparsers.add_parser("update", help="Actualizar un pais")
+    parser_update.add_argument("nombre")
+    parser_update.add_argument("--poblacion")
+    parser_update.add_argument("--superficie")
+    
+    subparsers.add_parser("save", help="Guardar los cambios")
+    
+    parser_import = subparsers.add_parser("import", help="Importar paises desde otro CSV")
+    parser_import.add_argument("archivo")
+    parser_import.add_argument("--modo", choices=MODOS_IMPORTACION, default="insertar")
+    parser_import.add_argument("--rechazos", help="CSV donde anotar las filas rechazadas")
+    
+    parser_batch = subparsers.add_parser("batch", help="Ejecutar operaciones desde un archivo o la entrada estandar")
+    parser_batch.add_argument("archivo", nargs="?", default="-")
+    
+    return parser
+
+def exportar_pais(pais, totales=None):
+    """
+    Retorna las columnas de salida de un pais
+    Con los totales por continente agrega densidad y participacion
+    """
+    fila = {
+        "nombre": pais["nombre"],
+        "poblacion": pais["poblacion"],
+        "superficie": pais["superficie"],
+        "continente": pais["continente"]
+    }
+    if totales is not None:
+        fila["densidad"] = round(calcular_densidad(pais), 4)
+        fila["participacion"] = round(calcular_participacion(pais, totales), 4)
+    return fila
+
+def escribir_resultado(resultado, formato, salida, totales=None):
+    """
+    Escribe el resultado de una operacion en la salida indicada
+    totales: totales por continente para agregar los campos derivados
+    """
+    if "error" in resultado:
+        print(f"ERROR: {resultado['error']}", file=sys.stderr)
+        return False
+    
+    if "mensaje" in resultado:
+        print(f"OK: {resultado['mensaje']}", file=sys.stderr)
+    
+    if "filas" in resultado:
+        if formato == "json":
+            for pais in resultado["filas"]:
+                salida.write(json.dumps(exportar_pais(pais, totales), ensure_ascii=False) + "\n")
+        else:
+            escritor = csv.writer(salida, lineterminator="\n")
+            if totales is None:
+                escritor.writerow(COLUMNAS_CSV)
+            else:
+                escritor.writerow(COLUMNAS_CSV + CAMPOS_DERIVADOS)
+            for pais in resultado["filas"]:
+                escritor.writerow(list(exportar_pais(pais, totales).values()))
+    
+    for clave in ["grupos", "aproximadas"]:
+        if clave not in resultado:
+            continue
+        if formato == "json":
+            for fila in resultado[clave]:
+                salida.write(json.dumps(fila, ensure_ascii=False) + "\n")
+        elif len(resultado[clave]) > 0:
+            escritor = csv.writer(salida, lineterminator="\n")
+            escritor.writerow(list(resultado[clave][0].keys()))
+            for fila in resultado[clave]:
+                escritor.writerow(list(fila.values()))
+    
+    if "estadisticas" in resultado:
+        estadisticas = dict(resultado["estadisticas"])
+        for clave in CLAVES_PAIS_ESTADISTICAS:
+            if clave in estadisticas:
+                estadisticas[clave] = estadisticas[clave]["nombre"]
+        if formato == "json":
+            salida.write(json.dumps(estadisticas, ensure_ascii=False) + "\n")
+        else:
+            escritor = csv.writer(salida, lineterminator="\n")
+            escritor.writerow(["estadistica", "valor"])
+            for clave in estadisticas:
+                if clave == "por_continente":
+                    for continente in estadisticas[clave]:
+                        escritor.writerow([f"continente_{continente}", estadisticas[clave][continente]])
+                elif clave == "totales_continente":
+                    for continente in estadisticas[clave]:
+                        for campo in estadisticas[clave][continente]:
+                            escritor.writerow([f"{campo}_{continente}", estadisticas[clave][continente][campo]])
+                else:
+                    escritor.writerow([clave, estadisticas[clave]])
+    
+    return True
+
+def ejecutar_comando(sesion, args, salida):
+    """Ejecuta una operacion ya interpretada por argparse"""
+    operacion = vars(args)
+    
+    # Los mensajes de las funciones (advertencias, "OK: ...") no deben
+    # mezclarse con los resultados, por eso se desvian a stderr
+    with contextlib.redirect_stdout(sys.stderr):
+        resultado = ejecutar_operacion(sesion, operacion)
+    
+    totales = None
+    if args.derivados and sesion["paises"] is not None:
+        totales = obtener_totales_continente(sesion["paises"], sesion["indices"])
+    
+    return escribir_resultado(resultado, args.formato, salida, totales)
+
+def es_criterio_descendente(texto):
+    """Indica si el texto es un criterio de orden que empieza con '-' (como '-poblacion')"""
+    return texto.startswith("-") and texto[1:].split(",")[0].strip() in CAMPOS_ORDENABLES
+
+def parsear_argumentos_cli(parser, argumentos):
+    """
+    Interpreta los argumentos del modo no interactivo
+    Un criterio descendente como '-poblacion' empieza con '-' y argparse lo
+    tomaria por una opcion: se acepta igual como campos de 'sort' y como
+    valor de '--orden'
+    """
+    normalizados = []
+    for argumento in argumentos:
+        if len(normalizados) > 0 and normalizados[-1] == "--orden" and es_criterio_descendente(argumento):
+            normalizados[-1] = "--orden=" + argumento
+        else:
+            normalizados.append(argumento)
+    
+    args, sobrantes = parser.parse_known_args(normalizados)
+    if args.op == "sort" and args.campos is None and len(sobrantes) > 0 and es_criterio_descendente(sobrantes[0]):
+        args.campos = sobrantes.pop(0)
+    if len(sobrantes) > 0:
+        parser.error(f"unrecognized arguments: {' '.join(sobrantes)}")
+    if args.op == "sort" and args.campos is None:
+        parser.error("the following arguments are required: campos")
+    return args
+
+def ejecutar_lote(sesion, parser, archivo, formato, salida, derivados=False):
+    """
+    Ejecuta las operaciones de un archivo (una por linea, como en la linea
+    de comandos) sobre una misma sesion. Las lineas vacias o que empiezan
+    con '#' se ignoran. Retorna True si todas terminaron bien
+    """
+    todo_ok = True
+    numero = 0
+    opciones = ["--formato", formato]
+    if derivados:
+        opciones.append("--derivados")
+    
+    for linea in archivo:
+        numero = numero + 1
+        linea = linea.strip()
+        if linea == "" or linea.startswith("#"):
+            continue
+        
+        try:
+            args = parsear_argumentos_cli(parser, opciones + shlex.split(linea))
+        except SystemExit:
+            print(f"ERROR: Linea {numero} invalida: {linea}", file=sys.stderr)
+            todo_ok = False
+            continue
+        
+        if args.op == "batch":
+            print(f"ERROR: Linea {numero}: no se puede anidar 'batch'.", file=sys.stderr)
+            todo_ok = False
+            continue
+        
+        if not ejecutar_comando(sesion, args, salida):
+            todo_ok = False
+    
+    if instrumentacion_activa():
+        mostrar_resumen_cache(sesion["indices"], sys.stderr)
+    
+    return todo_ok
+
+def ejecutar_cli(argumentos):
+    """
+    Punto de entrada del modo no interactivo
+    Retorna el codigo de salida (0 si todo salio bien)
+    """
+    parser = crear_parser_cli()
+    args = parsear_argumentos_cli(parser, argumentos)
+    sesion = crear_sesion(args.csv)
+    salida = sys.stdout
+    
+    try:
+        if args.op == "batch":
+            if args.archivo == "-":
+                todo_ok = ejecutar_lote(sesion, parser, sys.stdin, args.formato, salida, args.derivados)
+            else:
+                archivo = open(args.archivo, "r", encoding="utf-8")
+                todo_ok = ejecutar_lote(sesion, parser, archivo, args.formato, salida, args.derivados)
+                archivo.close()
+        else:
+            todo_ok = ejecutar_comando(sesion, args, salida)
+            salida.flush()
+    except BrokenPipeError:
+        # Quien lee la salida la cerro antes de tiempo (por ejemplo '| head'):
+        # el resto se descarta en silencio, tambien lo que quede sin escribir
+        # al terminar el programa
+        descarte = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(descarte, sys.stdout.fileno())
+        return 1
+    
+    if todo_ok:
+        return 0
+    return 1
+
 # ============================================================================
 # PUNTO DE ENTRADA
 # ============================================================================
 
+def ejecutar_programa(argumentos):
+    """
+    Ejecuta el menu (sin argumentos) o la linea de comandos, con las
+    opciones de diagnostico:
+      --instrumentar      (o PAISES_INSTRUMENTAR=1) resumen de metricas al salir
+      --perfil ARCHIVO    (o PAISES_PERFIL) informe de cProfile; con extension
+                          .prof se guardan los datos crudos para pstats/snakeviz
+      --memoria ARCHIVO   (o PAISES_MEMORIA) informe de tracemalloc
+    y las de los listados del menu:
+      --listado MODO      (o PAISES_LISTADO) paginado, completo, contar o muestra
+      --filas-por-pagina N  (o PAISES_FILAS_POR_PAGINA)
+    Retorna el codigo de salida
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--instrumentar", action="store_true")
+    parser.add_argument("--perfil", default=os.environ.get("PAISES_PERFIL"))
+    parser.add_argument("--memoria", default=os.environ.get("PAISES_MEMORIA"))
+    parser.add_argument("--listado", default=os.environ.get("PAISES_LISTADO"))
+    parser.add_argument("--filas-por-pagina", default=os.environ.get("PAISES_FILAS_POR_PAGINA"))
+    opciones, resto = parser.parse_known_args(argumentos)
+    
+    filas_por_pagina = None
+    if opciones.filas_por_pagina is not None:
+        if not es_numero_entero(opciones.filas_por_pagina):
+            print("ERROR: Las filas por pagina deben ser un numero entero positivo.", file=sys.stderr)
+            return 2
+        filas_por_pagina = int(opciones.filas_por_pagina)
+    valido, mensaje = configurar_listado(opciones.listado, filas_por_pagina)
+    if not valido:
+        print(f"ERROR: {mensaje}", file=sys.stderr)
+        return 2
+    
+    if opciones.instrumentar or os.environ.get("PAISES_INSTRUMENTAR") == "1":
+        activar_instrumentacion()
+    
+    perfilador = None
+    if opciones.perfil:
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    if opciones.memoria:
+        tracemalloc.start()
+    
+    try:
+        if len(resto) > 0:
+            codigo = ejecutar_cli(resto)
+        else:
+            main()
+            codigo = 0
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            escribir_informe_perfil(perfilador, opciones.perfil)
+        if opciones.memoria:
+            escribir_informe_memoria(opciones.memoria)
+        if instrumentacion_activa():
+            mostrar_resumen_instrumentacion()
+    
+    return codigo
+
+def escribir_informe_perfil(perfilador, ruta):
+    """Guarda el resultado de cProfile (texto o datos crudos .prof)"""
+    if ruta.endswith(".prof"):
+        perfilador.dump_stats(ruta)
+    else:
+        archivo = open(ruta, "w", encoding="utf-8")
+        estadisticas = pstats.Stats(perfilador, stream=archivo)
+        estadisticas.sort_stats("cumulative").print_stats(50)
+        archivo.close()
+    print(f"OK: Perfil guardado en {ruta}", file=sys.stderr)
+
+def escribir_informe_memoria(ruta):
+    """Guarda las lineas que mas memoria reservaron segun tracemalloc"""
+    captura = tracemalloc.take_snapshot()
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    
+    archivo = open(ruta, "w", encoding="utf-8")
+    archivo.write(f"Memoria actual: {actual:,} bytes\n")
+    archivo.write(f"Pico de memoria: {pico:,} bytes\n\n")
+    for estadistica in captura.statistics("lineno")[:30]:
+        archivo.write(f"{estadistica}\n")
+    archivo.close()
+    print(f"OK: Informe de memoria guardado en {ruta}", file=sys.stderr)
+
+if os.environ.get("PAISES_INSTRUMENTAR") == "1":
+    activar_instrumentacion()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(ejecutar_programa(sys.argv[1:]))
\ No newline at end of file
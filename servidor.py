@@ -0,0 +1,341 @@
+# TPI - Programacion 1
+# Servidor de consultas del Sistema de Gestion de Paises
+#
+# Carga los datos una sola vez y atiende a varios clientes a la vez. El
+# protocolo es JSON por lineas: cada peticion es un objeto con "op" y los
+# mismos campos que la linea de comandos de main.py, y cada respuesta es un
+# objeto con "filas", "estadisticas", "grupos", "aproximadas", "mensaje" o
+# "error" (mas el "id" de la peticion, si lo traia). Con "derivados": true cada pais incluye
+# densidad y participacion.
+#
+# Uso:
+#   python servidor.py servir --puerto 8765
+#   python servidor.py servir --unix /tmp/paises.sock --csv data/paises.csv
+#   python servidor.py carga --puerto 8765 --clientes 16 --peticiones 500
+#   echo '{"op": "search", "texto": "arg"}' | nc localhost 8765
+
+import argparse
+import asyncio
+import contextlib
+import functools
+import json
+import math
+import random
+import sys
+import time
+
+import main
+
+# Operaciones que modifican los datos: pasan todas por la tarea escritora
+OPERACIONES_ESCRITURA = ["load", "add", "update", "save", "import"]
+
+# Largo maximo de una linea (peticion o respuesta) en bytes
+LIMITE_LINEA = 64 * 1024 * 1024
+
+# ============================================================================
+# SERVIDOR
+# ============================================================================
+#
+# Las lecturas (search, filter, sort, stats) se resuelven apenas llegan, en
+# el mismo bucle de eventos, y se intercalan entre las esperas de red de
+# todos los clientes. Las escrituras se encolan y las aplica una unica tarea
+# escritora, en el orden de llegada. Como cada operacion corre completa sin
+# ceder el control, una lectura nunca ve una escritura a medio aplicar.
+#
+# Un group con "trabajadores" resume el CSV del disco con varios procesos,
+# sin tocar los datos en memoria. Pasa por la cola de escrituras para que
+# ningun save reescriba el CSV (o le agregue al diario) mientras se lee, y
+# la tarea escritora lo corre en un hilo aparte para que las lecturas de
+# los demas clientes sigan atendiendose. Los mensajes de la biblioteca van
+# a stderr durante todo el servicio.
+
+def ejecutar_sin_salida(sesion, operacion):
+    """Ejecuta una operacion convirtiendo los fallos inesperados en errores"""
+    try:
+        return main.ejecutar_operacion(sesion, operacion)
+    except Exception as error:
+        return {"error": f"Fallo interno: {error}"}
+
+def exportar_estadisticas(estadisticas, totales=None):
+    """Retorna las estadisticas con los paises en las columnas de salida"""
+    estadisticas = dict(estadisticas)
+    for clave in main.CLAVES_PAIS_ESTADISTICAS:
+        if clave in estadisticas:
+            estadisticas[clave] = main.exportar_pais(estadisticas[clave], totales)
+    return estadisticas
+
+def codificar_respuesta(peticion, resultado, totales=None):
+    """
+    Arma la linea JSON de respuesta para una peticion
+    totales: totales por continente, para agregar densidad y participacion
+    """
+    respuesta = dict(resultado)
+    if "filas" in respuesta:
+        filas = []
+        for pais in respuesta["filas"]:
+            filas.append(main.exportar_pais(pais, totales))
+        respuesta["filas"] = filas
+    if "estadisticas" in respuesta:
+        respuesta["estadisticas"] = exportar_estadisticas(respuesta["estadisticas"], totales)
+    if "id" in peticion:
+        respuesta["id"] = peticion["id"]
+    return (json.dumps(respuesta, ensure_ascii=False) + "\n").encode("utf-8")
+
+def lee_el_disco(peticion):
+    """Indica si la peticion lee el CSV del disco en lugar de los datos en memoria"""
+    return peticion.get("op") == "group" and peticion.get("trabajadores") is not None
+
+async def tarea_escritora(estado):
+    """
+    Aplica de a una las escrituras encoladas y avisa el resultado
+    Las lecturas del disco corren en un hilo, pero la siguiente escritura
+    espera a que terminen
+    """
+    cola = estado["escrituras"]
+    bucle = asyncio.get_running_loop()
+    while True:
+        operacion, futuro = await cola.get()
+        if lee_el_disco(operacion):
+            resultado = await bucle.run_in_executor(None, ejecutar_sin_salida, estado["sesion"], operacion)
+        else:
+            resultado = ejecutar_sin_salida(estado["sesion"], operacion)
+            estado["escrituras_aplicadas"] = estado["escrituras_aplicadas"] + 1
+        if not futuro.cancelled():
+            futuro.set_result(resultado)
+        cola.task_done()
+
+async def encolar(estado, peticion):
+    """Encola la peticion para la tarea escritora y espera su resultado"""
+    futuro = asyncio.get_running_loop().create_future()
+    await estado["escrituras"].put((peticion, futuro))
+    return await futuro
+
+async def atender_peticion(estado, peticion):
+    """
+    Resuelve una peticion: las lecturas en el momento, las escrituras y las
+    lecturas del disco por la cola
+    """
+    if peticion.get("op") in OPERACIONES_ESCRITURA:
+        return await encolar(estado, peticion)
+    
+    estado["lecturas"] = estado["lecturas"] + 1
+    if lee_el_disco(peticion):
+        return await encolar(estado, peticion)
+    return ejecutar_sin_salida(estado["sesion"], peticion)
+
+async def atender_cliente(estado, lector, escritor):
+    """Atiende las peticiones de una conexion, en orden, hasta que se cierre"""
+    estado["clientes"] = estado["clientes"] + 1
+    try:
+        while True:
+            try:
+                linea = await lector.readline()
+            except ValueError:
+                escritor.write(codificar_respuesta({}, {"error": "Peticion demasiado larga."}))
+                break
+            if not linea:
+                break
+            linea = linea.strip()
+            if not linea:
+                continue
+            
+            try:
+                peticion = json.loads(linea)
+            except ValueError:
+                peticion = None
+            
+            if not isinstance(peticion, dict):
+                resultado = {"error": "Peticion invalida: se esperaba un objeto JSON."}
+                peticion = {}
+            else:
+                resultado = await atender_peticion(estado, peticion)
+            
+            totales = None
+            if peticion.get("derivados"):
+                sesion = estado["sesion"]
+                totales = main.obtener_totales_continente(sesion["paises"], sesion["indices"])
+            escritor.write(codificar_respuesta(peticion, resultado, totales))
+            await escritor.drain()
+    except ConnectionError:
+        pass
+    finally:
+        estado["clientes"] = estado["clientes"] - 1
+        escritor.close()
+
+async def servir(ruta_csv, host, puerto, ruta_unix=None):
+    """Carga los datos y atiende clientes hasta que se interrumpa"""
+    estado = {
+        "sesion": main.crear_sesion(ruta_csv),
+        "escrituras": asyncio.Queue(),
+        "clientes": 0,
+        "lecturas": 0,
+        "escrituras_aplicadas": 0
+    }
+    
+    main.cargar_sesion(estado["sesion"])
+    print(f"OK: Se cargaron {len(estado['sesion']['paises']):,} paises de {ruta_csv}", file=sys.stderr)
+    
+    escritora = asyncio.create_task(tarea_escritora(estado))
+    atender = functools.partial(atender_cliente, estado)
+    
+    if ruta_unix is not None:
+        servidor = await asyncio.start_unix_server(atender, path=ruta_unix, limit=LIMITE_LINEA)
+        print(f"OK: Escuchando en {ruta_unix}", file=sys.stderr)
+    else:
+        servidor = await asyncio.start_server(atender, host, puerto, limit=LIMITE_LINEA)
+        print(f"OK: Escuchando en {host}:{puerto}", file=sys.stderr)
+    
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        escritora.cancel()
+        print(f"Servidor detenido: {estado['lecturas']:,} lecturas y "
+              f"{estado['escrituras_aplicadas']:,} escrituras atendidas.", file=sys.stderr)
+
+# ============================================================================
+# CLIENTE DE CARGA
+# ============================================================================
+
+# Mezcla de lecturas que envia cada cliente (se elige una al azar por vez)
+PETICIONES_CARGA = [
+    {"op": "search", "texto": "ar"},
+    {"op": "filter", "continente": "Europa"},
+    {"op": "filter", "poblacion": ["1000000", "100000000"], "orden": "-poblacion", "limite": "10"},
+    {"op": "sort", "campos": "-superficie", "top": "10"},
+    {"op": "stats"}
+]
+
+async def abrir_conexion(host, puerto, ruta_unix=None):
+    """Abre una conexion con el servidor (TCP o socket Unix)"""
+    if ruta_unix is not None:
+        return await asyncio.open_unix_connection(ruta_unix, limit=LIMITE_LINEA)
+    return await asyncio.open_connection(host, puerto, limit=LIMITE_LINEA)
+
+async def enviar_peticion(lector, escritor, peticion):
+    """Envia una peticion y espera su respuesta (None si se corto la conexion)"""
+    escritor.write((json.dumps(peticion, ensure_ascii=False) + "\n").encode("utf-8"))
+    await escritor.drain()
+    linea = await lector.readline()
+    if not linea:
+        return None
+    return json.loads(linea)
+
+async def cliente_carga(conexion, cantidad, escrituras, semilla, latencias):
+    """
+    Envia cantidad peticiones de a una, anotando la latencia de cada una
+    escrituras: fraccion de peticiones que son updates (se aplican solo en
+    memoria; el servidor no guarda nada si nadie envia 'save')
+    Retorna la cantidad de respuestas con error
+    """
+    lector, escritor = await abrir_conexion(*conexion)
+    azar = random.Random(semilla)
+    errores = 0
+    
+    nombre_actualizar = None
+    if escrituras > 0:
+        respuesta = await enviar_peticion(lector, escritor, {"op": "stats"})
+        nombre_actualizar = respuesta["estadisticas"]["menor_poblacion"]["nombre"]
+    
+    for i in range(cantidad):
+        if nombre_actualizar is not None and azar.random() < escrituras:
+            peticion = {"op": "update", "nombre": nombre_actualizar, "superficie": str(azar.randint(1, 1000000))}
+        else:
+            peticion = azar.choice(PETICIONES_CARGA)
+        
+        inicio = time.perf_counter()
+        respuesta = await enviar_peticion(lector, escritor, peticion)
+        latencias.append(time.perf_counter() - inicio)
+        
+        if respuesta is None:
+            errores = errores + cantidad - i
+            break
+        if "error" in respuesta:
+            errores = errores + 1
+    
+    escritor.close()
+    await escritor.wait_closed()
+    return errores
+
+def percentil(valores_ordenados, porcentaje):
+    """Percentil por rango mas cercano de una lista ya ordenada"""
+    posicion = math.ceil(porcentaje / 100 * len(valores_ordenados)) - 1
+    return valores_ordenados[max(0, min(posicion, len(valores_ordenados) - 1))]
+
+async def prueba_carga(conexion, clientes, peticiones, escrituras):
+    """Lanza los clientes en paralelo y muestra rendimiento y latencias"""
+    latencias = []
+    inicio = time.perf_counter()
+    errores = await asyncio.gather(*[
+        cliente_carga(conexion, peticiones, escrituras, semilla, latencias)
+        for semilla in range(clientes)
+    ])
+    tiempo = time.perf_counter() - inicio
+    
+    if len(latencias) == 0:
+        print("ERROR: No se completo ninguna peticion.")
+        return False
+    
+    latencias.sort()
+    print("="*60)
+    print("PRUEBA DE CARGA")
+    print("="*60)
+    print(f"Clientes:            {clientes}")
+    print(f"Peticiones:          {len(latencias):,} en {tiempo:.3f} s")
+    print(f"Rendimiento:         {len(latencias) / tiempo:,.1f} peticiones/s")
+    print(f"Latencia p50:        {percentil(latencias, 50) * 1000:.3f} ms")
+    print(f"Latencia p90:        {percentil(latencias, 90) * 1000:.3f} ms")
+    print(f"Latencia p99:        {percentil(latencias, 99) * 1000:.3f} ms")
+    print(f"Latencia maxima:     {latencias[-1] * 1000:.3f} ms")
+    print(f"Errores:             {sum(errores):,}")
+    print("="*60)
+    return sum(errores) == 0
+
+# ============================================================================
+# PUNTO DE ENTRADA
+# ============================================================================
+
+def crear_parser():
+    """Crea el parser de argumentos de la linea de comandos"""
+    parser = argparse.ArgumentParser(description="Servidor de consultas de paises")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+    
+    parser_servir = subparsers.add_parser("servir", help="Cargar los datos y atender clientes")
+    parser_servir.add_argument("--csv", default=main.RUTA_CSV)
+    parser_servir.add_argument("--host", default="127.0.0.1")
+    parser_servir.add_argument("--puerto", type=int, default=8765)
+    parser_servir.add_argument("--unix", help="Ruta de un socket Unix (en lugar de TCP)")
+    
+    parser_carga = subparsers.add_parser("carga", help="Medir el servidor con varios clientes")
+    parser_carga.add_argument("--host", default="127.0.0.1")
+    parser_carga.add_argument("--puerto", type=int, default=8765)
+    parser_carga.add_argument("--unix", help="Ruta de un socket Unix (en lugar de TCP)")
+    parser_carga.add_argument("--clientes", type=int, default=8)
+    parser_carga.add_argument("--peticiones", type=int, default=200, help="Peticiones por cliente")
+    parser_carga.add_argument("--escrituras", type=float, default=0.0,
+                              help="Fraccion de peticiones que son updates (0 a 1)")
+    
+    return parser
+
+def principal(argumentos=None):
+    """Ejecuta el comando pedido por linea de comandos"""
+    args = crear_parser().parse_args(argumentos)
+    
+    try:
+        if args.comando == "servir":
+            with contextlib.redirect_stdout(sys.stderr):
+                asyncio.run(servir(args.csv, args.host, args.puerto, args.unix))
+        elif args.comando == "carga":
+            conexion = (args.host, args.puerto, args.unix)
+            if not asyncio.run(prueba_carga(conexion, args.clientes, args.peticiones, args.escrituras)):
+                return 1
+    except KeyboardInterrupt:
+        pass
+    except OSError as error:
+        print(f"ERROR: {error}", file=sys.stderr)
+        return 1
+    
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(principal())
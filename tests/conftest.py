@@ -0,0 +1,36 @@
+# Configuracion comun de las pruebas: permite importar main.py y servidor.py
+# desde la raiz del repositorio y arma datos de ejemplo
+
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main
+
+def generar_filas(cantidad, semilla=0):
+    """Genera filas (nombre, poblacion, superficie, continente) al azar"""
+    azar = random.Random(semilla)
+    filas = []
+    for i in range(cantidad):
+        filas.append((f"Pais{i:05d}", azar.randint(1, 10**9), azar.randint(1, 10**7),
+                      azar.choice(main.CONTINENTES_VALIDOS)))
+    return filas
+
+def escribir_csv(ruta, filas):
+    """Escribe las filas en un CSV con el encabezado del sistema"""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write(",".join(main.COLUMNAS_CSV) + "\n")
+        for fila in filas:
+            archivo.write(",".join(str(valor) for valor in fila) + "\n")
+
+@pytest.fixture
+def paises():
+    """Lista de paises de ejemplo, en memoria"""
+    lista = []
+    for nombre, poblacion, superficie, continente in generar_filas(2000):
+        lista.append({"nombre": nombre, "poblacion": poblacion, "superficie": superficie, "continente": continente})
+    return lista
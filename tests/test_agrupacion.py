@@ -0,0 +1,63 @@
+# Pruebas de la agrupacion: percentiles con memoria acotada por grupo
+
+import bisect
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def paises_de(filas):
+    return [{"nombre": nombre, "poblacion": poblacion, "superficie": superficie, "continente": continente}
+            for nombre, poblacion, superficie, continente in filas]
+
+def test_grupos_chicos_dan_percentiles_exactos(paises):
+    paises = paises[:main.KLL_K * 3]
+    filas = main.resumir_agrupacion(main.agrupar(paises, "continente", ["poblacion"]), ["poblacion"], [25, 75])
+    for fila in filas:
+        valores = sorted(pais["poblacion"] for pais in paises if pais["continente"] == fila["grupo"])
+        assert fila["mediana"] == main.percentil_interpolado(valores, 50)
+        assert fila["p25"] == main.percentil_interpolado(valores, 25)
+        assert fila["minimo"] == valores[0] and fila["maximo"] == valores[-1]
+        assert fila["suma"] == sum(valores)
+
+def test_grupos_grandes_con_memoria_acotada_y_error_de_rango():
+    paises = paises_de(generar_filas(60000, semilla=3))
+    grupos = main.agrupar(paises, "continente", ["poblacion"])
+    cota = main.error_rango_kll(main.KLL_K)
+    
+    for grupo in grupos:
+        kll = grupos[grupo]["poblacion"]["cuantiles"]
+        assert kll["retenidos"] <= 3 * main.KLL_K + 8 * len(kll["niveles"])
+    
+    for fila in main.resumir_agrupacion(grupos, ["poblacion"], [10, 90]):
+        valores = sorted(pais["poblacion"] for pais in paises if pais["continente"] == fila["grupo"])
+        for clave, porcentaje in [("p10", 10), ("mediana", 50), ("p90", 90)]:
+            rango = bisect.bisect_left(valores, fila[clave]) / len(valores)
+            assert abs(rango - porcentaje / 100) <= cota
+
+def test_combinar_fragmentos_conserva_los_exactos():
+    paises = paises_de(generar_filas(30000, semilla=5))
+    completo = main.agrupar(paises, "continente", ["poblacion", "densidad"])
+    combinado = {}
+    for inicio in range(0, len(paises), 7000):
+        main.combinar_agrupaciones(combinado, main.agrupar(paises[inicio:inicio + 7000], "continente",
+                                                           ["poblacion", "densidad"]), ["poblacion", "densidad"])
+    for grupo in completo:
+        for campo in ["poblacion", "densidad"]:
+            assert combinado[grupo][campo]["minimo"] == completo[grupo][campo]["minimo"]
+            assert combinado[grupo][campo]["maximo"] == completo[grupo][campo]["maximo"]
+        assert combinado[grupo]["cantidad"] == completo[grupo]["cantidad"]
+        assert combinado[grupo]["poblacion"]["suma"] == completo[grupo]["poblacion"]["suma"]
+
+def test_percentiles_de_una_operacion_json(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(500))
+    sesion = main.crear_sesion(ruta)
+
+    resultado = main.ejecutar_operacion(sesion, {"op": "group", "campos": ["poblacion"], "percentiles": [10, 90]})
+    assert "error" not in resultado
+    assert "p10" in resultado["grupos"][0] and "p90" in resultado["grupos"][0]
+    assert main.ejecutar_operacion(sesion, {"op": "group", "percentiles": "25, 75"})["grupos"][0]["p75"] > 0
+
+    for percentiles in [[0, 50], [50, 101], "10,mitad", [-5]]:
+        resultado = main.ejecutar_operacion(sesion, {"op": "group", "percentiles": percentiles})
+        assert resultado == {"error": "Los percentiles deben ser enteros entre 1 y 100."}
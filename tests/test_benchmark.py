@@ -0,0 +1,34 @@
+# Pruebas de las herramientas del benchmark: datos sinteticos, medicion y
+# comparacion con una ejecucion anterior
+
+import benchmark
+import main
+
+def test_csv_sintetico_se_carga_completo(tmp_path, capsys):
+    ruta = str(tmp_path / "paises.csv")
+    benchmark.generar_csv_sintetico(ruta, 500, sesgo=0.5)
+    assert capsys.readouterr().out == ""
+
+    paises = main.cargar_csv(ruta)
+    assert paises == list(benchmark.generar_paises(500, sesgo=0.5))
+
+def test_medir_operacion_silencia_la_salida(capsys):
+    llamadas = []
+    def operacion():
+        print("ruido")
+        llamadas.append(1)
+
+    medicion = benchmark.medir_operacion(operacion, repeticiones=3, calentamiento=2)
+    assert len(llamadas) == 2 + 3 + 1
+    assert capsys.readouterr().out == ""
+    assert 0 <= medicion["minimo"] <= medicion["mediana"]
+
+def test_comparar_resultados_cuenta_regresiones(capsys):
+    anteriores = [{"operacion": "filtrar", "filas": 10, "mediana": 1.0},
+                  {"operacion": "ordenar", "filas": 10, "mediana": 1.0}]
+    actuales = [{"operacion": "filtrar", "filas": 10, "mediana": 1.05},
+                {"operacion": "ordenar", "filas": 10, "mediana": 1.5},
+                {"operacion": "buscar", "filas": 10, "mediana": 9.0}]
+
+    assert benchmark.comparar_resultados(actuales, anteriores) == 1
+    assert "REGRESION" in capsys.readouterr().out
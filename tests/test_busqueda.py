@@ -0,0 +1,33 @@
+# Pruebas del indice de busqueda por nombre: da lo mismo que recorrer la
+# lista y autocompleta en orden alfabetico
+
+import main
+
+NOMBRES = ["Argentina", "Armenia", "Arabia Saudita", "Brasil", "Cote d'Ivoire", "ARUBA", "Mar del Plata"]
+
+def agregar_nombres(paises):
+    for numero, nombre in enumerate(NOMBRES):
+        paises.append({"nombre": nombre, "poblacion": numero + 1, "superficie": 1, "continente": "America"})
+
+def test_busqueda_con_indice_coincide_con_el_recorrido(paises):
+    agregar_nombres(paises)
+    indices = main.construir_indices(paises)
+    for texto in ["", "a", "AR", "ar", "ina", "rgentin", "s0", "00123", "Pais01999", "xyz", "d'iv", "a s"]:
+        esperado = [pais for pais in paises if texto.lower() in pais["nombre"].lower()]
+        assert main.buscar_pais_por_nombre(paises, texto, indices) == esperado
+        assert main.buscar_pais_por_nombre(paises, texto) == esperado
+
+def test_indice_de_busqueda_sigue_a_los_agregados(paises):
+    indices = main.construir_indices(paises)
+    assert main.buscar_pais_por_nombre(paises, "rgen", indices) == []
+    main.agregar_pais(paises, indices, {"nombre": "Argentina", "poblacion": 1, "superficie": 1, "continente": "America"})
+    assert main.buscar_pais_por_nombre(paises, "rgen", indices) == [paises[-1]]
+    assert main.autocompletar(paises, indices, "arg") == ["Argentina"]
+
+def test_autocompletar_en_orden_alfabetico(paises):
+    agregar_nombres(paises)
+    indices = main.construir_indices(paises)
+    assert main.autocompletar(paises, indices, "ar") == ["Arabia Saudita", "Argentina", "Armenia", "ARUBA"]
+    assert main.autocompletar(paises, indices, "ar", limite=2) == ["Arabia Saudita", "Argentina"]
+    assert main.autocompletar(paises, indices, "pais0000") == [f"Pais0000{i}" for i in range(10)]
+    assert main.autocompletar(paises, indices, "zz") == []
@@ -0,0 +1,57 @@
+# Pruebas de la cache de consultas: LRU acotada e invalidacion al cambiar
+# los datos
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def test_descarta_la_menos_usada(paises):
+    indices = {"cache": main.crear_cache(maximo_entradas=2, maximo_filas=10)}
+    main.guardar_en_cache(indices, "a", paises[:3])
+    main.guardar_en_cache(indices, "b", paises[:3])
+    assert main.obtener_de_cache(indices, "a") == paises[:3]
+    main.guardar_en_cache(indices, "c", paises[:3])
+
+    # "b" era la menos usada
+    assert main.obtener_de_cache(indices, "b") is None
+    assert list(indices["cache"]["entradas"]) == ["a", "c"]
+    assert (indices["cache"]["aciertos"], indices["cache"]["fallos"]) == (1, 1)
+
+    # Limite de filas: "a" sale para hacer lugar y lo demasiado grande no entra
+    main.guardar_en_cache(indices, "d", paises[:6])
+    assert list(indices["cache"]["entradas"]) == ["c", "d"]
+    assert indices["cache"]["filas"] == 9
+    main.guardar_en_cache(indices, "e", paises[:11])
+    assert "e" not in indices["cache"]["entradas"]
+
+def test_las_listas_se_guardan_como_copia(paises):
+    indices = {"cache": main.crear_cache()}
+    resultado = paises[:3]
+    main.guardar_en_cache(indices, "a", resultado)
+    resultado.append(paises[5])
+    copia = main.obtener_de_cache(indices, "a")
+    copia.append(paises[6])
+    assert main.obtener_de_cache(indices, "a") == paises[:3]
+
+def test_se_invalida_al_agregar_actualizar_y_recargar(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(300))
+    sesion = main.crear_sesion(ruta)
+    buscar = {"op": "search", "texto": "pais0001"}
+
+    primera = main.ejecutar_operacion(sesion, buscar)
+    assert main.ejecutar_operacion(sesion, buscar) == primera
+    cache = sesion["indices"]["cache"]
+    assert cache["aciertos"] == 1
+
+    main.ejecutar_operacion(sesion, {"op": "add", "nombre": "Pais0001X", "poblacion": "1", "superficie": "1",
+                                     "continente": "Asia"})
+    assert cache["invalidaciones"] == 1
+    assert len(main.ejecutar_operacion(sesion, buscar)["filas"]) == len(primera["filas"]) + 1
+
+    main.ejecutar_operacion(sesion, {"op": "update", "nombre": "Pais00010", "poblacion": "5"})
+    assert cache["invalidaciones"] == 2
+    filas = main.ejecutar_operacion(sesion, buscar)["filas"]
+    assert [pais["poblacion"] for pais in filas if pais["nombre"] == "Pais00010"] == [5]
+
+    main.ejecutar_operacion(sesion, {"op": "load"})
+    assert sesion["indices"]["cache"]["entradas"] == {}
@@ -0,0 +1,118 @@
+# Pruebas de la carga del CSV: los tres cargadores dan los mismos paises
+
+import os
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def escribir_csv_con_repetidos(ruta):
+    filas = generar_filas(3000, semilla=7)
+    # Repetidos cerca del principio y al final, con otra capitalizacion
+    filas.insert(10, ("Pais00003", 5, 5, "America"))
+    filas.append(("PAIS00100", 7, 7, "Europa"))
+    filas.append(("pais02999", 9, 9, "Asia"))
+    escribir_csv(ruta, filas)
+    return filas
+
+def test_los_tres_cargadores_coinciden_con_repetidos(tmp_path, capsys):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv_con_repetidos(ruta)
+
+    secuencial = main.cargar_csv(ruta)
+    salida = capsys.readouterr().out
+    rapido = main.cargar_csv_rapido(ruta)
+    paralelo, rechazados = main.cargar_csv_paralelo(ruta, 2)
+
+    assert len(secuencial) == 3000
+    assert secuencial == rapido == paralelo
+    assert len(rechazados) == 3
+    # Gana la primera aparicion y se informa la linea de la repetida
+    assert secuencial[3]["poblacion"] != 5
+    assert "Linea 12 omitida: Ya existe un pais con ese nombre." in salida
+    assert "Se omitieron 3 linea(s)" in salida
+
+def test_paralelo_con_archivo_chico_no_arranca_procesos(tmp_path, monkeypatch):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(500))
+
+    def sin_procesos(*argumentos, **opciones):
+        raise AssertionError("no deberia usar procesos")
+    monkeypatch.setattr(main, "ProcessPoolExecutor", sin_procesos)
+
+    paises, rechazados = main.cargar_csv_paralelo(ruta, 8)
+    assert paises == main.cargar_csv(ruta)
+    assert rechazados == []
+    assert os.path.getsize(ruta) < main.BYTES_MINIMOS_POR_PROCESO
+
+def test_lineas_invalidas_del_csv_se_informan_con_su_numero(tmp_path, capsys, monkeypatch):
+    ruta = str(tmp_path / "paises.csv")
+    filas = generar_filas(60)
+    filas[4] = ("Pais00004", 10, 10)
+    filas[20] = ("Pais00020", 10, 10, "Marte")
+    filas[33] = ("Pais00033", -5, 10, "Asia")
+    filas[59] = ("Pais00059", 10, "mucha", "Asia")
+    escribir_csv(ruta, filas)
+    # Bloques chicos: la numeracion tiene que seguir entre un bloque y otro
+    monkeypatch.setattr(main, "BYTES_POR_BLOQUE", 200)
+
+    paises = main.cargar_csv(ruta)
+    salida = capsys.readouterr().out
+    assert len(paises) == 56
+    assert "Linea 6 omitida: Cantidad de columnas invalida." in salida
+    assert "Linea 22 omitida: El continente debe ser uno de:" in salida
+    assert "Linea 35 omitida: Poblacion invalida: es negativo." in salida
+    assert "Linea 61 omitida: Superficie invalida: 'mucha' no es un numero entero." in salida
+    assert "Se omitieron 4 linea(s)" in salida
+
+    paralelo, rechazados = main.cargar_csv_paralelo(ruta, 1)
+    assert paralelo == paises
+    assert [linea.split(",")[0] for linea, motivo in rechazados] == ["Pais00004", "Pais00020", "Pais00033", "Pais00059"]
+
+def test_solo_se_informan_las_primeras_lineas_invalidas(tmp_path, capsys):
+    ruta = str(tmp_path / "paises.csv")
+    filas = [("Pais", 1, 1, "Marte")] * (main.MAXIMO_LINEAS_INFORMADAS + 5) + generar_filas(10)
+    escribir_csv(ruta, filas)
+
+    assert len(main.cargar_csv(ruta)) == 10
+    salida = capsys.readouterr().out
+    assert salida.count("omitida:") == main.MAXIMO_LINEAS_INFORMADAS
+    assert f"Se omitieron {main.MAXIMO_LINEAS_INFORMADAS + 5} linea(s)" in salida
+
+def test_espacios_en_el_nombre_dan_lo_mismo_en_los_dos_caminos():
+    lineas = " Argentina,1,2,America\nChile ,3,4,America\n\tPeru\t,5,6,America\nUruguay,7,8,America\n"
+    # Sin lineas invalidas (camino rapido) y con una invalida (linea por linea)
+    rapido, rechazados = main.parsear_bloque(lineas)
+    assert rechazados == []
+    lento, rechazados = main.parsear_bloque(lineas + "Mu,1,1,Marte\n")
+    assert len(rechazados) == 1
+    assert rapido == lento
+    assert rapido["nombres"] == ["Argentina", "Chile", "Peru", "Uruguay"]
+
+def test_nombre_vacio_se_rechaza(tmp_path, capsys):
+    columnas, rechazados = main.parsear_bloque("Chile,3,4,America\n,1,2,Asia\n  ,5,6,Asia\n")
+    assert columnas["nombres"] == ["Chile"]
+    assert [(indice, motivo) for indice, linea, motivo in rechazados] == [(1, "El nombre no puede estar vacio."),
+                                                                        (2, "El nombre no puede estar vacio.")]
+
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(10) + [("", 1, 2, "Asia"), (" Atlantida", 3, 4, "Europa")])
+    paises = main.cargar_csv(ruta)
+    assert "Linea 12 omitida: El nombre no puede estar vacio." in capsys.readouterr().out
+    assert paises[-1]["nombre"] == "Atlantida"
+    assert main.cargar_csv_rapido(ruta) == paises
+    assert main.cargar_csv_paralelo(ruta, 2)[0] == paises
+
+def test_lectura_perezosa_coincide_con_la_lista(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(2500))
+    paises = main.cargar_csv(ruta)
+
+    generador = main.iterar_csv(ruta)
+    assert next(generador) == paises[0]
+    assert [paises[0]] + list(generador) == paises
+    assert [len(lote) for lote in main.iterar_csv_lotes(ruta, 1000)] == [1000, 1000, 500]
+    assert sum(main.iterar_csv_lotes(ruta, 1000), []) == paises
+
+    # Las funciones de una pasada aceptan el generador en lugar de la lista
+    assert main.buscar_pais_por_nombre(main.iterar_csv(ruta), "s01") == main.buscar_pais_por_nombre(paises, "s01")
+    assert main.obtener_estadisticas(main.iterar_csv(ruta)) == main.obtener_estadisticas(paises)
@@ -0,0 +1,42 @@
+# Pruebas del modo no interactivo: criterios descendentes y salida cortada
+
+import os
+import subprocess
+import sys
+
+import main
+from conftest import escribir_csv, generar_filas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_criterio_descendente_como_campos_de_sort():
+    parser = main.crear_parser_cli()
+    args = main.parsear_argumentos_cli(parser, ["sort", "-poblacion", "--top", "3"])
+    assert args.campos == "-poblacion"
+    assert args.top == "3"
+
+def test_criterio_descendente_como_valor_de_orden():
+    parser = main.crear_parser_cli()
+    args = main.parsear_argumentos_cli(parser, ["filter", "--orden", "-poblacion,nombre", "--limite", "2"])
+    assert args.orden == "-poblacion,nombre"
+
+def test_opcion_desconocida_sigue_siendo_error():
+    parser = main.crear_parser_cli()
+    try:
+        main.parsear_argumentos_cli(parser, ["sort", "-poblacion", "-x"])
+    except SystemExit:
+        return
+    assert False, "se esperaba un error de argumentos"
+
+def test_salida_cortada_no_muestra_traza(tmp_path):
+    ruta = tmp_path / "paises.csv"
+    escribir_csv(ruta, generar_filas(20000))
+    
+    proceso = subprocess.Popen([sys.executable, os.path.join(RAIZ, "main.py"), "--csv", str(ruta), "sort", "nombre"],
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    proceso.stdout.readline()
+    proceso.stdout.close()
+    errores = proceso.stderr.read().decode()
+    proceso.wait()
+    assert "Traceback" not in errores
+    assert "BrokenPipeError" not in errores
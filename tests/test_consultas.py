@@ -0,0 +1,46 @@
+# Pruebas de las consultas combinadas: dan lo mismo que aplicar los filtros
+# de a uno, con y sin indices
+
+import itertools
+
+import main
+
+def esperado_de(paises, continente, poblacion, superficie, texto):
+    return [pais for pais in paises
+            if pais["continente"] == continente
+            and poblacion[0] <= pais["poblacion"] <= poblacion[1]
+            and superficie[0] <= pais["superficie"] <= superficie[1]
+            and texto in pais["nombre"].lower()]
+
+def test_consulta_encadenada_coincide_con_los_filtros(paises):
+    indices = main.construir_indices(paises)
+    main.obtener_indice_busqueda(paises, indices)
+    consulta = main.crear_consulta()
+    consulta = main.donde_continente(consulta, "Asia")
+    consulta = main.donde_poblacion(consulta, 10**8, 9 * 10**8)
+    consulta = main.donde_poblacion(consulta, 0, 6 * 10**8)
+    consulta = main.donde_superficie(consulta, 10**5, 10**7)
+    consulta = main.nombre_contiene(consulta, "S0")
+    assert consulta["poblacion"] == (10**8, 6 * 10**8)
+
+    esperado = esperado_de(paises, "Asia", (10**8, 6 * 10**8), (10**5, 10**7), "s0")
+    assert len(esperado) > 0
+    assert main.ejecutar_consulta(paises, consulta, indices) == esperado
+    assert main.ejecutar_consulta(paises, consulta) == esperado
+    assert list(main.iterar_consulta(paises, consulta, indices)) == esperado
+
+def test_orden_y_limite_al_final(paises):
+    indices = main.construir_indices(paises)
+    consulta = main.crear_consulta(continente="Europa", poblacion=(10**7, 10**9), orden="continente,-superficie", limite=15)
+    filtrados = esperado_de(paises, "Europa", (10**7, 10**9), (0, 10**10), "")
+    esperado = sorted(filtrados, key=lambda pais: -pais["superficie"])[:15]
+
+    assert main.ejecutar_consulta(paises, consulta, indices) == esperado
+    assert main.ejecutar_consulta(paises, main.limitar(consulta, None)) == sorted(filtrados, key=lambda pais: -pais["superficie"])
+
+def test_iterar_consulta_es_perezosa(paises):
+    consulta = main.crear_consulta(continente="Asia")
+    generador = main.iterar_consulta(paises, consulta)
+    assert not isinstance(generador, list)
+    primeros = list(itertools.islice(generador, 3))
+    assert primeros == [pais for pais in paises if pais["continente"] == "Asia"][:3]
@@ -0,0 +1,36 @@
+# Pruebas de los campos derivados: densidad y participacion, tambien con
+# superficie o poblacion cero
+
+import main
+
+def test_superficie_cero_da_densidad_cero(paises):
+    paises[5]["superficie"] = 0
+    paises[6]["superficie"] = 0
+    paises[6]["poblacion"] = 0
+    indices = main.construir_indices(paises)
+
+    assert main.calcular_densidad(paises[5]) == 0.0
+    assert main.calcular_densidad(paises[6]) == 0.0
+    vista = main.ejecutar_consulta(paises, main.crear_consulta(densidad=(0, 0)), indices)
+    assert [pais["nombre"] for pais in vista] == ["Pais00005", "Pais00006"]
+    assert main.ordenar_paises(paises, [("densidad", True)])[:2] == [paises[5], paises[6]]
+    assert main.obtener_estadisticas(paises)["menor_densidad"] is paises[5]
+
+def test_continente_sin_poblacion_da_participacion_cero():
+    paises = [{"nombre": "Hielo", "poblacion": 0, "superficie": 100, "continente": "Antartida"},
+              {"nombre": "Roca", "poblacion": 0, "superficie": 0, "continente": "Antartida"}]
+    totales = main.totales_por_continente(paises)
+    assert [main.calcular_participacion(pais, totales) for pais in paises] == [0.0, 0.0]
+    assert main.exportar_pais(paises[1], totales) == {"nombre": "Roca", "poblacion": 0, "superficie": 0,
+                                                      "continente": "Antartida", "densidad": 0.0, "participacion": 0.0}
+
+def test_al_actualizar_se_recalcula_solo_el_pais_tocado(paises):
+    indices = main.construir_indices(paises)
+    densidades = [main.calcular_densidad(pais) for pais in paises]
+    main.actualizar_pais(paises, indices, 3, superficie=0)
+    main.actualizar_pais(paises, indices, 4, poblacion=paises[4]["superficie"] * 7)
+
+    assert paises[3]["densidad"] == 0.0 and paises[4]["densidad"] == 7.0
+    assert [pais["densidad"] for pais in paises[5:]] == densidades[5:]
+    assert indices["densidad"] == sorted((main.calcular_densidad(pais), i) for i, pais in enumerate(paises))
+    assert main.obtener_totales_continente(paises, indices) == main.totales_por_continente(paises)
@@ -0,0 +1,80 @@
+# Pruebas del diario de cambios: ida y vuelta y lineas invalidas
+
+import os
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def sin_derivados(paises):
+    """Deja solo las columnas del CSV (la densidad se guarda al calcularla)"""
+    return [{campo: pais[campo] for campo in main.COLUMNAS_CSV} for pais in paises]
+
+def cargar_con_cambios(ruta):
+    """Carga el CSV, agrega y actualiza paises y guarda en el diario"""
+    paises = main.cargar_csv(ruta)
+    indices = main.construir_indices(paises)
+    main.agregar_pais(paises, indices, {"nombre": "Atlantida", "poblacion": 10, "superficie": 20, "continente": "Europa"})
+    main.actualizar_pais(paises, indices, 5, poblacion=123, superficie=456)
+    main.actualizar_pais(paises, indices, len(paises) - 1, poblacion=11)
+    main.guardar_cambios(ruta, paises, indices)
+    return sin_derivados(paises)
+
+def test_ida_y_vuelta_del_diario(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(1000))
+    paises = cargar_con_cambios(ruta)
+    assert os.path.exists(main.ruta_diario(ruta))
+
+    assert main.cargar_csv(ruta) == paises
+    assert main.cargar_csv_rapido(ruta) == paises
+    assert main.cargar_csv_paralelo(ruta, 2)[0] == paises
+    assert paises[-1]["poblacion"] == 11 and paises[5]["superficie"] == 456
+
+def test_lineas_invalidas_del_diario_se_informan(tmp_path, capsys):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(100))
+    paises = cargar_con_cambios(ruta)
+
+    with open(main.ruta_diario(ruta), "a", encoding="utf-8") as archivo:
+        archivo.write("A,Uno, Dos,1,1,Asia\n")
+        archivo.write("U,Pais00001,muchos,5\n")
+        archivo.write("A,Marte,1,1,Marte\n")
+        archivo.write("U,Pais00002,7,7\n")
+        archivo.write("X,Pais00003,1,1\n")
+        archivo.write("U,Pais000")
+    capsys.readouterr()
+
+    cargados = main.cargar_csv(ruta)
+    salida = capsys.readouterr().out
+    assert "Linea 4 del diario omitida: Cantidad de columnas invalida." in salida
+    assert "Linea 5 del diario omitida: Poblacion invalida: 'muchos' no es un numero entero." in salida
+    assert "Linea 6 del diario omitida: El continente debe ser uno de:" in salida
+    assert "Linea 8 del diario omitida: Tipo de cambio desconocido." in salida
+    assert "Linea 9 del diario omitida: Cantidad de columnas invalida." in salida
+    assert "Se omitieron 5 linea(s) invalida(s)" in salida
+
+    # Las lineas validas se aplican igual
+    paises[2]["poblacion"] = paises[2]["superficie"] = 7
+    assert cargados == paises
+
+def test_nombres_con_coma_se_rechazan():
+    valido, mensaje = main.validar_nombre("Uno, Dos", [])
+    assert not valido
+    assert mensaje == "El nombre no puede contener comas."
+
+def test_diario_de_otro_csv_no_pierde_los_cambios(tmp_path, capsys):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(100))
+    cargar_con_cambios(ruta)
+    # El CSV se reescribe por fuera: el diario que quedo ya no le corresponde
+    escribir_csv(ruta, generar_filas(120, semilla=4))
+
+    paises = main.cargar_csv(ruta)
+    indices = main.construir_indices(paises)
+    main.actualizar_pais(paises, indices, 7, poblacion=99)
+    main.guardar_cambios(ruta, paises, indices)
+    assert "no corresponde al CSV actual, se guarda el CSV completo" in capsys.readouterr().out
+
+    assert main.cargar_csv(ruta) == sin_derivados(paises)
+    assert not os.path.exists(main.ruta_diario(ruta))
+    assert "no corresponde" not in capsys.readouterr().out
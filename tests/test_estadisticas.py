@@ -0,0 +1,66 @@
+# Pruebas de las estadisticas: el acumulador incremental da lo mismo que
+# recorrer la lista y las aproximadas acotan el valor exacto
+
+import main
+from conftest import generar_filas
+
+def test_acumulador_despues_de_agregar_y_actualizar(paises):
+    indices = main.construir_indices(paises)
+    assert main.estadisticas_indexadas(paises, indices) == main.obtener_estadisticas(paises)
+
+    main.agregar_pais(paises, indices, {"nombre": "Atlantida", "poblacion": 10**10, "superficie": 1, "continente": "Europa"})
+    main.agregar_pais(paises, indices, {"nombre": "Lemuria", "poblacion": 1, "superficie": 10**8, "continente": "Asia"})
+    # Cambiar los extremos: el mayor pasa a ser el menor y al reves
+    main.actualizar_pais(paises, indices, len(paises) - 2, poblacion=0)
+    main.actualizar_pais(paises, indices, len(paises) - 1, poblacion=2 * 10**10, superficie=3)
+    main.actualizar_pais(paises, indices, 17, superficie=5)
+
+    assert main.estadisticas_indexadas(paises, indices) == main.obtener_estadisticas(paises)
+    assert main.estadisticas_indexadas(paises, indices)["mayor_poblacion"]["nombre"] == "Lemuria"
+
+def test_empates_en_los_extremos_eligen_el_primero(paises):
+    for pais in paises:
+        pais["poblacion"] = 5
+    indices = main.construir_indices(paises)
+    estadisticas = main.estadisticas_indexadas(paises, indices)
+    assert estadisticas["mayor_poblacion"] is paises[0]
+    assert estadisticas["menor_poblacion"] is paises[0]
+    assert estadisticas == main.obtener_estadisticas(paises)
+
+def filas_por_medida(filas, campo):
+    return {fila["medida"]: fila for fila in filas if fila["campo"] == campo}
+
+def test_aproximadas_contienen_el_valor_exacto():
+    paises = [{"nombre": nombre, "poblacion": poblacion, "superficie": superficie, "continente": continente}
+              for nombre, poblacion, superficie, continente in generar_filas(30000, semilla=9)]
+    filas = main.resumir_bosquejo(main.bosquejar(paises), main.CAMPOS_AGREGABLES, [10, 90])
+    exactas = main.resumir_indices(paises, main.construir_indices(paises), [10, 90])
+
+    for campo in ["poblacion", "superficie"]:
+        aproximada = filas_por_medida(filas, campo)
+        exacta = filas_por_medida(exactas, campo)
+        for medida in ["p10", "p50", "p90"]:
+            assert aproximada[medida]["metodo"] == "kll"
+            assert aproximada[medida]["cota_inferior"] <= exacta[medida]["valor"] <= aproximada[medida]["cota_superior"]
+        assert aproximada["minimo"]["valor"] == exacta["minimo"]["valor"]
+        assert aproximada["maximo"]["valor"] == exacta["maximo"]["valor"]
+
+    distintos = filas_por_medida(filas, "nombre")["distintos"]
+    assert distintos["metodo"] == "hll"
+    assert distintos["cota_inferior"] <= 30000 <= distintos["cota_superior"]
+
+def test_pocos_paises_dan_resultados_exactos(paises):
+    paises = paises[:main.KLL_K]
+    filas = main.resumir_bosquejo(main.bosquejar(paises), ["poblacion"], [25])
+    valores = sorted(pais["poblacion"] for pais in paises)
+    aproximada = filas_por_medida(filas, "poblacion")
+    assert aproximada["p25"]["valor"] == main.percentil_interpolado(valores, 25)
+    assert aproximada["p25"]["cota_inferior"] == aproximada["p25"]["cota_superior"]
+
+def test_muestra_uniforme_de_tamano_fijo(paises):
+    muestra = main.muestra_uniforme(paises, 50, semilla=1)
+    assert len(muestra) == 50
+    assert len(set(pais["nombre"] for pais in muestra)) == 50
+    assert all(pais in paises for pais in muestra)
+    assert main.muestra_uniforme(paises, 50, semilla=1) == muestra
+    assert main.muestra_uniforme(paises[:10], 50) == paises[:10]
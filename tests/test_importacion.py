@@ -0,0 +1,62 @@
+# Pruebas de la importacion de un CSV externo: modos insertar y combinar
+# y archivo de rechazos
+
+import csv
+import os
+
+import main
+
+def escribir_externo(ruta, filas):
+    """CSV externo con las columnas en otro orden"""
+    with open(ruta, "w", encoding="utf-8") as archivo:
+        archivo.write("continente,nombre,superficie,poblacion\n")
+        for nombre, poblacion, superficie, continente in filas:
+            archivo.write(f"{continente},{nombre},{superficie},{poblacion}\n")
+
+def leer_rechazos(ruta):
+    with open(ruta, encoding="utf-8") as archivo:
+        return list(csv.DictReader(archivo))
+
+def test_modo_insertar(paises, tmp_path):
+    indices = main.construir_indices(paises)
+    cantidad = len(paises)
+    ruta = str(tmp_path / "externo.csv")
+    rechazos = str(tmp_path / "rechazos.csv")
+    escribir_externo(ruta, [("Atlantida", 10, 20, "Europa"), ("pais00003", 1, 1, "Asia"),
+                            ("Lemuria", 0, 5, "Asia"), ("Mu", 5, 5, "Marte"), ("ATLANTIDA", 3, 3, "Europa")])
+
+    resumen, mensaje = main.importar_csv(paises, indices, ruta, "insertar", rechazos, tamano_lote=2)
+    assert mensaje == ""
+    assert (resumen["leidas"], resumen["agregados"], resumen["rechazados"]) == (5, 1, 4)
+    assert len(paises) == cantidad + 1
+    assert [paises[-1][campo] for campo in main.COLUMNAS_CSV] == ["Atlantida", 10, 20, "Europa"]
+    assert indices["nombres"]["atlantida"] == cantidad
+    assert [fila["linea"] for fila in leer_rechazos(rechazos)] == ["3", "4", "5", "6"]
+
+def test_modo_combinar(paises, tmp_path):
+    indices = main.construir_indices(paises)
+    cantidad = len(paises)
+    ruta = str(tmp_path / "externo.csv")
+    escribir_externo(ruta, [("PAIS00003", 77, 88, paises[3]["continente"]),
+                            ("Pais00004", paises[4]["poblacion"], paises[4]["superficie"], paises[4]["continente"]),
+                            ("Atlantida", 10, 20, "Europa"), ("Atlantida", 11, 21, "Europa")])
+
+    resumen, mensaje = main.importar_csv(paises, indices, ruta, "combinar")
+    assert (resumen["agregados"], resumen["actualizados"], resumen["sin_cambios"], resumen["rechazados"]) == (1, 2, 1, 0)
+    assert len(paises) == cantidad + 1
+    assert (paises[3]["poblacion"], paises[3]["superficie"]) == (77, 88)
+    assert (paises[-1]["poblacion"], paises[-1]["superficie"]) == (11, 21)
+    assert main.filtrar_por_poblacion(paises, 77, 77, indices) == [paises[3]]
+
+def test_rechazos_de_una_importacion_anterior_se_borran(paises, tmp_path):
+    indices = main.construir_indices(paises)
+    ruta = str(tmp_path / "externo.csv")
+    rechazos = str(tmp_path / "rechazos.csv")
+    escribir_externo(ruta, [("Mu", 5, 5, "Marte")])
+    main.importar_csv(paises, indices, ruta, "insertar", rechazos)
+    assert len(leer_rechazos(rechazos)) == 1
+
+    escribir_externo(ruta, [("Atlantida", 10, 20, "Europa")])
+    resumen, mensaje = main.importar_csv(paises, indices, ruta, "insertar", rechazos)
+    assert resumen["rechazados"] == 0
+    assert not os.path.exists(rechazos)
@@ -0,0 +1,56 @@
+# Pruebas de los indices: los filtros por rango con busqueda binaria dan lo
+# mismo que recorrer la lista y el indice de nombres detecta los repetidos
+
+import main
+
+def test_filtros_por_rango_coinciden_con_el_recorrido(paises):
+    indices = main.construir_indices(paises)
+    for minimo, maximo in [(0, 10**10), (10**8, 3 * 10**8), (5, 5), (10**9 + 1, 10**10)]:
+        esperado = [pais for pais in paises if minimo <= pais["poblacion"] <= maximo]
+        assert main.filtrar_por_poblacion(paises, minimo, maximo, indices) == esperado
+        esperado = [pais for pais in paises if minimo <= pais["superficie"] <= maximo]
+        assert main.filtrar_por_superficie(paises, minimo, maximo, indices) == esperado
+
+def test_indices_siguen_ordenados_despues_de_actualizar(paises):
+    indices = main.construir_indices(paises)
+    main.actualizar_pais(paises, indices, 10, poblacion=7)
+    main.actualizar_pais(paises, indices, 20, poblacion=paises[21]["poblacion"], superficie=1)
+
+    assert indices["poblacion"] == sorted((pais["poblacion"], i) for i, pais in enumerate(paises))
+    assert indices["superficie"] == sorted((pais["superficie"], i) for i, pais in enumerate(paises))
+    assert main.filtrar_por_poblacion(paises, 0, 7, indices) == [pais for pais in paises if pais["poblacion"] <= 7]
+
+def test_cambio_con_valor_anterior_que_no_coincide(paises):
+    indices = main.construir_indices(paises)
+    # El valor anterior informado no es el del indice: no debe borrar a otro pais
+    main.indexar_cambio(indices, 3, "poblacion", paises[4]["poblacion"], 1)
+    paises[3]["poblacion"] = 1
+
+    assert indices["poblacion"] == sorted((pais["poblacion"], i) for i, pais in enumerate(paises))
+
+def test_indice_de_nombres_sin_distinguir_mayusculas(paises):
+    indices = main.construir_indices(paises)
+    assert main.buscar_posicion_por_nombre(paises, "PAIS00042", indices) == 42
+    assert main.buscar_posicion_por_nombre(paises, "pais00042") == 42
+    assert main.buscar_posicion_por_nombre(paises, "Atlantida", indices) is None
+    assert main.validar_nombre("pAIS00007", paises, indices=indices) == (False, "Ya existe un pais con ese nombre.")
+    assert main.validar_nombre("pAIS00007", paises, excluir_nombre="Pais00007", indices=indices) == (True, "")
+
+    main.agregar_pais(paises, indices, {"nombre": "Atlantida", "poblacion": 1, "superficie": 1, "continente": "Europa"})
+    assert main.buscar_posicion_por_nombre(paises, "ATLANTIDA", indices) == len(paises) - 1
+
+def test_lote_valida_contra_el_indice_y_contra_si_mismo(paises):
+    indices = main.construir_indices(paises)
+    cantidad = len(paises)
+    nuevos = [{"nombre": "Atlantida", "poblacion": "10", "superficie": 20, "continente": "Europa"},
+              {"nombre": "ATLANTIDA", "poblacion": 1, "superficie": 1, "continente": "Europa"},
+              {"nombre": "pais00001", "poblacion": 1, "superficie": 1, "continente": "Asia"},
+              {"nombre": "Lemuria", "poblacion": "-3", "superficie": 1, "continente": "Asia"},
+              {"nombre": " Mu ", "poblacion": 5, "superficie": 6, "continente": "Oceania"}]
+
+    agregados, rechazados = main.agregar_paises_lote(paises, indices, nuevos)
+    assert agregados == 2
+    assert [pais["nombre"] for pais, motivo in rechazados] == ["ATLANTIDA", "pais00001", "Lemuria"]
+    assert [pais["nombre"] for pais in paises[cantidad:]] == ["Atlantida", "Mu"]
+    assert indices["nombres"]["mu"] == cantidad + 1
+    assert indices["poblacion"] == sorted((pais["poblacion"], i) for i, pais in enumerate(paises))
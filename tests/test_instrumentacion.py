@@ -0,0 +1,40 @@
+# Pruebas de la instrumentacion: metricas por operacion y resumen al salir
+
+import os
+import subprocess
+import sys
+
+import main
+from conftest import escribir_csv, generar_filas
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_funcion_medida_acumula_llamadas_y_filas(paises, monkeypatch):
+    monkeypatch.setattr(main, "METRICAS", {})
+    filtrar = main.envolver_medicion(main.filtrar_por_continente)
+    iterar = main.envolver_medicion(main.iterar_lotes)
+
+    assert filtrar(paises, "Asia") == main.filtrar_por_continente(paises, "Asia")
+    filtrar(paises[:100], "Asia")
+    assert len(list(iterar(paises, 300))) == 7
+
+    assert main.METRICAS["filtrar_por_continente"]["llamadas"] == 2
+    assert main.METRICAS["filtrar_por_continente"]["filas"] == len(paises) + 100
+    # Los generadores se miden recien al terminar de recorrerlos
+    assert (main.METRICAS["iterar_lotes"]["llamadas"], main.METRICAS["iterar_lotes"]["filas"]) == (1, 7)
+
+def test_sin_instrumentar_las_funciones_no_cambian():
+    assert "filtrar_por_continente" in main.FUNCIONES_MEDIDAS
+    assert not hasattr(main.filtrar_por_continente, "__wrapped__")
+
+def test_resumen_y_perfil_al_salir(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(300))
+    perfil = str(tmp_path / "perfil.txt")
+
+    proceso = subprocess.run([sys.executable, os.path.join(RAIZ, "main.py"), "--instrumentar", "--perfil", perfil,
+                              "--csv", ruta, "stats"], capture_output=True, text=True)
+    assert proceso.returncode == 0
+    assert "RESUMEN DE INSTRUMENTACION" in proceso.stderr
+    assert "cargar_csv_rapido" in proceso.stderr
+    assert os.path.getsize(perfil) > 0
@@ -0,0 +1,44 @@
+# Pruebas de los listados del menu: limites de la paginacion y modos
+
+import main
+
+def responder(monkeypatch, respuestas):
+    """Hace que input() devuelva las respuestas en orden"""
+    pendientes = iter(respuestas)
+    monkeypatch.setattr("builtins.input", lambda texto="": next(pendientes))
+
+def test_paginacion_respeta_la_primera_y_la_ultima_pagina(paises, monkeypatch, capsys):
+    paises = paises[:45]
+    responder(monkeypatch, ["a", "s", "s", "s", "9", "0", "1", ""])
+    main.paginar_paises(paises, "Paises", 20)
+    salida = capsys.readouterr().out
+
+    assert "Ya estas en la primera pagina." in salida
+    assert "Ya estas en la ultima pagina." in salida
+    assert salida.count("Opcion invalida.") == 2
+    assert "Paises 41 a 45 de 45" in salida
+    assert salida.count("(pagina 1 de 3)") == 3
+    assert salida.count("(pagina 3 de 3)") == 4
+
+def test_todo_el_resto_muestra_cada_pais_una_vez(paises, monkeypatch, capsys):
+    paises = paises[:45]
+    responder(monkeypatch, ["s", "t"])
+    main.paginar_paises(paises, "Paises", 20)
+    salida = capsys.readouterr().out
+
+    for pais in paises:
+        assert salida.count(pais["nombre"] + " ") == 1
+    assert "Total: 45 pais(es)" in salida
+
+def test_modos_del_listado(paises, monkeypatch, capsys):
+    monkeypatch.setitem(main.CONFIGURACION_LISTADO, "filas_por_pagina", 10)
+    main.mostrar_paises(paises, "Paises", "contar")
+    assert capsys.readouterr().out.strip() == f"Paises: {len(paises):,} pais(es)"
+
+    main.mostrar_paises(paises, "Paises", "muestra")
+    salida = capsys.readouterr().out
+    assert f"Muestra de 10 de {len(paises):,} pais(es)" in salida
+    assert sum(salida.count(pais["nombre"] + " ") for pais in paises) == 10
+
+    assert main.configurar_listado(modo="todo")[0] is False
+    assert main.configurar_listado(filas_por_pagina=0)[0] is False
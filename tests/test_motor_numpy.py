@@ -0,0 +1,43 @@
+# Pruebas del motor NumPy sobre la lista de paises de la tabla: da lo mismo
+# que los ciclos de Python
+
+import pytest
+
+import main
+from conftest import escribir_csv, generar_filas
+
+pytest.importorskip("numpy")
+
+def cargar_con_cambios(tmp_path):
+    """Carga una PaisesTabla con paises cambiados y agregados"""
+    ruta = str(tmp_path / "paises.csv")
+    filas = generar_filas(3000, semilla=11)
+    filas[40] = ("Pais00040", 7, 0, filas[40][3])
+    escribir_csv(ruta, filas)
+
+    paises = main.cargar_csv_rapido(ruta)
+    for posicion in [3, 500, 2999]:
+        paises[posicion] = dict(paises[posicion], poblacion=123456)
+    paises.append({"nombre": "Atlantida", "poblacion": 5, "superficie": 2, "continente": "Europa"})
+    paises.append({"nombre": "pais00003", "poblacion": 9, "superficie": 9, "continente": "Oceania"})
+    return paises
+
+def test_indices_iguales_con_y_sin_numpy(tmp_path, monkeypatch):
+    paises = cargar_con_cambios(tmp_path)
+    con_numpy = main.construir_indices(paises)
+    monkeypatch.setattr(main, "USAR_NUMPY", False)
+    sin_numpy = main.construir_indices(paises)
+
+    for clave in ["nombres", "estadisticas"] + main.CAMPOS_INDEXADOS:
+        assert con_numpy[clave] == sin_numpy[clave]
+    assert list(con_numpy["estadisticas"]["por_continente"]) == list(sin_numpy["estadisticas"]["por_continente"])
+    assert main.estadisticas_indexadas(paises, con_numpy) == main.estadisticas_indexadas(paises, sin_numpy)
+
+def test_agrupar_igual_con_y_sin_numpy(tmp_path, monkeypatch):
+    paises = cargar_con_cambios(tmp_path)
+    campos = main.CAMPOS_AGREGABLES
+    con_numpy = main.resumir_agrupacion(main.agrupar(paises, "continente", campos), campos)
+    monkeypatch.setattr(main, "USAR_NUMPY", False)
+    sin_numpy = main.resumir_agrupacion(main.agrupar(paises, "continente", campos), campos)
+
+    assert con_numpy == sin_numpy
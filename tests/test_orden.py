@@ -0,0 +1,56 @@
+# Pruebas del ordenamiento: varios criterios, estabilidad y los primeros k
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def paises_con_empates(paises):
+    """Pocos valores distintos para que haya muchos empates"""
+    for numero, pais in enumerate(paises):
+        pais["poblacion"] = pais["poblacion"] % 7
+        pais["superficie"] = numero % 5
+    return paises
+
+def test_varios_criterios_con_los_dos_algoritmos(paises):
+    paises = paises_con_empates(paises)
+    criterios = [("continente", True), ("poblacion", False), ("superficie", True)]
+    esperado = sorted(paises, key=lambda pais: (pais["continente"].lower(), -pais["poblacion"], pais["superficie"]))
+
+    assert main.ordenar_paises(paises, criterios) == esperado
+    assert main.ordenar_paises(paises, criterios, algoritmo="mezcla") == esperado
+
+def test_orden_estable_con_empates(paises):
+    paises = paises_con_empates(paises)
+    for ascendente in [True, False]:
+        # Los empatados conservan el orden de la lista, tambien en descendente
+        esperado = sorted(paises, key=lambda pais: pais["poblacion"], reverse=not ascendente)
+        assert main.ordenar_paises(paises, [("poblacion", ascendente)]) == esperado
+        assert main.ordenar_paises(paises, [("poblacion", ascendente)], algoritmo="mezcla") == esperado
+
+def test_metodos_cuadraticos_coinciden_con_el_motor(paises):
+    paises = paises[:300]
+    for campo in ["nombre", "poblacion", "superficie"]:
+        for ascendente in [True, False]:
+            esperado = main.ordenar_paises(paises, [(campo, ascendente)])
+            assert main.ordenar_burbuja(paises, campo, ascendente) == esperado
+            assert main.ordenar_insercion(paises, campo, ascendente) == esperado
+
+def test_parsear_criterios():
+    assert main.parsear_criterios("continente, -poblacion") == ([("continente", True), ("poblacion", False)], "")
+    assert main.parsear_criterios("altura")[0] is None
+
+def test_primeros_k_coincide_con_ordenar_y_recortar(paises):
+    paises = paises_con_empates(paises)
+    totales = main.totales_por_continente(paises)
+    for campo in ["poblacion", "superficie", "nombre", "densidad", "participacion"]:
+        for ascendente in [True, False]:
+            for k in [0, 1, 10, len(paises) + 5]:
+                esperado = main.ordenar_paises(paises, [(campo, ascendente)], totales=totales)[:k]
+                assert main.primeros_k(paises, campo, k, ascendente) == esperado
+                assert main.primeros_k(iter(paises), campo, k, ascendente, totales) == esperado
+
+def test_primeros_k_desde_el_csv(tmp_path):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(3000))
+    paises = main.cargar_csv(ruta)
+    assert main.primeros_k_csv(ruta, "poblacion", 5) == sorted(paises, key=lambda pais: -pais["poblacion"])[:5]
+    assert main.primeros_k_csv(ruta, "superficie", 5, True) == sorted(paises, key=lambda pais: pais["superficie"])[:5]
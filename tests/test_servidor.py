@@ -0,0 +1,74 @@
+# Pruebas del servidor de consultas: formato de las respuestas
+
+import asyncio
+import json
+import time
+
+import main
+import servidor
+from conftest import escribir_csv, generar_filas
+
+def crear_estado(ruta):
+    sesion = main.crear_sesion(str(ruta))
+    main.cargar_sesion(sesion)
+    return {"sesion": sesion, "escrituras": None, "clientes": 0, "lecturas": 0, "escrituras_aplicadas": 0}
+
+def test_estadisticas_sin_campos_internos(tmp_path):
+    ruta = tmp_path / "paises.csv"
+    escribir_csv(ruta, generar_filas(500))
+    estado = crear_estado(ruta)
+    
+    resultado = asyncio.run(servidor.atender_peticion(estado, {"op": "stats"}))
+    respuesta = json.loads(servidor.codificar_respuesta({"id": 7}, resultado))
+    assert respuesta["id"] == 7
+    for clave in main.CLAVES_PAIS_ESTADISTICAS:
+        assert set(respuesta["estadisticas"][clave]) == set(main.COLUMNAS_CSV)
+
+async def atender_con_escritora(estado, peticiones):
+    """Atiende las peticiones a la vez, con la tarea escritora corriendo"""
+    estado["escrituras"] = asyncio.Queue()
+    escritora = asyncio.create_task(servidor.tarea_escritora(estado))
+    try:
+        return await asyncio.gather(*[servidor.atender_peticion(estado, peticion) for peticion in peticiones])
+    finally:
+        escritora.cancel()
+
+def test_agrupar_con_trabajadores_fuera_del_bucle(tmp_path):
+    ruta = tmp_path / "paises.csv"
+    escribir_csv(ruta, generar_filas(500))
+    estado = crear_estado(ruta)
+    
+    peticion = {"op": "group", "trabajadores": 2}
+    en_hilo, = asyncio.run(atender_con_escritora(estado, [peticion]))
+    assert en_hilo == main.ejecutar_operacion(estado["sesion"], {"op": "group"})
+    assert (estado["lecturas"], estado["escrituras_aplicadas"]) == (1, 0)
+
+def test_save_espera_al_agrupar_desde_el_disco(tmp_path, monkeypatch):
+    ruta = tmp_path / "paises.csv"
+    escribir_csv(ruta, generar_filas(500))
+    estado = crear_estado(ruta)
+    eventos = []
+    
+    agrupar_csv_paralelo = main.agrupar_csv_paralelo
+    def agrupar_lento(*argumentos):
+        eventos.append("inicio group")
+        time.sleep(0.2)
+        grupos = agrupar_csv_paralelo(*argumentos)
+        eventos.append("fin group")
+        return grupos
+    guardar_cambios = main.guardar_cambios
+    def guardar_anotando(*argumentos):
+        eventos.append("save")
+        guardar_cambios(*argumentos)
+    monkeypatch.setattr(main, "agrupar_csv_paralelo", agrupar_lento)
+    monkeypatch.setattr(main, "guardar_cambios", guardar_anotando)
+    
+    nombre = estado["sesion"]["paises"][0]["nombre"]
+    resultados = asyncio.run(atender_con_escritora(estado, [
+        {"op": "group", "trabajadores": 2},
+        {"op": "update", "nombre": nombre, "poblacion": "5"},
+        {"op": "save"},
+        {"op": "stats"}
+    ]))
+    assert eventos == ["inicio group", "fin group", "save"]
+    assert all("error" not in resultado for resultado in resultados)
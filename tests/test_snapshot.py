@@ -0,0 +1,87 @@
+# Pruebas del snapshot binario y de la lista de paises que lee de el
+
+import os
+import struct
+
+import main
+from conftest import escribir_csv, generar_filas
+
+def preparar(tmp_path, cantidad=main.FILAS_POR_BLOQUE_SNAPSHOT + 500):
+    ruta = str(tmp_path / "paises.csv")
+    escribir_csv(ruta, generar_filas(cantidad))
+    main.cargar_csv_rapido(ruta)
+    return ruta
+
+def test_lee_del_snapshot_sin_copiar_los_paises(tmp_path):
+    ruta = preparar(tmp_path)
+    paises = main.cargar_csv_rapido(ruta)
+
+    assert isinstance(paises, main.PaisesTabla)
+    assert isinstance(paises.tabla["poblacion"], memoryview)
+    assert paises == main.cargar_csv(ruta)
+    assert paises[-1] == main.cargar_csv(ruta)[-1]
+
+def test_los_cambios_quedan_en_la_lista(tmp_path):
+    ruta = preparar(tmp_path, 300)
+    paises = main.cargar_csv_rapido(ruta)
+    indices = main.construir_indices(paises)
+
+    main.actualizar_pais(paises, indices, 7, poblacion=5)
+    main.agregar_pais(paises, indices, {"nombre": "Atlantida", "poblacion": 1, "superficie": 1, "continente": "Europa"})
+
+    assert paises[7]["poblacion"] == 5
+    assert list(paises)[7]["poblacion"] == 5
+    assert paises[300]["nombre"] == "Atlantida"
+    vista = main.filtrar_por_poblacion(paises, 0, 5, indices)
+    assert [pais["nombre"] for pais in vista] == [paises[7]["nombre"], "Atlantida"]
+
+def test_fecha_nueva_con_el_mismo_contenido_se_guarda(tmp_path, monkeypatch):
+    ruta = preparar(tmp_path, 100)
+    os.utime(ruta, ns=(1, 10**18))
+
+    hashes = []
+    hash_archivo = main.hash_archivo
+    def contar_hash(ruta):
+        hashes.append(ruta)
+        return hash_archivo(ruta)
+    monkeypatch.setattr(main, "hash_archivo", contar_hash)
+
+    assert main.cargar_snapshot(ruta) is not None
+    assert len(hashes) == 1
+    assert main.cargar_snapshot(ruta) is not None
+    assert len(hashes) == 1
+
+def test_bloque_danado_se_detecta_al_leerlo(tmp_path, capsys):
+    ruta = preparar(tmp_path)
+    cantidad = main.FILAS_POR_BLOQUE_SNAPSHOT + 500
+
+    # Cambiar la poblacion de una fila del segundo bloque
+    posicion = struct.calcsize(main.FORMATO_ENCABEZADO_SNAPSHOT) + 8 * (cantidad - 1)
+    with open(main.ruta_snapshot(ruta), "r+b") as archivo:
+        archivo.seek(posicion)
+        archivo.write(struct.pack("<q", 123))
+
+    paises = main.cargar_csv_rapido(ruta)
+    assert paises.tabla["bloques_verificados"] == bytearray(2)
+    paises[0]
+    assert paises.tabla["bloques_verificados"] == bytearray([1, 0])
+    capsys.readouterr()
+
+    assert paises[cantidad - 1] == main.cargar_csv(ruta)[cantidad - 1]
+    assert "El snapshot binario esta danado" in capsys.readouterr().out
+    assert main.cargar_snapshot(ruta) is not None
+
+def test_al_regenerar_se_actualiza_la_cantidad(tmp_path, monkeypatch, capsys):
+    ruta = preparar(tmp_path, 300)
+    # El CSV cambio y el snapshot aparece danado: se vuelve a leer el CSV
+    paises = main.cargar_csv_rapido(ruta)
+    otra = main.cargar_csv_rapido(ruta)
+    escribir_csv(ruta, generar_filas(200, semilla=3))
+    monkeypatch.setattr(main, "verificar_filas_snapshot", lambda tabla, desde, hasta: "crc_bloques" not in tabla)
+    esperado = main.cargar_csv(ruta)
+
+    assert list(paises) == esperado
+    assert len(paises) == 200
+    assert otra[10] == esperado[10]
+    assert len(otra) == 200
+    assert "El snapshot binario esta danado" in capsys.readouterr().out
@@ -0,0 +1,19 @@
+# Pruebas de la tabla columnar
+
+import main
+from conftest import generar_filas
+
+def test_buscar_exacto_usa_el_indice_de_nombres():
+    tabla = main.tabla_desde_paises({"nombre": nombre, "poblacion": poblacion, "superficie": superficie,
+                                     "continente": continente}
+                                    for nombre, poblacion, superficie, continente in generar_filas(500))
+    assert tabla["indice_nombres"] is None
+    assert main.tabla_buscar_exacto(tabla, "PAIS00042") == 42
+    assert main.tabla_buscar_exacto(tabla, "Atlantida") is None
+    assert len(tabla["indice_nombres"]) == 500
+
+    # Las filas agregadas despues entran al indice; un repetido no lo pisa
+    posicion = main.tabla_agregar(tabla, "Atlantida", 1, 1, "Europa")
+    main.tabla_agregar(tabla, "pais00042", 1, 1, "Europa")
+    assert main.tabla_buscar_exacto(tabla, "atlantida") == posicion
+    assert main.tabla_buscar_exacto(tabla, "Pais00042") == 42
@@ -0,0 +1,56 @@
+# Pruebas de las vistas de paises: los filtros, la busqueda y los
+# ordenamientos deben dar lo mismo con y sin indices, tambien encadenados
+
+import main
+
+def test_filtro_de_filtro_con_indices(paises):
+    indices = main.construir_indices(paises)
+    asia = main.filtrar_por_continente(paises, "Asia")
+    
+    con_indice = main.filtrar_por_poblacion(asia, 1, 10**10, indices)
+    sin_indice = main.filtrar_por_poblacion(asia, 1, 10**10)
+    assert con_indice == sin_indice
+    assert con_indice.base is paises
+    
+    con_indice = main.filtrar_por_superficie(asia, 1000, 5000000, indices)
+    assert con_indice == main.filtrar_por_superficie(asia, 1000, 5000000)
+
+def test_filtro_con_indices_conserva_el_orden_de_la_vista(paises):
+    indices = main.construir_indices(paises)
+    ordenados = main.ordenar_paises(paises, [("superficie", False)])
+    
+    filtrados = main.filtrar_por_poblacion(ordenados, 10**8, 5 * 10**8, indices)
+    assert filtrados == [pais for pais in ordenados if 10**8 <= pais["poblacion"] <= 5 * 10**8]
+
+def test_busqueda_en_vista_con_indices(paises):
+    indices = main.construir_indices(paises)
+    europa = main.filtrar_por_continente(paises, "Europa")
+    assert main.buscar_pais_por_nombre(europa, "s01", indices) == main.buscar_pais_por_nombre(europa, "s01")
+
+def test_orden_de_filtro_y_recorte(paises):
+    asia = main.filtrar_por_continente(paises, "Asia")
+    ordenados = main.ordenar_paises(asia, [("poblacion", False), ("nombre", True)])
+    esperado = sorted([pais for pais in paises if pais["continente"] == "Asia"],
+                      key=lambda pais: (-pais["poblacion"], pais["nombre"].lower()))
+    assert ordenados == esperado
+    assert ordenados[3:10] == esperado[3:10]
+    assert ordenados.base is paises
+
+def test_consulta_sobre_vista_retorna_vista(paises):
+    indices = main.construir_indices(paises)
+    asia = main.filtrar_por_continente(paises, "Asia")
+    
+    for opciones in [{"poblacion": (1000, 10**8)},
+                     {"poblacion": (1000, 10**8), "orden": "-superficie,nombre", "limite": 5},
+                     {"poblacion": (1000, 10**8), "orden": "-superficie", "limite": 5},
+                     {"orden": "-poblacion", "limite": 10}]:
+        consulta = main.crear_consulta(**opciones)
+        con_indice = main.ejecutar_consulta(asia, consulta, indices)
+        assert isinstance(con_indice, main.VistaPaises)
+        assert con_indice == main.ejecutar_consulta(list(asia), consulta)
+
+def test_primeros_k_de_consulta_coincide_con_el_orden(paises):
+    consulta = main.crear_consulta(orden="-poblacion", limite=10)
+    resultado = main.ejecutar_consulta(paises, consulta)
+    assert isinstance(resultado, main.VistaPaises)
+    assert resultado == main.ordenar_paises(paises, [("poblacion", False)])[:10]